@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Attribute Access Benchmark
+==========================
+Measures the overhead of attribute access and method calls on
+:obj:`~mpi4pyd.MPI.HYBRID_COMM_WORLD` compared to the raw
+:obj:`MPI.COMM_WORLD` it wraps.
+
+Must be executed with at least two MPI ranks, as a communicator with a single
+rank is not wrapped::
+
+    mpiexec -n 2 python benchmarks/bench_attributes.py
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from timeit import repeat
+
+# mpi4pyd imports
+from mpi4pyd import MPI
+from mpi4pyd.MPI import HYBRID_COMM_WORLD as h_comm
+
+# Obtain communicator, rank and size
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+# Number of times each statement is executed per measurement
+N_ITER = 100000
+
+
+# %% FUNCTION DEFINITIONS
+# Function that returns the time of a single execution of stmt in ns
+def time_stmt(stmt, obj):
+    return(min(repeat(stmt, globals={'c': obj}, number=N_ITER,
+                      repeat=5))*1e9/N_ITER)
+
+
+# %% MAIN SCRIPT
+if(__name__ == '__main__'):
+    # Check that the benchmark is executed with at least two ranks
+    if(size < 2):
+        raise RuntimeError("This benchmark requires at least 2 MPI ranks!")
+
+    # Define the statements to benchmark
+    stmts = {
+        'method access': "c.Get_rank",
+        'method call': "c.Get_rank()",
+        'property access': "c.rank",
+        'overridden access': "c.bcast",
+        'missing attribute': "getattr(c, 'missing', None)"}
+
+    # Perform benchmark on the first rank only
+    if not rank:
+        print("%18s %10s %12s %8s" % ("statement", "raw (ns)", "hybrid (ns)",
+                                      "ratio"))
+        for name, stmt in stmts.items():
+            t_raw = time_stmt(stmt, comm)
+            t_hybrid = time_stmt(stmt, h_comm)
+            print("%18s %10.1f %12.1f %8.2f" % (name, t_raw, t_hybrid,
+                                                t_hybrid/t_raw))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compression Benchmark
+=====================
+Measures the time of :meth:`~HybridComm.bcast` and :meth:`~HybridComm.gather`
+with and without payload compression for data sets of various
+compressibility, and reports the speedup that every codec gives over the raw
+path.
+
+Compression trades CPU time for transferred bytes, so it only pays off if the
+communication is bandwidth-bound. As local communication is not, the
+benchmark runs on the thread backend with a simulated bandwidth, by delaying
+every buffer communication for the time it would take to transfer its bytes.
+Must be executed without MPI::
+
+    python benchmarks/bench_compression.py
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from time import perf_counter, sleep
+
+# Package imports
+import numpy as np
+
+# mpi4pyd imports
+from mpi4pyd import threadMPI
+from mpi4pyd._backend import get_buffer
+from mpi4pyd.MPI import get_HybridComm_obj
+from mpi4pyd.MPI._compression import CODECS
+
+# Original buffer communication methods of the thread backend
+Comm = threadMPI.Comm
+base_Bcast, base_Gatherv, base_isend = Comm.Bcast, Comm.Gatherv, Comm._isend
+
+
+# %% FUNCTION DEFINITIONS
+# Function that delays all buffer communications for the given bandwidth
+def simulate_bandwidth(bandwidth):
+    # Bcast is delayed for the bytes that every rank receives
+    def Bcast(self, buf, root=0):
+        sleep(get_buffer(buf)[0].nbytes/bandwidth)
+        base_Bcast(self, buf, root)
+
+    # Gatherv is delayed for the bytes that root receives from all ranks
+    def Gatherv(self, sendbuf, recvbuf, root=0):
+        sleep(self._collect(get_buffer(sendbuf)[0].nbytes, sum)/bandwidth)
+        base_Gatherv(self, sendbuf, recvbuf, root)
+
+    # Point-to-point messages are delayed for their own bytes
+    def _isend(self, buf, dest, tag):
+        sleep(get_buffer(buf)[0].nbytes/bandwidth)
+        return(base_isend(self, buf, dest, tag))
+
+    Comm.Bcast, Comm.Gatherv, Comm._isend = Bcast, Gatherv, _isend
+
+
+# Function that returns the mean times of bcast and gather in every rank
+def time_collectives(obj, codec, n_iter):
+    h_comm = get_HybridComm_obj(threadMPI.COMM_WORLD)
+    compression = codec or False
+    times = []
+    for func in (lambda: h_comm.bcast(obj, 0, compression=compression),
+                 lambda: h_comm.gather(obj, 0, compression=compression)):
+        func()
+        h_comm.Barrier()
+        t = perf_counter()
+        for _ in range(n_iter):
+            func()
+        h_comm.Barrier()
+        times.append((perf_counter()-t)/n_iter)
+    return(times)
+
+
+# %% MAIN SCRIPT
+if(__name__ == '__main__'):
+    # Define the data sets of various compressibility
+    n = 10**5
+    sparse = np.zeros(n)
+    sparse[::20] = np.random.rand(n//20)
+    data = {
+        'random': np.random.rand(n),
+        'sparse': sparse,
+        'text': {'labels': ["parameter_%i" % (i % 100) for i in range(n//10)],
+                 'units': ['m/s']*(n//10)}}
+
+    # Print table header
+    print("%8s %10s %6s %11s %11s %8s" % (
+        "data", "bw (MB/s)", "codec", "bcast (ms)", "gather (ms)",
+        "speedup"))
+
+    # Perform benchmark for every bandwidth, data set and codec
+    for bandwidth in [10**7, 10**8, 10**9, 10**10]:
+        simulate_bandwidth(bandwidth)
+        for name, obj in data.items():
+            raw = None
+            for codec in [None]+sorted(CODECS):
+                times = threadMPI.run(4, time_collectives, obj, codec, 3)[0]
+                raw = raw or sum(times)
+                print("%8s %10i %6s %11.2f %11.2f %8.2f" % (
+                    name, bandwidth//10**6, codec or 'raw', times[0]*1e3,
+                    times[1]*1e3, raw/sum(times)))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+DummyMPI Copy Benchmark
+=======================
+Measures the time and peak memory usage of the collective methods of
+:obj:`mpi4pyd.dummyMPI.COMM_WORLD` for NumPy arrays of various sizes, using the
+previous recursive copies (:func:`~copy.deepcopy`), the default array copies
+and the zero-copy mode (:attr:`~mpi4pyd.dummyMPI.Comm.zero_copy`).
+
+Must be executed serially::
+
+    python benchmarks/bench_dummyMPI.py
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from copy import deepcopy
+from time import perf_counter
+import tracemalloc
+
+# Package imports
+import numpy as np
+
+# mpi4pyd imports
+from mpi4pyd.dummyMPI import COMM_WORLD as comm
+
+
+# %% FUNCTION DEFINITIONS
+# Function that returns the mean time in ms and peak memory in MiB of func
+def measure(func, array, n_iter):
+    func(array)
+    t = perf_counter()
+    for _ in range(n_iter):
+        func(array)
+    t = (perf_counter()-t)/n_iter
+
+    # Measure the memory allocated by a single call
+    tracemalloc.start()
+    func(array)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return(t*1e3, peak/2**20)
+
+
+# %% MAIN SCRIPT
+if(__name__ == '__main__'):
+    # Define the methods to benchmark
+    methods = {
+        'Gather': lambda array: comm.Gather(array, None),
+        'Allreduce': lambda array: comm.Allreduce(array, None),
+        'reduce': lambda array: comm.reduce(array)}
+
+    # Print table header
+    print("%10s %10s %22s %22s %22s" % (
+        "method", "n_elements", "deepcopy (ms / MiB)", "copy (ms / MiB)",
+        "zero-copy (ms / MiB)"))
+
+    # Perform benchmark for every method and array size
+    for name, func in methods.items():
+        for n in [10**2, 10**4, 10**6, 10**7]:
+            array = np.random.rand(n)
+            n_iter = max(5, min(10000, 10**8//n))
+
+            # Measure the previous deepcopy, which all modes are compared to
+            results = [measure(deepcopy, array, n_iter)]
+
+            # Measure both modes of comm
+            for zero_copy in (False, True):
+                comm.zero_copy = zero_copy
+                results.append(measure(func, array, n_iter))
+            comm.zero_copy = False
+
+            # Print results
+            print("%10s %10i %22s %22s %22s" % (
+                name, n, *["%9.4f / %8.2f" % result for result in results]))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Send/Recv Benchmark
+===================
+Measures the round-trip latency of :meth:`~HybridComm.send` and
+:meth:`~HybridComm.recv` for NumPy arrays of various sizes, and compares it
+with the latency of the previous three-message protocol (pickled buffer flag,
+pickled shape and dtype, followed by the data).
+
+The gain of the header protocol grows with the latency of a single message,
+so it is most pronounced on inter-node links.
+Must be executed with exactly two MPI ranks::
+
+    mpiexec -n 2 python benchmarks/bench_sendrecv.py
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from time import perf_counter
+
+# Package imports
+import numpy as np
+
+# mpi4pyd imports
+from mpi4pyd import MPI
+from mpi4pyd.MPI import HYBRID_COMM_WORLD as h_comm
+
+# Obtain communicator, rank and size
+comm = MPI.COMM_WORLD
+rank = comm.Get_rank()
+size = comm.Get_size()
+
+
+# %% FUNCTION DEFINITIONS
+# Send function using the previous three-message protocol
+def legacy_send(obj, dest, tag=0):
+    comm.send(True, dest=dest, tag=tag)
+    comm.send([obj.shape, obj.dtype], dest=dest, tag=tag)
+    comm.Send(obj, dest=dest, tag=tag)
+
+
+# Recv function using the previous three-message protocol
+def legacy_recv(source, tag=0):
+    comm.recv(source=source, tag=tag)
+    obj = np.empty(*comm.recv(source=source, tag=tag))
+    comm.Recv(obj, source=source, tag=tag)
+    return(obj)
+
+
+# Function that returns the mean round-trip time of the given send and recv
+def ping_pong(send, recv, array, n_iter):
+    comm.Barrier()
+    t = perf_counter()
+    for _ in range(n_iter):
+        if not rank:
+            send(array, 1)
+            recv(1)
+        else:
+            send(recv(0), 0)
+    return((perf_counter()-t)/n_iter)
+
+
+# %% MAIN SCRIPT
+if(__name__ == '__main__'):
+    # Check that the benchmark is executed with two ranks
+    if(size != 2):
+        raise RuntimeError("This benchmark requires exactly 2 MPI ranks!")
+
+    # Define the send and recv functions of both protocols
+    protocols = {
+        'legacy': (legacy_send, legacy_recv),
+        'hybrid': (lambda obj, dest: h_comm.send(obj, dest),
+                   lambda source: h_comm.recv(source=source))}
+
+    # Print table header
+    if not rank:
+        print("%10s %14s %14s %8s" % ("n_elements", "legacy (us)",
+                                      "hybrid (us)", "speedup"))
+
+    # Perform benchmark for every array size
+    for n in [1, 10, 100, 1000, 10**4, 10**5, 10**6]:
+        array = np.random.rand(n)
+        n_iter = max(10, min(5000, 10**7//max(n, 1)//10))
+        times = {}
+        for name, (send, recv) in protocols.items():
+            ping_pong(send, recv, array, 5)
+            times[name] = ping_pong(send, recv, array, n_iter)*1e6/2
+        if not rank:
+            print("%10i %14.2f %14.2f %8.2f" % (
+                n, times['legacy'], times['hybrid'],
+                times['legacy']/times['hybrid']))
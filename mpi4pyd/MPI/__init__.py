@@ -5,19 +5,37 @@ MPI
 ===
 Module that automatically picks the correct MPI module based on whether or not
 the :mod:`mpi4py.MPI` module is available.
+If the process was started with the :mod:`mpi4pyd.run` launcher, the
+:mod:`mpi4pyd.localMPI` module is used instead.
+Otherwise, if the ``MPI4PYD_BACKEND`` environment variable is set to
+``'thread'``, the :mod:`mpi4pyd.threadMPI` module is used.
 
 """
 
 
 # %% IMPORTS
+# Built-in imports
+import os
+import sys
+from types import ModuleType
+
 # MPI import
-try:
-    from mpi4py import MPI as _MPI
-    from mpi4py.MPI import *
-except ImportError:
-    from mpi4pyd import dummyMPI as _MPI
-    from mpi4pyd.dummyMPI import *
+if 'MPI4PYD_LOCAL_SIZE' in os.environ:
+    from mpi4pyd import localMPI as _MPI
+    from mpi4pyd.localMPI import *
+elif(os.environ.get('MPI4PYD_BACKEND') == 'thread'):
+    from mpi4pyd import threadMPI as _MPI
+    from mpi4pyd.threadMPI import *
+else:
+    try:
+        from mpi4py import MPI as _MPI
+        from mpi4py.MPI import *
+    except ImportError:
+        from mpi4pyd import dummyMPI as _MPI
+        from mpi4pyd.dummyMPI import *
 from . import _hybrid_comm
+from ._buffer_pool import BufferPool
+from ._compression import register_codec
 from ._hybrid_comm import *
 
 # All declaration
@@ -27,6 +45,29 @@ if(_MPI.__package__ == 'mpi4py'):
 else:
     __all__.extend(_MPI.__all__)
 __all__.extend(_hybrid_comm.__all__)
+__all__.extend(['BufferPool', 'register_codec'])
+
+
+# %% THREAD BACKEND
+# The thread backend has different communicators in every rank thread
+if(_MPI.__name__ == 'mpi4pyd.threadMPI'):
+    del COMM_WORLD, COMM_SELF, HYBRID_COMM_WORLD, HYBRID_COMM_SELF
+
+    # Make module class that returns the communicators of the current rank
+    # thread
+    class _ThreadModule(ModuleType):
+        def __getattr__(self, name):
+            if name in ('COMM_WORLD', 'COMM_SELF'):
+                return(getattr(_MPI, name))
+            elif name in ('HYBRID_COMM_WORLD', 'HYBRID_COMM_SELF'):
+                return(get_HybridComm_obj(getattr(_MPI, name[7:])))
+            else:
+                raise AttributeError("module %r has no attribute %r"
+                                     % (_MPI.__name__, name))
+
+    # Use it as the class of this module, as a module-level __getattr__
+    # requires Python 3.7
+    sys.modules[__name__].__class__ = _ThreadModule
 
 # Name and package declaration
 __name__ = getattr(_MPI, '__name__', None)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Buffer Pool
+===========
+Provides a pool of reusable NumPy arrays, which are used as temporary buffers
+for communications.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from collections import OrderedDict
+from threading import Lock
+
+# Package imports
+import numpy as np
+
+# All declaration
+__all__ = ['BufferPool']
+
+
+# %% CLASS DEFINITIONS
+# Class that keeps temporary buffer arrays around for reuse
+class BufferPool(object):
+    """
+    Pool of reusable NumPy arrays, keyed by their shape and data type.
+
+    Arrays are obtained with :meth:`~acquire` and given back with
+    :meth:`~release`. Released arrays are kept in the pool until the total
+    number of bytes they take up exceeds :attr:`~max_bytes`, after which the
+    least recently used arrays are discarded.
+
+    """
+
+    def __init__(self, max_bytes=2**26):
+        """
+        Initialize an instance of the :class:`~BufferPool` class.
+
+        Optional
+        --------
+        max_bytes : int. Default: 2**26
+            The maximum number of bytes that released arrays in the pool can
+            take up in total.
+
+        """
+
+        # Save provided max_bytes
+        self._max_bytes = int(max_bytes)
+
+        # Initialize dict of released arrays and their total size
+        self._buffers = OrderedDict()
+        self._nbytes = 0
+
+        # Initialize lock that protects the pool
+        self._lock = Lock()
+
+    # %% CLASS PROPERTIES
+    @property
+    def max_bytes(self):
+        """
+        int: The maximum number of bytes that released arrays in the pool can
+        take up in total.
+
+        """
+
+        return(self._max_bytes)
+
+    @property
+    def nbytes(self):
+        """
+        int: The number of bytes that released arrays in the pool currently
+        take up in total.
+
+        """
+
+        return(self._nbytes)
+
+    # %% CLASS METHODS
+    # This function returns an array with the given shape and dtype
+    def acquire(self, shape, dtype):
+        """
+        Returns an uninitialized C-contiguous array with the given `shape` and
+        `dtype`, reusing a released array from the pool if possible.
+
+        """
+
+        # Obtain the key of the requested array
+        shape = (shape,) if isinstance(shape, (int, np.integer)) else shape
+        key = (tuple(map(int, shape)), np.dtype(dtype))
+
+        # Take a released array with this key from the pool if there is one
+        with self._lock:
+            buffers = self._buffers.get(key)
+            if buffers:
+                arr = buffers.pop()
+                self._nbytes -= arr.nbytes
+                if not buffers:
+                    del self._buffers[key]
+                return(arr)
+
+        # Else, create a new array
+        return(np.empty(*key))
+
+    # This function returns arrays to the pool
+    def release(self, *arrs):
+        """
+        Returns the provided `arrs`, which were obtained with
+        :meth:`~acquire`, to the pool, such that they can be reused.
+        The arrays must not be used by the caller afterward.
+
+        """
+
+        with self._lock:
+            # Add all arrays that fit in the pool as most recently used
+            for arr in arrs:
+                if(arr.nbytes > self._max_bytes):
+                    continue
+                key = (arr.shape, arr.dtype)
+                self._buffers.setdefault(key, []).append(arr)
+                self._buffers.move_to_end(key)
+                self._nbytes += arr.nbytes
+
+            # Discard least recently used arrays until the pool fits again
+            while(self._nbytes > self._max_bytes):
+                key, buffers = self._buffers.popitem(last=False)
+                self._nbytes -= sum(arr.nbytes for arr in buffers)
+
+    # This function empties the pool
+    def clear(self):
+        """
+        Discards all released arrays in the pool.
+
+        """
+
+        with self._lock:
+            self._buffers.clear()
+            self._nbytes = 0
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compression
+===========
+Provides the codecs that payloads can be compressed with before they are
+communicated.
+The :mod:`zlib` and :mod:`lzma` codecs are always available, while the
+``'lz4'`` and ``'zstd'`` codecs are available if the :mod:`lz4` and
+:mod:`zstandard` packages are installed. Other codecs can be added with
+:func:`~register_codec`.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+import lzma
+from threading import local
+import zlib
+
+# Package imports
+import numpy as np
+
+# Optional package imports
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+# All declaration
+__all__ = ['CODECS', 'check_codec', 'compress_payload', 'decompress_payload',
+           'register_codec']
+
+
+# %% GLOBALS
+# Available codecs, mapping their names to their ID, compress and decompress
+# functions. The ID of a codec is stored in every payload compressed with it,
+# and must therefore be the same on all MPI ranks
+CODECS = {}
+
+# Names of the built-in codecs, by ID
+_BUILTIN_CODECS = {1: 'zlib', 2: 'lzma', 3: 'lz4', 4: 'zstd'}
+
+# Compressor and decompressor objects of the zstd codec of every thread, as
+# they cannot be used by several threads at once
+_zstd_objs = local()
+
+
+# %% FUNCTION DEFINITIONS
+# This function adds a codec that payloads can be compressed with
+def register_codec(name, codec_id, compress, decompress):
+    """
+    Registers a codec with the given `name`, which can afterward be used for
+    compressing payloads.
+
+    Parameters
+    ----------
+    name : str
+        The name of the codec.
+    codec_id : int
+        The integer identifier of the codec, which is stored in every payload
+        compressed with it. Must be between 16 and 255, as lower values are
+        reserved for the built-in codecs, and must be the same on all MPI
+        ranks.
+    compress : function
+        Function that takes a bytes-like object and returns its compressed
+        bytes.
+    decompress : function
+        Function that takes the bytes-like object returned by `compress` and
+        returns the original bytes.
+
+    """
+
+    # Check if codec_id is valid and not in use
+    if not 16 <= codec_id <= 255:
+        raise ValueError("Input argument 'codec_id' must be an integer "
+                         "between 16 and 255!")
+    if any(codec_id == codec[0] for key, codec in CODECS.items()
+           if key != name):
+        raise ValueError("Codec ID %i is already in use!" % (codec_id))
+
+    # Add the codec
+    CODECS[name] = (codec_id, compress, decompress)
+
+
+# This function checks if a codec is available
+def check_codec(name):
+    """
+    Checks if the codec with the given `name` is available, and returns it.
+
+    """
+
+    # Raise error if the codec does not exist
+    if name not in CODECS:
+        raise ValueError("Input argument 'compression' must be one of %s!"
+                         % (sorted(CODECS)))
+
+    # Return name
+    return(name)
+
+
+# This function compresses a message with a codec
+def compress_payload(msg, name):
+    """
+    Compresses the provided bytes-like `msg` with the codec of the given
+    `name`, and returns a 1D :obj:`~numpy.uint8` array holding the ID of the
+    codec followed by the compressed bytes.
+
+    """
+
+    # Compress msg
+    codec_id, compress, _ = CODECS[name]
+    data = compress(msg)
+
+    # Prepend the codec ID
+    payload = np.empty(len(data)+1, dtype=np.uint8)
+    payload[0] = codec_id
+    payload[1:] = np.frombuffer(data, dtype=np.uint8)
+    return(payload)
+
+
+# This function decompresses a payload created by compress_payload
+def decompress_payload(payload):
+    """
+    Decompresses the provided `payload` that was created by
+    :func:`~compress_payload`, and returns the original message as a
+    :obj:`bytearray`.
+
+    """
+
+    # Find the codec that compressed payload
+    payload = memoryview(payload).cast('B')
+    for name, (codec_id, _, decompress) in CODECS.items():
+        if(codec_id == payload[0]):
+            break
+
+    # Raise error if it is not available on this rank
+    else:
+        raise ValueError("Received a payload compressed with codec %r, "
+                         "which is not available!"
+                         % (_BUILTIN_CODECS.get(payload[0], payload[0])))
+
+    # Decompress payload
+    return(bytearray(decompress(payload[1:])))
+
+
+# This function compresses a message with zstd
+def _zstd_compress(msg):
+    # Create the compressor of this thread if it does not exist yet
+    if not hasattr(_zstd_objs, 'compressor'):
+        _zstd_objs.compressor = zstd.ZstdCompressor(level=1)
+
+    # Compress msg
+    return(_zstd_objs.compressor.compress(msg))
+
+
+# This function decompresses a message with zstd
+def _zstd_decompress(data):
+    # Create the decompressor of this thread if it does not exist yet
+    if not hasattr(_zstd_objs, 'decompressor'):
+        _zstd_objs.decompressor = zstd.ZstdDecompressor()
+
+    # Decompress data
+    return(_zstd_objs.decompressor.decompress(data))
+
+
+# %% CODEC REGISTRATION
+# Fast compression levels are used, as these are meant for communication
+CODECS['zlib'] = (1, lambda msg: zlib.compress(msg, 1), zlib.decompress)
+CODECS['lzma'] = (2, lambda msg: lzma.compress(msg, preset=0),
+                  lzma.decompress)
+if lz4 is not None:
+    CODECS['lz4'] = (3, lz4.compress, lz4.decompress)
+if zstd is not None:
+    CODECS['zstd'] = (4, _zstd_compress, _zstd_decompress)
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+
+"""
+Datatypes
+=========
+Provides the conversion of NumPy data types to MPI datatypes.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+
+# Package imports
+import numpy as np
+
+# mpi4pyd imports
+from mpi4pyd import MPI
+
+# All declaration
+__all__ = ['STRIDED_CACHE_SIZE', 'buffer_msg', 'get_mpi_datatype',
+           'get_strided_datatype', 'release_strided_datatype', 'strided_msg']
+
+
+# %% GLOBALS
+# Maximum number of strided datatypes that are kept in the cache
+STRIDED_CACHE_SIZE = 128
+
+# Initialize cache of strided datatypes, the datatypes that are in use with
+# their number of uses and key, and the lock that protects both
+_strided_types = OrderedDict()
+_strided_uses = {}
+_strided_lock = Lock()
+
+
+# %% FUNCTION DEFINITIONS
+# This function checks if a predefined MPI datatype can be used
+def _is_valid(datatype):
+    # Datatypes unsupported by the MPI library raise an error when used
+    try:
+        datatype.Get_size()
+    except Exception:
+        return(False)
+    else:
+        return(True)
+
+
+# This function creates the dict of predefined MPI datatypes
+def _get_basic_types():
+    # Make dict of MPI datatypes for every NumPy dtype kind and itemsize
+    types = {
+        ('b', 1): MPI.C_BOOL,
+        ('i', 1): MPI.INT8_T,
+        ('i', 2): MPI.INT16_T,
+        ('i', 4): MPI.INT32_T,
+        ('i', 8): MPI.INT64_T,
+        ('u', 1): MPI.UINT8_T,
+        ('u', 2): MPI.UINT16_T,
+        ('u', 4): MPI.UINT32_T,
+        ('u', 8): MPI.UINT64_T,
+        ('f', 4): MPI.FLOAT,
+        ('f', 8): MPI.DOUBLE,
+        ('c', 8): MPI.C_FLOAT_COMPLEX,
+        ('c', 16): MPI.C_DOUBLE_COMPLEX,
+        ('M', 8): MPI.INT64_T,
+        ('m', 8): MPI.INT64_T}
+
+    # Add extended precision types if they differ from double precision
+    types.setdefault(('f', np.dtype(np.longdouble).itemsize),
+                     MPI.LONG_DOUBLE)
+    types.setdefault(('c', np.dtype(np.clongdouble).itemsize),
+                     MPI.C_LONG_DOUBLE_COMPLEX)
+
+    # Add half precision type if the MPI library supports it
+    float16 = getattr(MPI, 'FLOAT16_T', MPI.DATATYPE_NULL)
+    if _is_valid(float16):
+        types[('f', 2)] = float16
+
+    # Return types
+    return(types)
+
+
+# Make dict of predefined MPI datatypes
+_BASIC_TYPES = _get_basic_types()
+
+
+# This function returns the MPI datatype of a NumPy dtype
+@lru_cache(maxsize=None)
+def get_mpi_datatype(dtype):
+    """
+    Returns the MPI datatype that describes a single element of the provided
+    NumPy `dtype`.
+
+    Integer, unsigned integer, floating point, complex, boolean, datetime and
+    timedelta dtypes are mapped onto their predefined MPI datatypes.
+    Byte and unicode strings are mapped onto contiguous datatypes of
+    :obj:`~MPI.CHAR` and :obj:`~MPI.UINT32_T`, respectively.
+    Structured dtypes are mapped onto derived struct datatypes, which are
+    created from the datatypes of their fields.
+    Any other dtype without fields is treated as a contiguous sequence of
+    :obj:`~MPI.BYTE`.
+
+    All derived datatypes are committed and cached, such that the same
+    :obj:`~MPI.Datatype` object is returned for the same `dtype`.
+
+    Parameters
+    ----------
+    dtype : :obj:`~numpy.dtype`
+        The NumPy data type to convert.
+
+    Returns
+    -------
+    datatype : :obj:`~MPI.Datatype` object
+        The MPI datatype that describes `dtype`.
+
+    """
+
+    # Check if dtype can be represented by an MPI datatype
+    if dtype.hasobject:
+        raise TypeError("NumPy dtype %r cannot be represented by an MPI "
+                        "datatype!" % (dtype))
+
+    # PREDEFINED
+    datatype = _BASIC_TYPES.get((dtype.kind, dtype.itemsize))
+    if datatype is not None:
+        return(datatype)
+
+    # STRUCTURED
+    if dtype.fields is not None:
+        # Obtain the datatypes of all fields
+        blocklengths = []
+        displacements = []
+        datatypes = []
+        for name in dtype.names:
+            field, offset = dtype.fields[name][:2]
+
+            # Obtain the base dtype and number of elements of subarray fields
+            if field.subdtype is not None:
+                field, shape = field.subdtype
+                blocklengths.append(int(np.prod(shape)))
+            else:
+                blocklengths.append(1)
+            displacements.append(offset)
+            datatypes.append(get_mpi_datatype(field))
+
+        # Create struct datatype, taking padding into account
+        datatype = MPI.Datatype.Create_struct(
+            blocklengths, displacements, datatypes).Create_resized(
+                0, dtype.itemsize)
+
+    # STRINGS
+    elif(dtype.kind == 'S'):
+        datatype = MPI.CHAR.Create_contiguous(dtype.itemsize)
+    elif(dtype.kind == 'U'):
+        datatype = MPI.UINT32_T.Create_contiguous(dtype.itemsize//4)
+
+    # OTHER
+    else:
+        datatype = MPI.BYTE.Create_contiguous(dtype.itemsize)
+
+    # Commit and return datatype
+    return(datatype.Commit())
+
+
+# This function creates a buffer specification of a NumPy array
+def buffer_msg(arr, counts=None, displs=None):
+    """
+    Returns the buffer specification that can be used in uppercase
+    communication methods for the provided NumPy array `arr`, using the MPI
+    datatype given by :func:`~get_mpi_datatype`.
+
+    If `counts` and `displs` are provided, a buffer specification for
+    vector communication methods is returned instead.
+
+    """
+
+    # Return buffer specification
+    if counts is None:
+        return([arr, get_mpi_datatype(arr.dtype)])
+    else:
+        return([arr, (counts, displs), get_mpi_datatype(arr.dtype)])
+
+
+# This function removes unit axes and merges axes of a strided lay-out
+def _collapse_axes(shape, strides):
+    # Remove all axes with a single element
+    axes = [(n, s) for n, s in zip(shape, strides) if(n != 1)]
+
+    # Merge every axis into its predecessor if they describe a single axis
+    merged = []
+    for n, s in axes:
+        if merged and (merged[-1][1] == n*s):
+            merged[-1] = (merged[-1][0]*n, s)
+        else:
+            merged.append((n, s))
+
+    # Return collapsed shape and strides
+    return(tuple(n for n, _ in merged), tuple(s for _, s in merged))
+
+
+# This function marks a strided datatype as being in use
+def _acquire(datatype, key):
+    entry = _strided_uses.setdefault(id(datatype), [datatype, 0, key])
+    entry[1] += 1
+
+
+# This function returns the MPI datatype of a strided array lay-out
+def get_strided_datatype(dtype, shape, strides, acquire=False):
+    """
+    Returns the MPI datatype that describes the elements of a NumPy array with
+    the given `dtype`, `shape` and `strides` in C-order, relative to the
+    element with the lowest memory address.
+
+    The datatype is built from nested :meth:`~MPI.Datatype.Create_hvector`
+    datatypes, one for every axis. Axes with a single element are removed and
+    axes that can be described by a single stride are merged first.
+
+    All created datatypes are committed and kept in a least recently used
+    cache of at most :attr:`~STRIDED_CACHE_SIZE` datatypes, such that the same
+    :obj:`~MPI.Datatype` object is returned for the same lay-out.
+    Datatypes that are removed from the cache are freed, unless they are in
+    use, in which case they are freed once they are no longer used.
+
+    Parameters
+    ----------
+    dtype : :obj:`~numpy.dtype`
+        The NumPy data type of the array.
+    shape : tuple of int
+        The shape of the array.
+    strides : tuple of int
+        The strides of the array in bytes.
+
+    Optional
+    --------
+    acquire : bool. Default: False
+        Whether the returned datatype is in use until it is passed to
+        :func:`~release_strided_datatype`.
+
+    Returns
+    -------
+    datatype : :obj:`~MPI.Datatype` object
+        The MPI datatype that describes the lay-out of the array.
+
+    """
+
+    # Obtain the collapsed lay-out, which is used as the key of the cache
+    shape, strides = _collapse_axes(shape, strides)
+    key = (dtype, shape, strides)
+
+    # Return the cached datatype if it exists
+    with _strided_lock:
+        if key in _strided_types:
+            _strided_types.move_to_end(key)
+            if acquire:
+                _acquire(_strided_types[key], key)
+            return(_strided_types[key])
+
+    # Create a vector datatype for every axis, starting at the last one
+    datatype = get_mpi_datatype(dtype)
+    for n, s in zip(reversed(shape), reversed(strides)):
+        datatype = datatype.Create_hvector(n, 1, s)
+
+    # Shift datatype such that it starts at the lowest memory address
+    offset = -sum(n*s-s for n, s in zip(shape, strides) if(s < 0))
+    if offset:
+        datatype = MPI.Datatype.Create_struct([1], [offset], [datatype])
+    datatype.Commit()
+
+    # Add datatype to the cache, unless another thread added one already
+    with _strided_lock:
+        if key in _strided_types:
+            datatype.Free()
+            datatype = _strided_types[key]
+        else:
+            _strided_types[key] = datatype
+        if acquire:
+            _acquire(datatype, key)
+
+        # Remove the least recently used datatypes if the cache is full,
+        # freeing those that are not in use
+        while(len(_strided_types) > STRIDED_CACHE_SIZE):
+            old = _strided_types.popitem(last=False)[1]
+            if id(old) not in _strided_uses:
+                old.Free()
+
+    # Return datatype
+    return(datatype)
+
+
+# This function releases a strided datatype that is no longer used
+def release_strided_datatype(datatype):
+    """
+    Releases one use of the provided `datatype`, which was obtained with
+    :func:`~get_strided_datatype` using `acquire`.
+    If it is no longer used and was removed from the cache, it is freed.
+
+    """
+
+    with _strided_lock:
+        entry = _strided_uses[id(datatype)]
+        entry[1] -= 1
+        if not entry[1]:
+            del _strided_uses[id(datatype)]
+            if _strided_types.get(entry[2]) is not datatype:
+                datatype.Free()
+
+
+# This function creates a buffer specification of a strided NumPy array
+def strided_msg(arr):
+    """
+    Returns the buffer specification that describes the data of the provided
+    NumPy array `arr` in C-order without copying it, using the MPI datatype
+    given by :func:`~get_strided_datatype`.
+    This datatype is in use until it is passed to
+    :func:`~release_strided_datatype`, which must be done after the
+    communication has completed.
+
+    Returns *None* if the lay-out of `arr` cannot be described by a derived
+    datatype, in which case `arr` must be made contiguous instead.
+
+    """
+
+    # Derived datatypes can only be used with mpi4py and non-empty arrays
+    if(MPI.__package__ != 'mpi4py' or not arr.size or arr.dtype.hasobject):
+        return(None)
+
+    # Determine the span of memory in bytes that is covered by arr
+    span = arr.itemsize+sum(abs(s)*(n-1)
+                            for n, s in zip(arr.shape, arr.strides))
+
+    # Obtain a byte array over this span, starting at the lowest address
+    try:
+        first = arr[tuple(slice(-1, None) if(s < 0) else slice(0, 1)
+                          for s in arr.strides)]
+        first = first.view(np.uint8).reshape(-1)
+        memory = np.lib.stride_tricks.as_strided(first, (span,), (1,))
+        datatype = get_strided_datatype(arr.dtype, arr.shape, arr.strides,
+                                        acquire=True)
+    except Exception:
+        return(None)
+
+    # Return buffer specification
+    return([memory, 1, datatype])
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+"""
+Header Cache
+============
+Provides a cache of the headers that were recently communicated with a single
+MPI rank, which allows for repeated headers to be replaced by a small marker.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from collections import OrderedDict
+from struct import Struct
+from threading import Lock
+
+# Package imports
+from mpi4pyd.MPI._helpers import HDR_SAME
+
+# All declaration
+__all__ = ['HeaderCache']
+
+
+# %% GLOBALS
+# Index of a cached header, which follows the marker of a repeated header
+_INDEX = Struct('<q')
+
+# Index of a cached header, followed by the index of the header that was
+# evicted from the cache to make room for it and the number of messages that
+# were sent with the evicted header
+_TRAILER = Struct('<3q')
+
+
+# %% CLASS DEFINITIONS
+# Class that keeps the headers communicated with a single rank around for reuse
+class HeaderCache(object):
+    """
+    Cache of the last header that was sent to and received from a single MPI
+    rank with every tag.
+
+    Headers are sent with :meth:`~pack`, which replaces a header by the
+    :attr:`~mpi4pyd.MPI._helpers.HDR_SAME` marker followed by its index if it
+    is the same as the last header that was sent with the same tag.
+    The receiving rank recreates the headers with :meth:`~unpack`.
+    Headers are kept for at most :attr:`~max_size` tags, after which the
+    header of the least recently used tag is evicted.
+
+    As messages with different tags can be received in a different order than
+    they were sent in, the receiving rank cannot decide which header to evict
+    by itself. Instead, the sending rank tells it which header was evicted and
+    after how many messages, such that it is evicted once all of them have
+    been received.
+
+    """
+
+    def __init__(self, max_size=64):
+        """
+        Initialize an instance of the :class:`~HeaderCache` class.
+
+        Optional
+        --------
+        max_size : int. Default: 64
+            The maximum number of tags that headers are sent with that are
+            kept in the cache.
+
+        """
+
+        # Save provided max_size
+        self._max_size = int(max_size)
+
+        # Initialize dict of the header, index and number of messages of every
+        # tag that headers were sent with, and the index of the next header
+        self._sent = OrderedDict()
+        self._n_sent = 0
+
+        # Initialize dict of the header, number of messages and number of
+        # messages after which it is evicted of every received index
+        self._received = {}
+
+        # Initialize lock that protects the cache
+        self._lock = Lock()
+
+    # %% CLASS PROPERTIES
+    @property
+    def max_size(self):
+        """
+        int: The maximum number of tags that headers are sent with that are
+        kept in the cache.
+
+        """
+
+        return(self._max_size)
+
+    @property
+    def size(self):
+        """
+        int: The number of sent and received headers that are currently kept
+        in the cache.
+
+        """
+
+        return(len(self._sent)+len(self._received))
+
+    # %% CLASS METHODS
+    # This function returns the message that must be sent for a header
+    def pack(self, tag, header):
+        """
+        Returns the message that must be sent instead of the provided `header`
+        of a message with `tag`, which must be read with :meth:`~unpack` by
+        the receiving rank.
+
+        """
+
+        with self._lock:
+            # If a header was sent with tag before, count this message
+            entry = self._sent.get(tag)
+            evicted = (-1, 0)
+            if entry is not None:
+                self._sent.move_to_end(tag)
+                entry[2] += 1
+
+                # Send the marker if the header is the same as last time
+                if(entry[0] == header):
+                    return(HDR_SAME+_INDEX.pack(entry[1]))
+                entry[0] = header
+
+            # Else, add the header for tag, evicting the least recently used
+            # one if the cache is full
+            else:
+                if(len(self._sent) >= self._max_size):
+                    _, (_, *evicted) = self._sent.popitem(last=False)
+                entry = self._sent[tag] = [header, self._n_sent, 1]
+                self._n_sent += 1
+
+            # Send the header with its index and the evicted header
+            return(b''.join([header, _TRAILER.pack(entry[1], *evicted)]))
+
+    # This function returns the header of a message created by pack
+    def unpack(self, msg):
+        """
+        Returns the header that the provided `msg`, which was created by
+        :meth:`~pack` of the sending rank, stands for.
+
+        """
+
+        with self._lock:
+            # Obtain the cached header if msg is a marker
+            if(msg[:len(HDR_SAME)] == HDR_SAME):
+                index, = _INDEX.unpack_from(msg, len(HDR_SAME))
+                header = None
+
+            # Else, remove the trailer from the header and record the evicted
+            # header
+            else:
+                header = bytes(msg[:-_TRAILER.size])
+                index, *evicted = _TRAILER.unpack_from(msg, len(header))
+                if(evicted[0] >= 0):
+                    self._evict(*evicted)
+
+            # Count this message for the header, evicting it if it is the
+            # last one that was sent with it
+            entry = self._received.setdefault(index, [None, 0, None])
+            if header is not None:
+                entry[0] = header
+            self._evict(index, None)
+            return(entry[0])
+
+    # This function evicts a received header after a number of messages
+    def _evict(self, index, n_msgs):
+        """
+        Counts a message for the header with `index` if `n_msgs` is *None*, or
+        marks it to be evicted after `n_msgs` messages otherwise.
+        The header is evicted once both are equal.
+
+        """
+
+        entry = self._received.setdefault(index, [None, 0, None])
+        if n_msgs is None:
+            entry[1] += 1
+        else:
+            entry[2] = n_msgs
+        if(entry[1] == entry[2]):
+            del self._received[index]
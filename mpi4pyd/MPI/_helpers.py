@@ -7,22 +7,502 @@ Helpers
 """
 
 # %% IMPORTS
+# Built-in imports
+from array import array, typecodes
+from ast import literal_eval
+from functools import lru_cache
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from struct import Struct, pack, unpack_from
+
 # Package imports
 import numpy as np
 
 # All declaration
-__all__ = ['is_buffer_obj']
+__all__ = ['CHUNK_SIZE', 'HDR_ARRAY', 'HDR_BATCH', 'HDR_BYTEARRAY',
+           'HDR_BYTES', 'HDR_CACHED', 'HDR_COMPRESSED', 'HDR_INLINE',
+           'HDR_MEMORYVIEW', 'HDR_NDARRAY', 'HDR_PICKLE', 'HDR_SAME',
+           'INLINE_LIMIT',
+           'MAX_BATCH', 'as_buffer_array', 'empty_buffer', 'finish_buffer',
+           'fits_buffer', 'get_buffer_kind', 'get_chunk_slices',
+           'is_buffer_obj', 'pack_batch', 'pack_header', 'pack_inline',
+           'pickle_parts', 'unpack_batch', 'unpack_header', 'unpack_inline',
+           'unpickle_parts']
+
+
+# %% GLOBALS
+# Header kinds, describing what the payload of a message represents
+HDR_PICKLE = 0
+HDR_NDARRAY = 1
+HDR_BYTES = 2
+HDR_BYTEARRAY = 3
+HDR_ARRAY = 4
+HDR_MEMORYVIEW = 5
+
+# Header kind of a message that contains several other messages
+HDR_BATCH = 6
+
+# Header kind of a payload that holds another message in compressed form
+HDR_COMPRESSED = 7
+
+# Header flags
+HDR_INLINE = 1
+HDR_CACHED = 2
+
+# Marker that replaces a header that is the same as the last header that was
+# communicated between the same MPI ranks. As headers are padded to a multiple
+# of 16 bytes, messages holding it can never be mistaken for one
+HDR_SAME = b'\xff'
+
+# Payloads of at most this many bytes are folded into the header message
+INLINE_LIMIT = 16384
+
+# Maximum number of messages in a single batch message
+MAX_BATCH = 255
+
+# Default maximum number of elements that is communicated in a single call
+CHUNK_SIZE = 2**30
+
+# Fixed-size part of a header: kind, flags, ndim and length of dtype descr
+_HEADER = Struct('<BBBxI')
+
+# Alignment of the header, such that inlined payloads are aligned as well
+_HEADER_ALIGN = 16
+
+# Maximum number of parts of a pickled payload, as the number of dimensions
+# of a header is stored in a single byte
+_MAX_PARTS = 255
+
+# Header kinds of buffer objects with a specific type
+_BUFFER_KINDS = {
+    bytes: HDR_BYTES,
+    bytearray: HDR_BYTEARRAY,
+    array: HDR_ARRAY}
+
+# Typecodes of array.array objects for every NumPy dtype they can represent
+_ARRAY_TYPECODES = {np.dtype(code): code for code in typecodes
+                    if code not in 'uw'}
 
 
 # %% FUNCTION DEFINITIONS
+# This function determines the header kind of a provided object
+def get_buffer_kind(obj):
+    """
+    Returns the header kind that describes how the provided `obj` is
+    communicated.
+
+    NumPy arrays, :obj:`bytes`, :obj:`bytearray` and :obj:`array.array`
+    objects have their own kind, such that they are recreated as the same type
+    when received. Any other object that supports the buffer protocol with an
+    item format that NumPy understands is of kind :attr:`~HDR_MEMORYVIEW`,
+    and is received as a :obj:`memoryview`. All remaining objects, including
+    NumPy scalars and arrays holding Python objects, are of kind
+    :attr:`~HDR_PICKLE`.
+
+    """
+
+    # NumPy arrays, unless they hold Python objects
+    if isinstance(obj, np.ndarray):
+        return(HDR_PICKLE if obj.dtype.hasobject else HDR_NDARRAY)
+
+    # Objects that do not support the buffer protocol in a usable way
+    try:
+        arr = np.asarray(memoryview(obj))
+    except (TypeError, ValueError):
+        return(HDR_PICKLE)
+    if isinstance(obj, np.generic) or arr.dtype.hasobject:
+        return(HDR_PICKLE)
+
+    # Objects of a type that can be recreated
+    kind = _BUFFER_KINDS.get(type(obj), HDR_MEMORYVIEW)
+    if(kind == HDR_ARRAY and arr.dtype not in _ARRAY_TYPECODES):
+        return(HDR_PICKLE)
+    return(kind)
+
+
 # This function checks whether a provided object exposes its internal buffer
 def is_buffer_obj(obj):
     """
     Checks if the provided `obj` exposes its internal buffer and can be used in
     uppercase communication methods.
-    Currently, only NumPy arrays are seen as buffer objects.
+    All objects that support the buffer protocol are seen as buffer objects,
+    unless their items cannot be described by a NumPy dtype.
+
+    """
+
+    # Check if provided obj is not pickled
+    return(get_buffer_kind(obj) != HDR_PICKLE)
+
+
+# This function returns a NumPy array that shares the buffer of an object
+def as_buffer_array(obj):
+    """
+    Returns a NumPy array that shares the memory of the provided buffer object
+    `obj`, using the format, itemsize, shape and strides it exports.
+
+    """
+
+    # Return obj itself if it is already a NumPy array
+    if isinstance(obj, np.ndarray):
+        return(obj)
+    else:
+        return(np.asarray(memoryview(obj)))
+
+
+# This function creates an uninitialized buffer object of a given kind
+def empty_buffer(kind, shape, dtype):
+    """
+    Creates an uninitialized buffer object of the given `kind` that holds
+    data with the given `shape` and `dtype`.
+
+    As :obj:`bytes` objects are immutable, a :obj:`bytearray` is created for
+    :attr:`~HDR_BYTES` instead, which must be converted afterward with
+    :func:`~finish_buffer`.
+
+    Returns
+    -------
+    obj : object
+        The created buffer object.
+    arr : :obj:`~numpy.ndarray`
+        A NumPy array that shares the memory of `obj`, in which its data can
+        be written.
+
+    """
+
+    # Create the buffer object of the requested kind and a NumPy array of it
+    if kind in (HDR_BYTES, HDR_BYTEARRAY):
+        obj = bytearray(int(np.prod(shape)))
+        arr = np.frombuffer(obj, dtype)
+    elif(kind == HDR_ARRAY):
+        obj = array(_ARRAY_TYPECODES[dtype], [0])*int(np.prod(shape))
+        arr = np.frombuffer(obj, dtype)
+    else:
+        obj = arr = np.empty(shape, dtype=dtype)
+
+    # Memoryviews are returned as such
+    if(kind == HDR_MEMORYVIEW):
+        obj = memoryview(arr)
+
+    # Return obj and arr
+    return(obj, arr)
+
+
+# This function completes a buffer object created by empty_buffer
+def finish_buffer(kind, obj):
+    """
+    Returns the final version of the buffer object `obj` of the given `kind`
+    that was created by :func:`~empty_buffer`, after its data was written.
+
+    """
+
+    return(bytes(obj) if(kind == HDR_BYTES) else obj)
+
+
+# This function checks whether an array can be received into directly
+def fits_buffer(obj, shape, dtype):
+    """
+    Checks if the provided `obj` is a writeable C-contiguous NumPy array with
+    the given `shape` and `dtype`, such that a NumPy array with this `shape`
+    and `dtype` can be received into it directly.
+
+    """
+
+    return(isinstance(obj, np.ndarray) and obj.shape == tuple(shape) and
+           obj.dtype == dtype and obj.flags.c_contiguous and
+           obj.flags.writeable)
+
+
+# This function pickles an object with its large buffers out-of-band
+def pickle_parts(obj):
+    """
+    Pickles the provided `obj` with pickle protocol 5, such that the data of
+    all buffers larger than :attr:`~INLINE_LIMIT` bytes that are embedded in
+    it (like those of NumPy arrays) is not copied into the pickle stream, but
+    kept out-of-band instead.
+
+    If pickle protocol 5 is not available, `obj` is pickled entirely in-band.
+
+    Returns
+    -------
+    parts : list of :obj:`~numpy.ndarray`
+        The 1D :obj:`~numpy.uint8` arrays making up the pickled `obj`. The
+        first array holds the pickle stream, and every other array shares the
+        memory of an out-of-band buffer of `obj`. The parts can be turned back
+        into `obj` with :func:`~unpickle_parts`.
+        As a header describes the parts by their sizes (see
+        :func:`~pack_header`), there are never more than 255 parts.
+
+    """
+
+    # If pickle protocol 5 is not available, pickle obj in-band
+    if(HIGHEST_PROTOCOL < 5):
+        return([np.frombuffer(dumps(obj, HIGHEST_PROTOCOL), np.uint8)])
+
+    # Initialize list of out-of-band buffers
+    buffers = []
+
+    # This function decides which buffers are kept out-of-band
+    def buffer_callback(buf):
+        # Buffers that are not contiguous are always pickled in-band
+        try:
+            raw = buf.raw()
+        except BufferError:
+            return(True)
+
+        # Keep large buffers out-of-band if there is space for them
+        if(raw.nbytes <= INLINE_LIMIT or len(buffers) == _MAX_PARTS-1):
+            return(True)
+        buffers.append(np.frombuffer(raw, np.uint8))
+        return(False)
+
+    # Pickle obj and return all parts
+    pickled = dumps(obj, HIGHEST_PROTOCOL, buffer_callback=buffer_callback)
+    return([np.frombuffer(pickled, np.uint8), *buffers])
+
+
+# This function recreates an object that was pickled by pickle_parts
+def unpickle_parts(parts):
+    """
+    Recreates the object that was pickled into the provided `parts` by
+    :func:`~pickle_parts`. All NumPy arrays that were kept out-of-band share
+    the memory of their part.
+
+    """
+
+    # Unpickle the first part with all others as its out-of-band buffers
+    if(len(parts) == 1):
+        return(loads(parts[0]))
+    else:
+        return(loads(parts[0], buffers=parts[1:]))
+
+
+# This function converts a NumPy dtype to its header representation
+@lru_cache(maxsize=None)
+def _encode_dtype(dtype):
+    return(repr(np.lib.format.dtype_to_descr(dtype)).encode('ascii'))
+
+
+# This function converts a header representation back to a NumPy dtype
+@lru_cache(maxsize=None)
+def _decode_dtype(descr):
+    return(np.lib.format.descr_to_dtype(literal_eval(descr.decode('ascii'))))
+
+
+# This function splits an array shape into chunks of limited size
+@lru_cache(maxsize=128)
+def get_chunk_slices(shape, chunk_size):
+    """
+    Returns the indices that split an array with the given `shape` into chunks
+    of at most `chunk_size` elements.
+
+    Every chunk is a block of consecutive elements in C-order, obtained by
+    grouping items along the first axis, or by splitting up every item further
+    if a single item is larger than `chunk_size`. The chunks of a C-contiguous
+    array are therefore C-contiguous as well.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        The shape of the array to split up.
+    chunk_size : int
+        The maximum number of elements in a single chunk.
+
+    Returns
+    -------
+    indices : tuple of tuple
+        The index of every chunk in the array, in C-order.
+
+    """
+
+    # If the array fits in a single chunk, return the entire array
+    if(int(np.prod(shape)) <= chunk_size):
+        return(((Ellipsis,),))
+
+    # Determine the number of elements in a single item along the first axis
+    item_size = int(np.prod(shape[1:]))
+
+    # If at least one item fits in a chunk, group the items
+    if(item_size <= chunk_size):
+        n = chunk_size//item_size
+        return(tuple((slice(i, i+n),) for i in range(0, shape[0], n)))
+
+    # Else, split up every item further
+    return(tuple((i, *idx) for i in range(shape[0])
+                 for idx in get_chunk_slices(shape[1:], chunk_size)))
 
+
+# This function creates the binary header describing a message payload
+@lru_cache(maxsize=1024)
+def pack_header(kind, shape, dtype, flags=0):
+    """
+    Creates the compact binary header that describes a payload of the given
+    `kind` with the given `shape` and `dtype`.
+
+    The header consists of a fixed-size prefix holding the `kind`, `flags`,
+    number of dimensions and length of the dtype descriptor, followed by the
+    shape and the dtype descriptor. It is padded such that any payload that
+    is appended to it (see :func:`~pack_inline`) is properly aligned.
+
+    Parameters
+    ----------
+    kind : int
+        The kind of payload the header describes, as given by
+        :func:`~get_buffer_kind`.
+    shape : tuple of int
+        The shape of the payload.
+        For :attr:`~HDR_PICKLE`, the sizes of all parts of the payload as
+        given by :func:`~pickle_parts`.
+        For :attr:`~HDR_BATCH`, the lengths of all messages in the batch.
+    dtype : :obj:`~numpy.dtype`
+        The data type of the payload.
+
+    Optional
+    --------
+    flags : int. Default: 0
+        Bitwise OR of the header flags that apply to this payload.
+
+    Returns
+    -------
+    header : bytes
+        The binary header.
+
+    """
+
+    # Obtain the descriptor of the dtype
+    descr = _encode_dtype(dtype)
+
+    # Pack all parts of the header together
+    header = b''.join([_HEADER.pack(kind, flags, len(shape), len(descr)),
+                       pack('<%iq' % (len(shape)), *shape), descr])
+
+    # Pad the header and return it
+    return(header.ljust(-(-len(header)//_HEADER_ALIGN)*_HEADER_ALIGN, b'\0'))
+
+
+# This function reads a binary header created by pack_header
+def unpack_header(buf):
     """
+    Reads the binary header at the start of the provided `buf`, which was
+    created with :func:`~pack_header`.
+
+    Parameters
+    ----------
+    buf : bytes-like object
+        The message whose header must be read.
+
+    Returns
+    -------
+    kind : int
+        The kind of payload the header describes.
+    flags : int
+        The header flags that apply to the payload.
+    shape : tuple of int
+        The shape of the payload.
+    dtype : :obj:`~numpy.dtype`
+        The data type of the payload.
+    offset : int
+        The number of bytes in `buf` that are taken up by the header.
+
+    """
+
+    # Read the fixed-size part of the header
+    kind, flags, ndim, descr_len = _HEADER.unpack_from(buf)
+
+    # Read the shape and dtype
+    start = _HEADER.size+8*ndim
+    shape = unpack_from('<%iq' % (ndim), buf, _HEADER.size)
+    dtype = _decode_dtype(bytes(buf[start:start+descr_len]))
+
+    # Determine the padded length of the header
+    offset = -(-(start+descr_len)//_HEADER_ALIGN)*_HEADER_ALIGN
+
+    # Return the header information
+    return(kind, flags, shape, dtype, offset)
+
+
+# This function folds a NumPy array into a message after its header
+def pack_inline(header, arr):
+    """
+    Creates a single message containing the provided `header`, immediately
+    followed by the data of the provided NumPy array `arr`.
+
+    """
+
+    # Create message
+    msg = bytearray(len(header)+arr.nbytes)
+    msg[:len(header)] = header
+
+    # Copy the data of arr into the message
+    np.copyto(unpack_inline(msg, arr.shape, arr.dtype, len(header)), arr)
+
+    # Return msg
+    return(msg)
+
+
+# This function returns the payload that was folded into a message
+def unpack_inline(msg, shape, dtype, offset):
+    """
+    Returns a view of the payload with the given `shape` and `dtype` that
+    starts at byte `offset` of the provided `msg` and runs until its end.
+
+    """
+
+    return(np.frombuffer(msg, dtype, offset=offset).reshape(shape))
+
+
+# This function combines several messages into a single message
+def pack_batch(msgs):
+    """
+    Creates a single message of kind :attr:`~HDR_BATCH` containing all
+    provided messages `msgs`, which can be split up again with
+    :func:`~unpack_batch`.
+
+    The header of the batch stores the length of every message as its shape,
+    after which all messages follow, each aligned like a header.
+    A batch can therefore hold at most :attr:`~MAX_BATCH` messages.
+
+    """
+
+    # Determine the length of every message and its aligned length
+    lengths = [len(msg) for msg in msgs]
+    aligned = [-(-n//_HEADER_ALIGN)*_HEADER_ALIGN for n in lengths]
+
+    # Create the header of the batch and the message holding it
+    header = pack_header(HDR_BATCH, tuple(lengths), np.dtype(np.uint8),
+                         HDR_INLINE)
+    batch = bytearray(len(header)+sum(aligned))
+    batch[:len(header)] = header
+
+    # Copy all messages into the batch
+    offset = len(header)
+    for msg, n, n_aligned in zip(msgs, lengths, aligned):
+        batch[offset:offset+n] = msg
+        offset += n_aligned
+
+    # Return batch
+    return(batch)
+
+
+# This function splits a message created by pack_batch up again
+def unpack_batch(msg):
+    """
+    Returns a list of all messages that are contained in the provided `msg`
+    if it was created by :func:`~pack_batch`, or a list with just `msg`
+    otherwise.
+
+    """
+
+    # If msg is not a batch, return it as is
+    if(len(msg) < _HEADER.size or msg[0] != HDR_BATCH):
+        return([msg])
+
+    # Read the lengths of all messages in the batch
+    _, _, lengths, _, offset = unpack_header(msg)
+
+    # Copy every message out of the batch
+    msgs = []
+    for n in lengths:
+        msgs.append(msg[offset:offset+n])
+        offset += -(-n//_HEADER_ALIGN)*_HEADER_ALIGN
 
-    # Check if provided obj is a NumPy array
-    return(isinstance(obj, np.ndarray))
+    # Return msgs
+    return(msgs)
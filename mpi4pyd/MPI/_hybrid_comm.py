@@ -9,15 +9,30 @@ HybridComm
 
 # %% IMPORTS
 # Built-in imports
-from inspect import currentframe
+import asyncio
+from contextlib import contextmanager
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from time import perf_counter
 
 # Package imports
 import e13tools as e13
 import numpy as np
 
 # mpi4pyd imports
-from mpi4pyd import dummyMPI, MPI
-from mpi4pyd.MPI._helpers import is_buffer_obj
+from mpi4pyd import dummyMPI, MPI, threadMPI
+from mpi4pyd.MPI._buffer_pool import BufferPool
+from mpi4pyd.MPI._compression import (
+    check_codec, compress_payload, decompress_payload)
+from mpi4pyd.MPI._datatypes import (
+    buffer_msg, release_strided_datatype, strided_msg)
+from mpi4pyd.MPI._header_cache import HeaderCache
+from mpi4pyd.MPI._helpers import (
+    CHUNK_SIZE, HDR_CACHED, HDR_COMPRESSED, HDR_INLINE, HDR_NDARRAY,
+    HDR_PICKLE, HDR_SAME, INLINE_LIMIT, MAX_BATCH, as_buffer_array,
+    empty_buffer, finish_buffer, fits_buffer, get_buffer_kind,
+    get_chunk_slices, pack_batch, pack_header, pack_inline, pickle_parts,
+    unpack_batch, unpack_header, unpack_inline, unpickle_parts)
+from mpi4pyd.MPI._request import HybridRequest
 
 # All declaration
 __all__ = ['HYBRID_COMM_SELF', 'HYBRID_COMM_WORLD', 'get_HybridComm_obj']
@@ -26,15 +41,6 @@ __all__ = ['HYBRID_COMM_SELF', 'HYBRID_COMM_WORLD', 'get_HybridComm_obj']
 # Initialize hybrid_comm_registry
 hybrid_comm_registry = {}
 
-# Make conversion dict from NumPy dtype to MPI Datatype
-dtype_dict = {
-    'int': MPI.LONG,
-    'int32': MPI.INT,
-    'int64': MPI.LONG,
-    'float': MPI.DOUBLE,
-    'float32': MPI.FLOAT,
-    'float64': MPI.DOUBLE}
-
 
 # %% FUNCTION DEFINITIONS
 # Function factory that returns special HybridComm class instances
@@ -46,10 +52,15 @@ def get_HybridComm_obj(comm=None):
     This :class:`~HybridComm` class wraps the provided :obj:`MPI.Intracomm`
     instance `comm` and overrides all of its lowercase communication methods
     (e.g., :meth:`~MPI.Intracomm.bcast`, :meth:`~MPI.Intracomm.gather`,
-    :meth:`~MPI.Intracomm.scatter`, :meth:`~MPI.Intracomm.recv` and
-    :meth:`~MPI.Intracomm.send`) with improved versions. These improved
-    communication methods automatically select the most optimal way of
-    communicating their input arguments.
+    :meth:`~MPI.Intracomm.scatter`, :meth:`~MPI.Intracomm.allreduce`,
+    :meth:`~MPI.Intracomm.recv` and :meth:`~MPI.Intracomm.send`) with improved
+    versions, and adds non-blocking versions of several of them (e.g.,
+    :meth:`~HybridComm.isend`, :meth:`~HybridComm.irecv`,
+    :meth:`~HybridComm.ibcast` and :meth:`~HybridComm.iallreduce`) and
+    :mod:`asyncio` versions that can be awaited (e.g.,
+    :meth:`~HybridComm.arecv` and :meth:`~HybridComm.abcast`). These
+    improved communication methods automatically select the most optimal way
+    of communicating their input arguments.
 
     Besides the new method functionalities, the returned instance behaves in
     the exact same way as the provided `comm` and can easily be used in any
@@ -74,7 +85,9 @@ def get_HybridComm_obj(comm=None):
     Providing the same :obj:`~MPI.Intracomm` instance to this function twice,
     will not create two :obj:`~HybridComm` objects. Instead, the instance
     created the first time will be returned each consecutive time. All created
-    :obj:`~HybridComm` objects are stored in the :obj:`~hybrid_comm_registry`.
+    :obj:`~HybridComm` objects are stored in the :obj:`~hybrid_comm_registry`,
+    except for those of :mod:`~mpi4pyd.threadMPI` communicators, which are
+    stored on the communicator itself.
 
     If `comm` has a pool size of `1` (`comm.Get_size == 1`), this function will
     return :obj:`mpi4pyd.dummyMPI.COMM_WORLD` instead. This is because the
@@ -87,7 +100,8 @@ def get_HybridComm_obj(comm=None):
     if comm is None:
         comm = MPI.COMM_WORLD
     # Else, check if provided comm is an MPI intra-communicator
-    elif not isinstance(comm, (MPI.Intracomm, dummyMPI.Intracomm)):
+    elif not isinstance(comm, (MPI.Intracomm, dummyMPI.Intracomm,
+                               threadMPI.Intracomm)):
         raise TypeError("Input argument 'comm' must be an instance of "
                         "the MPI.Intracomm class!")
 
@@ -96,19 +110,92 @@ def get_HybridComm_obj(comm=None):
         # If so, return dummyMPI.COMM_WORLD instead
         return(dummyMPI.COMM_WORLD)
 
+    # Check if provided threadMPI comm already has a HybridComm instance or
+    # is one, which it stores itself
+    if isinstance(comm, threadMPI.Intracomm):
+        if hasattr(comm, '_hybrid_comm'):
+            return(comm._hybrid_comm)
+
     # Check if provided comm already has a HybridComm instance
-    if hex(id(comm)) in hybrid_comm_registry.keys():
+    elif hex(id(comm)) in hybrid_comm_registry.keys():
         # If so, return that HybridComm instance instead
         return(hybrid_comm_registry[hex(id(comm))])
 
     # Check if provided comm is not already a HybridComm instance
-    if comm in hybrid_comm_registry.values():
+    elif comm in hybrid_comm_registry.values():
         # If so, return provided HybridComm instance instead
         return(comm)
 
-    # Make tuple of overridden attributes
-    overridden_attrs = ('__init__', 'bcast', 'gather', 'recv', 'scatter',
-                        'send')
+    # Obtain rank and size of comm
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    # Obtain the MPI module that comm belongs to
+    comm_MPI = threadMPI if isinstance(comm, threadMPI.Intracomm) else MPI
+
+    # Initialize array used for negotiating between all ranks
+    flags = np.empty(6, dtype=np.int64)
+
+    # Set the maximum number of elements communicated in a single call
+    chunk_size = CHUNK_SIZE
+
+    # Initialize pool of buffers used for packing non-contiguous arrays
+    pack_pool = BufferPool()
+
+    # Initialize the optional pool that received arrays are taken from
+    recv_pool = None
+
+    # Initialize list of the source, tag and request of unfinished receives
+    pending_recvs = []
+
+    # Initialize cache of the last header that was broadcasted from every
+    # root, and the header caches of all ranks that were communicated with
+    header_cache = {}
+    header_caches = {}
+
+    # Initialize the policy for aggregating small sends (None if disabled),
+    # the queued messages for every destination and tag, and the source, tag
+    # and message of all messages that were received in a batch and are not
+    # yet received
+    aggregation = None
+    send_queues = {}
+    batched_msgs = []
+
+    # Initialize list of unfinished non-blocking collectives and the
+    # communicator they use, which is created when it is first required
+    pending_colls = []
+    coll_comm = None
+
+    # Initialize the node topology of comm, which is created when it is first
+    # required, and whether collectives use it
+    topology = None
+    hierarchical = False
+
+    # Initialize the codec that payloads are compressed with (None if
+    # disabled) and the minimum number of bytes of a compressed payload
+    compression = None
+    compress_threshold = 2**16
+
+    # Initialize list of shared memory windows created by bcast_shared
+    shared_wins = []
+
+    # Obtain the attribute getter of the class of comm
+    base_getattribute = comm.__class__.__getattribute__
+
+    # Make list of overridden attributes, which is filled by override()
+    overridden_attrs = ['__init__']
+
+    # This decorator marks a method as overriding the one in comm
+    def override(meth):
+        """
+        Marks the provided `meth` as overriding the attribute with the same
+        name in the provided `comm`, and returns it unchanged.
+
+        """
+
+        # Add name of meth to overridden_attrs and return meth
+        overridden_attrs.append(meth.__name__)
+        return(meth)
 
     # %% HYBRIDCOMM CLASS DEFINITION
     class HybridComm(comm.__class__, object):
@@ -120,27 +207,27 @@ def get_HybridComm_obj(comm=None):
         def __init__(self):
             # Bind provided communicator
             if not hasattr(comm, '_rank'):
-                self._rank = comm.Get_rank()
+                self._rank = rank
             if not hasattr(comm, '_size'):
-                self._size = comm.Get_size()
+                self._size = size
 
         # If requested attribute is not a method, use comm for getattr
         def __getattribute__(self, name):
-            if name not in overridden_attrs and name in comm.__dir__():
+            if name in comm_attrs:
                 return(getattr(comm, name))
             else:
-                return(super().__getattribute__(name))
+                return(base_getattribute(self, name))
 
         # If requested attribute is not a method, use comm for setattr
         def __setattr__(self, name, value):
-            if name not in overridden_attrs and name in comm.__dir__():
+            if name in comm_attrs:
                 setattr(comm, name, value)
             else:
                 super().__setattr__(name, value)
 
         # If requested attribute is not a method, use comm for delattr
         def __delattr__(self, name):
-            if name not in overridden_attrs and name in comm.__dir__():
+            if name in comm_attrs:
                 delattr(comm, name)
             else:
                 super().__delattr__(name)
@@ -156,351 +243,3011 @@ def get_HybridComm_obj(comm=None):
 
             return(overridden_attrs)
 
+        @property
+        def chunk_size(self):
+            """
+            int: The maximum number of elements that is communicated in a
+            single MPI call. Buffer objects with more elements are split up
+            into chunks of at most this size, which are communicated one after
+            another. Must be the same on all MPI ranks.
+
+            """
+
+            return(chunk_size)
+
+        @chunk_size.setter
+        def chunk_size(self, value):
+            nonlocal chunk_size
+
+            # Check if value is a positive integer
+            if(int(value) != value or value < 1):
+                raise ValueError("Input argument 'chunk_size' must be a "
+                                 "positive integer!")
+
+            # Set chunk_size
+            chunk_size = int(value)
+
+        @property
+        def recv_pool(self):
+            """
+            :obj:`~mpi4pyd.MPI.BufferPool` or None: The pool that the NumPy
+            arrays received by :meth:`~bcast`, :meth:`~recv` and
+            :meth:`~scatter` (and their non-blocking versions) are taken from
+            if no destination is provided. Arrays that are no longer required
+            can be given back with :meth:`~mpi4pyd.MPI.BufferPool.release`,
+            such that repeated communications of arrays with the same shape
+            and data type do not allocate any new memory.
+            If *None*, all received arrays are newly allocated.
+            Default: *None*.
+
+            """
+
+            return(recv_pool)
+
+        @recv_pool.setter
+        def recv_pool(self, value):
+            nonlocal recv_pool
+
+            # Check if value is a BufferPool or None
+            if not isinstance(value, (BufferPool, type(None))):
+                raise TypeError("Input argument 'recv_pool' must be an "
+                                "instance of the BufferPool class or None!")
+
+            # Set recv_pool
+            recv_pool = value
+
+        @property
+        def hierarchical(self):
+            """
+            bool: Whether :meth:`~allreduce`, :meth:`~bcast`, :meth:`~gather`
+            and :meth:`~reduce` communicate NumPy arrays hierarchically. If
+            *True*, arrays are first collected on the lowest MPI rank of every
+            node, after which only these node leaders communicate with each
+            other. Must be the same on all MPI ranks. Default: *False*.
+
+            """
+
+            return(hierarchical)
+
+        @hierarchical.setter
+        def hierarchical(self, value):
+            nonlocal hierarchical
+
+            # Check if value is a bool
+            if not isinstance(value, bool):
+                raise TypeError("Input argument 'hierarchical' is not of type "
+                                "'bool'!")
+
+            # Set hierarchical
+            hierarchical = value
+
+        @property
+        def compression(self):
+            """
+            str or None: The name of the codec that the payloads sent by
+            :meth:`~bcast`, :meth:`~gather` and :meth:`~send` (and their
+            non-blocking versions) are compressed with, which must be one of
+            :attr:`~mpi4pyd.MPI._compression.CODECS`. A payload is only
+            compressed if it has at least :attr:`~compress_threshold` bytes and
+            compression makes it smaller. As the codec is stored in the header
+            of every compressed payload, receivers decompress it automatically.
+            If *None*, payloads are not compressed. Default: *None*.
+
+            """
+
+            return(compression)
+
+        @compression.setter
+        def compression(self, value):
+            nonlocal compression
+
+            # Check if value is an available codec or None
+            compression = None if value is None else check_codec(value)
+
+        @property
+        def compress_threshold(self):
+            """
+            int: The minimum number of bytes that a payload must have in order
+            to be compressed, as described in :attr:`~compression`.
+            Default: 65536.
+
+            """
+
+            return(compress_threshold)
+
+        @compress_threshold.setter
+        def compress_threshold(self, value):
+            nonlocal compress_threshold
+
+            # Check if value is a non-negative integer
+            if(int(value) != value or value < 0):
+                raise ValueError("Input argument 'compress_threshold' must be "
+                                 "a non-negative integer!")
+
+            # Set compress_threshold
+            compress_threshold = int(value)
+
         # %% COMMUNICATION METHODS
-        # Specialized bcast function that automatically makes use of buffers
-        def bcast(self, obj, root=0):
+        # Specialized allgather function that automatically uses buffers
+        @override
+        def allgather(self, sendobj, concatenate=False):
             """
-            Special broadcast method that automatically uses the appropriate
-            method (:meth:`~MPI.Intracomm.bcast` or
-            :meth:`~MPI.Intracomm.Bcast`) depending on the type of the provided
-            `obj`.
+            Special allgather method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.allgather` or
+            :meth:`~MPI.Intracomm.Allgatherv`) depending on the lay-out of the
+            provided `sendobj`.
+
+            If `sendobj` is a :obj:`~numpy.ndarray` with the same data type on
+            all MPI ranks, all arrays are gathered with a single
+            :meth:`~MPI.Intracomm.Allgatherv` into one contiguous array on
+            every MPI rank.
 
             Parameters
             ----------
-            obj : :obj:`~numpy.ndarray` or object
-                The object to broadcast to all MPI ranks.
-                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Bcast`.
-                If not, use :meth:`~MPI.Intracomm.bcast` instead.
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to gather from all MPI ranks.
+                If :obj:`~numpy.ndarray`, use
+                :meth:`~MPI.Intracomm.Allgatherv`.
+                If not, use :meth:`~MPI.Intracomm.allgather` instead.
 
             Optional
             --------
-            root : int. Default: 0
-                The MPI rank that broadcasts `obj`.
+            concatenate : bool. Default: False
+                Whether to return the contiguous array all arrays were
+                gathered into, instead of a list of views of this array.
+                See :meth:`~gather` for more information.
 
             Returns
             -------
-            obj : object
-                The broadcasted `obj`.
+            recvobj : list or :obj:`~numpy.ndarray`
+                List of gathered objects or the concatenated
+                :obj:`~numpy.ndarray` if `concatenate` is *True*.
 
             """
 
-            # Check if obj can be broadcasted as a buffer object
-            use_buffer = use_buffer_meth(obj, root)
+            # Obtain the headers of sendobj on all ranks
+            headers = negotiate_headers(sendobj)
 
-            # If provided object uses a buffer
-            if use_buffer:
-                # Sender
-                if(self._rank == root):
-                    # If so, send shape and dtype of the NumPy array
-                    comm.bcast([obj.shape, obj.dtype], root=root)
-
-                    # Then send the NumPy array as a buffer object
-                    comm.Bcast(obj, root=root)
-
-                # Receivers receive NumPy array
+            # If all provided objects use buffers
+            if headers is not None:
+                # Determine the counts and displacements of all arrays
+                shapes = [header[1] for header in headers]
+                counts = [int(np.prod(shape)) for shape in shapes]
+                displs = np.cumsum([0, *counts[:-1]]).tolist()
+
+                # Initialize contiguous array for all gathered objects
+                buff = np.empty(sum(counts), dtype=sendobj.dtype)
+
+                # Split buff up into views for every rank
+                pieces = [buff[displ:displ+count].reshape(shape)
+                          for displ, count, shape in
+                          zip(displs, counts, shapes)]
+
+                # If the gathered arrays fit in a single chunk, gather them
+                if(len(buff) <= chunk_size):
+                    packed = []
+                    comm.Allgatherv(array_msg(sendobj, packed),
+                                    buffer_msg(buff, counts, displs))
+                    release_packed(packed)
+
+                # Else, every rank broadcasts its array in chunks
                 else:
-                    # Create empty NumPy array with given shape and dtype
-                    obj = np.empty(*comm.bcast(None, root=root))
-
-                    # Receive NumPy array
-                    comm.Bcast(obj, root=root)
+                    np.copyto(pieces[rank], sendobj)
+                    for src, piece in enumerate(pieces):
+                        for idx in get_chunk_slices(piece.shape, chunk_size):
+                            comm.Bcast(buffer_msg(piece[idx]), root=src)
+
+                # If requested, return the concatenated array
+                if concatenate:
+                    recvobj = concatenate_shape(buff, shapes)
+                else:
+                    recvobj = pieces
 
-            # If not, broadcast obj the normal way
+            # If not, gather obj the normal way
             else:
-                obj = comm.bcast(obj, root=root)
+                recvobj = comm.allgather(sendobj)
 
-            # Return obj
-            return(obj)
+            # Return recvobj
+            return(recvobj)
 
-        # Specialized gather function that automatically makes use of buffers
-        def gather(self, sendobj, root=0):
+        # Specialized allreduce function that automatically uses buffers
+        @override
+        def allreduce(self, sendobj, op=comm_MPI.SUM):
             """
-            Special gather method that automatically uses the appropriate
-            method (:meth:`~MPI.Intracomm.gather` or
-            :meth:`~MPI.Intracomm.Gatherv`) depending on the lay-out of the
+            Special allreduce method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.allreduce` or
+            :meth:`~MPI.Intracomm.Allreduce`) depending on the type of the
             provided `sendobj`.
 
             Parameters
             ----------
             sendobj : :obj:`~numpy.ndarray` or object
-                The object to gather from all MPI ranks.
-                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Gatherv`.
-                If not, use :meth:`~MPI.Intracomm.gather` instead.
+                The object to reduce over all MPI ranks.
+                If :obj:`~numpy.ndarray` with the same shape and data type on
+                all MPI ranks, use :meth:`~MPI.Intracomm.Allreduce`.
+                If not, use :meth:`~MPI.Intracomm.allreduce` instead.
 
             Optional
             --------
-            root : int. Default: 0
-                The MPI rank that gathers `sendobj`.
+            op : :obj:`~MPI.Op` object. Default: :obj:`~MPI.SUM`
+                The reduction operation to apply.
 
             Returns
             -------
-            recvobj : list or None
-                If MPI rank is `root`, returns a list of gathered objects.
-                Else, returns *None*.
+            recvobj : :obj:`~numpy.ndarray` or object
+                The reduced object.
 
             """
 
-            # Check if obj can be gathered as a buffer object
-            use_buffer = use_buffer_meth(sendobj, root)
+            # Check if obj can be reduced as a buffer object on all ranks
+            use_buffer, _, _ = negotiate_all(sendobj)
 
             # If all provided objects use buffers
             if use_buffer:
-                # If so, gather the shapes of obj on the receiver
-                shapes = np.array(comm.gather(sendobj.shape, root=root))
+                # Reduce NumPy array into an empty array in chunks
+                recvobj = np.empty(sendobj.shape, dtype=sendobj.dtype)
+                for idx in get_chunk_slices(sendobj.shape, chunk_size):
+                    if(hierarchical and op.Is_commutative()):
+                        hier_reduce(sendobj[idx], recvobj[idx], op)
+                    else:
+                        packed = []
+                        comm.Allreduce(
+                            array_msg(sendobj[idx], packed, derived=False),
+                            buffer_msg(recvobj[idx]), op=op)
+                        release_packed(packed)
+
+            # If not, reduce obj the normal way
+            else:
+                recvobj = comm.allreduce(sendobj, op=op)
+
+            # Return recvobj
+            return(recvobj)
 
-                # Set the key to use for this communication
-                key = 147418621
+        # Specialized alltoall function that automatically makes use of buffers
+        @override
+        def alltoall(self, sendobj):
+            """
+            Special all-to-all method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.alltoall` or
+            :meth:`~MPI.Intracomm.Alltoallv`) depending on the lay-out of the
+            provided `sendobj`.
 
-                # Receiver sets up a buffer array and receives NumPy array
-                if(self._rank == root):
-                    # Initialize empty list of gathered objects
-                    arr_list = [np.empty(shape, dtype=sendobj.dtype)
-                                for shape in shapes]
+            Parameters
+            ----------
+            sendobj : sequence
+                Sequence of :attr:`~_size` objects, where the object at index
+                `i` is sent to MPI rank `i`.
+                If all objects are :obj:`~numpy.ndarray` with the same data
+                type on all MPI ranks, use :meth:`~MPI.Intracomm.Alltoallv`.
+                If `sendobj` itself is a :obj:`~numpy.ndarray`, its items along
+                the first axis are sent.
+                If not, use :meth:`~MPI.Intracomm.alltoall` instead.
 
-                    # Gather all NumPy arrays from all ranks
-                    for rank, arr in enumerate(arr_list):
-                        # If this is the receivers rank, simply copy the data
-                        if(rank == root):
-                            arr[:] = sendobj
-                        # Else, receive the object normally
-                        else:
-                            comm.Recv(arr, source=rank, tag=key+rank)
+            Returns
+            -------
+            recvobj : list
+                List of objects received from every MPI rank.
+
+            """
+
+            # Check if sendobj contains the correct number of objects
+            if(len(sendobj) != size):
+                raise e13.ShapeError("Input argument 'sendobj' must contain "
+                                     "an object for every MPI rank!")
+
+            # Check if all objects can be sent as buffer objects with the same
+            # data type on all ranks
+            if(get_buffer_kind(sendobj) == HDR_NDARRAY or
+               all(get_buffer_kind(obj) == HDR_NDARRAY and
+                   obj.dtype == sendobj[0].dtype for obj in sendobj)):
+                use_buffer, _, _ = negotiate_all(
+                    np.empty(0, sendobj[0].dtype), same_shape=False)
+            else:
+                use_buffer, _, _ = negotiate_all(False)
 
-                    # Save arr_list as recvobj
-                    recvobj = arr_list
+            # If all provided objects use buffers
+            if use_buffer:
+                # Exchange the shapes of all objects
+                shapes = comm.alltoall([obj.shape for obj in sendobj])
 
-                # Senders send the array
+                # Place all objects contiguously in memory
+                if(get_buffer_kind(sendobj) == HDR_NDARRAY):
+                    sendbuf = np.ascontiguousarray(sendobj).ravel()
+                    sendcounts = [sendobj[0].size]*size
                 else:
-                    # Send NumPy array
-                    comm.Send(sendobj, dest=root, tag=key+self._rank)
-                    recvobj = None
+                    sendbuf = np.concatenate([obj.ravel() for obj in sendobj])
+                    sendcounts = [obj.size for obj in sendobj]
+                senddispls = np.cumsum([0, *sendcounts[:-1]]).tolist()
 
-                # MPI Barrier
-                comm.Barrier()
+                # Determine the counts and displacements of all arrays
+                counts = [int(np.prod(shape)) for shape in shapes]
+                displs = np.cumsum([0, *counts[:-1]]).tolist()
 
-            # If not, gather obj the normal way
+                # Initialize contiguous array for all received objects
+                buff = np.empty(sum(counts), dtype=sendbuf.dtype)
+
+                # Exchange all NumPy arrays
+                comm.Alltoallv(buffer_msg(sendbuf, sendcounts, senddispls),
+                               buffer_msg(buff, counts, displs))
+
+                # Split buff up into views for every rank
+                recvobj = [buff[displ:displ+count].reshape(shape)
+                           for displ, count, shape in
+                           zip(displs, counts, shapes)]
+
+            # If not, exchange the objects the normal way
             else:
-                recvobj = comm.gather(sendobj, root=root)
+                recvobj = comm.alltoall(sendobj)
 
             # Return recvobj
             return(recvobj)
 
-        # Specialized recv function that automatically makes use of buffers
-        def recv(self, buf=None, source=MPI.ANY_SOURCE, tag=MPI.ANY_TAG,
-                 status=None):
+        # Specialized bcast function that automatically makes use of buffers
+        @override
+        def bcast(self, obj, root=0, segment_size=None, out=None,
+                  compression=None):
             """
-            Special receive method that automatically uses the appropriate
-            method (:meth:`~MPI.Intracomm.recv` or :meth:`~MPI.Intracomm.Recv`)
-            depending on the type of the object provided to :meth:`~send`.
+            Special broadcast method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.bcast` or
+            :meth:`~MPI.Intracomm.Bcast`) depending on the type of the provided
+            `obj`.
+
+            If `segment_size` is given, the buffer of `obj` is broadcasted in a
+            pipeline of segments instead, as described in :meth:`~bcast_iter`.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to broadcast to all MPI ranks.
+                If it supports the buffer protocol (see
+                :func:`~mpi4pyd.MPI._helpers.get_buffer_kind`), use
+                :meth:`~MPI.Intracomm.Bcast` and recreate it as the same type
+                or as a :obj:`memoryview` on all other MPI ranks.
+                If not, pickle it and use :meth:`~MPI.Intracomm.bcast` if it
+                is small, or :meth:`~MPI.Intracomm.Bcast` otherwise. Large
+                buffers embedded in `obj` are kept out of the pickle stream and
+                broadcasted separately (see
+                :func:`~mpi4pyd.MPI._helpers.pickle_parts`).
 
             Optional
             --------
-            buf : None. Default: None
-                The `buf` argument that the :meth:`~MPI.Intracomm.recv` method
-                takes. As the received object is always returned, this argument
-                has no use, but is here to ensure that the method signature is
-                the same.
-            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
-                The integer identifier of the MPI rank where the object will be
-                sent from.
-            tag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
-                The tag used for the send/receive communication between this
-                rank and `recv`.
-            status : :obj:`~mpi4py.MPI.Status` object or None. Default: None
-                If not *None*, the status object to use for storing the status
-                of this communication process.
+            root : int. Default: 0
+                The MPI rank that broadcasts `obj`.
+            segment_size : int or None. Default: None
+                If not *None*, the maximum number of elements in a single
+                segment of the pipelined broadcast.
+            out : :obj:`~numpy.ndarray` or None. Default: None
+                If not *None*, the writeable C-contiguous array with the same
+                shape and data type as `obj` that receivers receive `obj` in.
+                If *None*, `obj` is received in an array from
+                :attr:`~recv_pool` or a new array.
+                This argument is ignored on `root` and if `obj` is not a
+                :obj:`~numpy.ndarray`.
+            compression : str, bool or None. Default: None
+                The codec that the payload of `obj` is compressed with, as
+                described in :meth:`~send`. Only used on `root`.
 
             Returns
             -------
-            recvobj : object
-                The object that was received from `source`.
+            obj : object
+                The broadcasted `obj`.
 
             """
 
-            # Check if a buffer will be used
-            use_buffer = use_buffer_meth(None, source, tag)
+            # If requested, broadcast obj in a pipeline of segments
+            if segment_size is not None:
+                for obj, _ in self.bcast_iter(obj, root, segment_size, out,
+                                              compression):
+                    pass
+                return(obj)
+
+            # Root decides how obj is broadcasted
+            if(rank == root):
+                # Obtain the payload of obj, pickling it if required
+                kind, shape, dtype, parts = get_payload(
+                    obj, get_codec(compression))
+
+                # Small pickled objects are broadcasted as the header
+                if(kind == HDR_PICKLE and len(parts) == 1 and
+                   parts[0].nbytes <= INLINE_LIMIT):
+                    header = (kind, parts[0].tobytes())
+                else:
+                    header = (kind, shape, dtype)
+            else:
+                header = None
+
+            # Broadcast header
+            header = bcast_header(header, root)
+
+            # If obj was broadcasted as the header, unpickle it
+            if(len(header) == 2):
+                return(obj if(rank == root) else loads(header[1]))
+
+            # Receivers create the empty parts of the payload with given kind,
+            # shape and dtype
+            if(rank != root):
+                obj, parts = empty_payload(*header, out)
+
+            # Broadcast all parts of the payload in chunks
+            for part in parts:
+                for idx in get_chunk_slices(part.shape, chunk_size):
+                    packed = []
+                    if(hierarchical and header[0] == HDR_NDARRAY):
+                        hier_bcast(array_msg(part[idx], packed), root)
+                    else:
+                        comm.Bcast(array_msg(part[idx], packed), root=root)
+                    release_packed(packed)
+
+            # Receivers unpickle or finish the received buffer object
+            if(rank != root):
+                obj = finish_message(header[0], obj, out)
 
-            # If to-be-received object uses a buffer, use Recv
-            if use_buffer:
-                # Create NumPy array with given shape and dtype
-                recvobj = np.empty(*comm.recv(source=source, tag=tag))
+            # Return obj
+            return(obj)
 
-                # Receive NumPy array
-                comm.Recv(recvobj, source=source, tag=tag, status=status)
+        # Pipelined bcast function that yields segments as they arrive
+        @override
+        def bcast_iter(self, obj, root=0, segment_size=None, out=None,
+                       compression=None):
+            """
+            Pipelined version of :meth:`~bcast`, which returns an iterator that
+            broadcasts the provided `obj` and yields every segment of it as
+            soon as it has arrived.
+
+            The header of `obj` is broadcasted in the same way as in
+            :meth:`~bcast`, after which the buffer of `obj` is split up into
+            segments of at most `segment_size` elements. All segments are
+            posted at once with :meth:`~MPI.Intracomm.Ibcast`, such that they
+            are in flight at the same time, and are waited for in order.
+            This allows receivers to process the first segments of a large
+            array while the remaining segments are still being broadcasted.
 
-            # If not, receive obj the normal way
-            else:
-                recvobj = comm.recv(source=source, tag=tag, status=status)
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to broadcast to all MPI ranks.
+                It must not be modified before the iterator is exhausted.
 
-            # Return recvobj
-            return(recvobj)
+            Optional
+            --------
+            root : int. Default: 0
+                The MPI rank that broadcasts `obj`.
+            segment_size : int or None. Default: None
+                The maximum number of elements in a single segment.
+                If *None*, :attr:`~chunk_size` is used. Segments are never
+                larger than :attr:`~chunk_size`.
+            out : :obj:`~numpy.ndarray` or None. Default: None
+                The array that receivers receive `obj` in, as described in
+                :meth:`~bcast`.
+            compression : str, bool or None. Default: None
+                The codec that the payload of `obj` is compressed with, as
+                described in :meth:`~send`. A compressed payload is yielded
+                once after it has arrived completely.
+
+            Yields
+            ------
+            obj : object
+                The broadcasted `obj`, which receivers receive into.
+            index : tuple
+                The index of the segment of `obj` that has arrived, such that
+                ``obj[index]`` can be used.
+                If `obj` is not a :obj:`~numpy.ndarray`, it is only yielded
+                once with an `index` of ``(Ellipsis,)`` after it has arrived
+                completely.
+
+            Note
+            ----
+            The iterator must be exhausted on all MPI ranks, in the same order
+            with respect to other collective communications. Only the last
+            yielded `obj` is guaranteed to be complete.
 
-        # Specialized scatter function that automatically makes use of buffers
-        def scatter(self, sendobj, root=0):
             """
-            Special scatter method that automatically uses the appropriate
-            method (:meth:`~MPI.Intracomm.scatter` or
-            :meth:`~MPI.Intracomm.Scatter`) depending on the type of the
-            provided `sendobj`.
 
-            Unlike :meth:`~MPI.Intracomm.scatter`, providing a buffer object
-            with more than :attr:`~_size` items will not raise an error, but
-            evenly distribute all the items instead.
+            # Check if segment_size is a positive integer
+            if segment_size is None:
+                segment_size = chunk_size
+            elif(int(segment_size) != segment_size or segment_size < 1):
+                raise ValueError("Input argument 'segment_size' must be a "
+                                 "positive integer!")
+
+            # Root decides how obj is broadcasted
+            if(rank == root):
+                kind, shape, dtype, parts = get_payload(
+                    obj, get_codec(compression))
+                header = (kind, shape, dtype)
+            else:
+                header = None
+
+            # Broadcast header
+            header = bcast_header(header, root)
+
+            # Receivers create the empty parts of the payload with given kind,
+            # shape and dtype
+            if(rank != root):
+                obj, parts = empty_payload(*header, out)
+
+            # Post the broadcasts of all segments of the payload
+            packed = []
+            segment_size = min(int(segment_size), chunk_size)
+            segments = [(part, idx) for part in parts
+                        for idx in get_chunk_slices(part.shape, segment_size)]
+            requests = [comm.Ibcast(array_msg(part[idx], packed), root=root)
+                        for part, idx in segments]
+
+            # Yield every segment of a NumPy array as soon as it has arrived
+            try:
+                for (_, idx), request in zip(segments, requests):
+                    request.Wait()
+                    if(header[0] == HDR_NDARRAY):
+                        yield(obj, idx)
+
+            # Make sure that all segments have arrived before returning
+            finally:
+                comm_MPI.Request.Waitall(requests)
+                release_packed(packed)
+
+            # Receivers unpickle or finish the received buffer object
+            if(header[0] != HDR_NDARRAY):
+                if(rank != root):
+                    obj = finish_message(header[0], obj, out)
+                yield(obj, (Ellipsis,))
+
+        # Node-aware bcast function that shares arrays within every node
+        @override
+        def bcast_shared(self, obj, root=0):
+            """
+            Special broadcast method that broadcasts the provided `obj` only
+            once to every node, and gives all MPI ranks on a node a read-only
+            view of a single copy of it in shared memory.
+
+            The MPI ranks on every node are grouped with
+            :meth:`~MPI.Intracomm.Split_type`, after which the lowest MPI rank
+            on every node allocates a shared memory window for `obj` with
+            :meth:`~MPI.Win.Allocate_shared`. The root writes `obj` into the
+            window of its own node, which is then broadcasted in chunks with
+            :meth:`~MPI.Intracomm.Bcast` to the windows of all other nodes.
 
             Parameters
             ----------
-            sendobj : :obj:`~numpy.ndarray` or object
-                The object to scatter to all MPI ranks.
-                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Scatterv`.
-                If not, use :meth:`~MPI.Intracomm.scatter` instead.
+            obj : :obj:`~numpy.ndarray` or object
+                The object to broadcast to all MPI ranks.
+                If not a :obj:`~numpy.ndarray`, it is broadcasted with
+                :meth:`~bcast` instead.
 
             Optional
             --------
             root : int. Default: 0
-                The MPI rank that scatters `sendobj`.
+                The MPI rank that broadcasts `obj`.
 
             Returns
             -------
-            recvobj : :obj:`~numpy.ndarray` or object
-                The object that has been scattered to this MPI rank.
+            obj : :obj:`~numpy.ndarray` or object
+                A read-only view of the broadcasted `obj` in the shared memory
+                of this node, or the broadcasted `obj` if it is not a
+                :obj:`~numpy.ndarray`.
 
-            """
+            Note
+            ----
+            The shared memory windows stay allocated until
+            :meth:`~free_shared` is called, after which the returned views can
+            no longer be used.
 
-            # Check if obj can be scattered as buffer objects
-            use_buffer = use_buffer_meth(sendobj, root)
+            """
 
-            # If provided object uses a buffer
-            if use_buffer:
-                # Sender prepares for scattering
-                if(self._rank == root):
-                    # Raise error if length of axis is not divisible by size
-                    if len(sendobj) % self._size:  # pragma: no cover
-                        raise e13.ShapeError("Input argument 'sendobj' cannot "
-                                             "be divided evenly over the "
-                                             "available number of MPI ranks!")
-
-                    # Determine shape of scattered object
-                    buff_shape = list(sendobj.shape)
-                    buff_shape[0] //= self._size
-
-                    # Initialize empty buffer array
-                    recvobj = np.empty(
-                        *comm.bcast([buff_shape, sendobj.dtype], root=root))
-
-                    # Scatter NumPy array
-                    comm.Scatter(sendobj, recvobj, root=root)
-
-                # Receivers receive the array
-                else:
-                    # Initialize empty buffer array
-                    recvobj = np.empty(*comm.bcast(None, root=root))
+            # Let root decide how obj is broadcasted
+            header = negotiate_root(obj, root)
 
-                    # Receive scattered NumPy array
-                    comm.Scatter(None, recvobj, root=root)
+            # If provided object is not a NumPy array, broadcast it normally
+            if(header[0] != HDR_NDARRAY):
+                return(self.bcast(obj, root))
 
-                # Remove single dimensional entries from recvobj
-                recvobj = recvobj.squeeze()
+            # Obtain the node topology
+            node_comm, leader_comm, nodes, _ = get_topology()
+            shape, dtype = header[1:]
 
-            # If not, scatter obj the normal way
+            # Lowest rank on every node allocates the shared memory window
+            if not node_comm.Get_rank():
+                nbytes = int(np.prod(shape))*dtype.itemsize
             else:
-                recvobj = comm.scatter(sendobj, root=root)
-
-            # Return recvobj
+                nbytes = 0
+            win = comm_MPI.Win.Allocate_shared(nbytes, 1, comm=node_comm)
+            shared_wins.append(win)
+
+            # Create an array of the shared memory of this node
+            recvobj = np.ndarray(shape, dtype, win.Shared_query(0)[0])
+
+            # Root writes obj into the shared memory of its node
+            if(rank == root):
+                np.copyto(recvobj, obj)
+            node_comm.Barrier()
+
+            # Lowest ranks broadcast the array to all other nodes in chunks
+            if(not node_comm.Get_rank() and leader_comm.Get_size() > 1):
+                for idx in get_chunk_slices(shape, chunk_size):
+                    leader_comm.Bcast(buffer_msg(recvobj[idx]),
+                                      root=nodes[root])
+            node_comm.Barrier()
+
+            # Return recvobj as a read-only view
+            recvobj.flags.writeable = False
             return(recvobj)
 
-        # Specialized send function that automatically makes use of buffers
-        def send(self, obj, dest, tag=0):
+        # Function that frees all shared memory windows
+        @override
+        def free_shared(self):
+            """
+            Frees all shared memory windows that were allocated by
+            :meth:`~bcast_shared`, after which the arrays it returned can no
+            longer be used.
+
+            This method must be called by all MPI ranks.
+
+            """
+
+            # Free all windows in the order they were allocated
+            for win in shared_wins:
+                win.Free()
+            shared_wins.clear()
+
+        # Specialized gather function that automatically makes use of buffers
+        @override
+        def gather(self, sendobj, root=0, concatenate=False,
+                   compression=None):
             """
-            Special send method that automatically uses the appropriate
-            method (:meth:`~MPI.Intracomm.send` or :meth:`~MPI.Intracomm.Send`)
-            depending on the type of the provided `obj`.
+            Special gather method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.gather` or
+            :meth:`~MPI.Intracomm.Gatherv`) depending on the lay-out of the
+            provided `sendobj`.
+
+            If `sendobj` is a :obj:`~numpy.ndarray` with the same data type on
+            all MPI ranks, all arrays are gathered with a single
+            :meth:`~MPI.Intracomm.Gatherv` into one contiguous array on
+            `root`.
 
             Parameters
             ----------
-            obj : :obj:`~numpy.ndarray` or object
-                The object to send to the MPI rank `dest`.
-                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Send`.
-                If not, use :meth:`~MPI.Intracomm.send` instead.
-            dest : int
-                The integer identifier of the MPI rank where `obj` must be sent
-                to.
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to gather from all MPI ranks.
+                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Gatherv`.
+                If not, pickle it with its large buffers out-of-band (see
+                :func:`~mpi4pyd.MPI._helpers.pickle_parts`) and gather all
+                pickles with a single :meth:`~MPI.Intracomm.gather` if they
+                are at most :attr:`~INLINE_LIMIT` bytes on all MPI ranks, or
+                all parts with :meth:`~MPI.Intracomm.Gatherv` instead.
 
             Optional
             --------
-            tag : int. Default: 0
-                The tag used for the send/receive communication between this
-                rank and `dest`.
+            root : int. Default: 0
+                The MPI rank that gathers `sendobj`.
+            concatenate : bool. Default: False
+                Whether to return the contiguous array all arrays were
+                gathered into, instead of a list of views of this array.
+                The gathered arrays are concatenated along their first axis,
+                or stacked if they are all 0-dimensional.
+                This argument is ignored if `sendobj` is not a
+                :obj:`~numpy.ndarray` on all MPI ranks.
+            compression : str, bool or None. Default: None
+                The codec that the payload of `sendobj` is compressed with, as
+                described in :meth:`~send`. If the payload is compressed on
+                any MPI rank, the parts of all objects are gathered instead of
+                using a single :meth:`~MPI.Intracomm.Gatherv`, and the arrays
+                are concatenated on `root` after they were decompressed.
+
+            Returns
+            -------
+            recvobj : list, :obj:`~numpy.ndarray` or None
+                If MPI rank is `root`, returns a list of gathered objects or
+                the concatenated :obj:`~numpy.ndarray` if `concatenate` is
+                *True*.
+                Else, returns *None*.
 
             """
 
-            # Check if obj can be sent as a buffer object
-            use_buffer = use_buffer_meth(obj, dest, tag)
+            # Compress the payload of obj if requested
+            codec = get_codec(compression)
+            if codec is not None:
+                kind, _, _, parts = get_payload(sendobj, codec)
+            else:
+                kind = None
 
-            # If provided object uses a buffer, use Send
-            if use_buffer:
-                # Send the shape and dtype of obj to receiver
-                comm.send([obj.shape, obj.dtype], dest=dest, tag=tag)
+            # Pickle obj with its large buffers out-of-band if it is not an
+            # array and its payload was not compressed or pickled already
+            if(kind not in (HDR_COMPRESSED, HDR_PICKLE)):
+                if(get_buffer_kind(sendobj) == HDR_NDARRAY):
+                    kind, parts = HDR_NDARRAY, None
+                else:
+                    kind, parts = HDR_PICKLE, pickle_parts(sendobj)
 
-                # Then send the NumPy array as a buffer object
-                comm.Send(obj, dest=dest, tag=tag)
+            # Check if obj can be gathered as a buffer object on all ranks and
+            # if the payload of any rank is too large to be gathered in-band
+            nbytes = (sendobj.nbytes if parts is None
+                      else sum(part.nbytes for part in parts))
+            use_buffer, max_size, large = negotiate_all(
+                sendobj if parts is None else False, same_shape=False,
+                large=(nbytes > INLINE_LIMIT))
 
-            # If not, send obj the normal way
-            else:
-                comm.send(obj, dest=dest, tag=tag)
+            # If all provided objects use buffers
+            if use_buffer:
+                # Check if the gathered arrays may not fit in a single chunk
+                chunked = (max_size*size > chunk_size)
 
-    # %% UTILITY FUNCTIONS
-    # This function checks if a buffer communication method can be used
-    def use_buffer_meth(obj, src_dest, tag=0):
-        """
-        Depending on which communication method calls this function,
-        determines if the provided `obj` on all MPI ranks can be
-        communicated using an uppercase communication method.
+                # If so or if the arrays are gathered hierarchically, gather
+                # the shapes of obj on all ranks. Else, only on the receiver
+                if(chunked or hierarchical):
+                    shapes = comm.allgather(sendobj.shape)
+                else:
+                    shapes = comm.gather(sendobj.shape, root=root)
 
-        This function must be called by all MPI ranks that are communicating.
-        This function must never be called directly.
+                # Gather all NumPy arrays from all ranks
+                buff, pieces = gather_buffer(sendobj, shapes, root, chunked)
 
-        """
+                # Receiver returns the (concatenated) gathered arrays
+                if(rank != root):
+                    recvobj = None
+                elif concatenate:
+                    recvobj = concatenate_shape(buff, shapes)
+                else:
+                    recvobj = pieces
 
-        # Determine the name of the frame calling this method
-        meth_name = currentframe().f_back.f_code.co_name
+            # If not, gather the pickled or compressed payloads of obj
+            else:
+                # Arrays that cannot be gathered as buffers are pickled too
+                if parts is None:
+                    kind, parts = HDR_PICKLE, pickle_parts(sendobj)
+
+                # If all payloads are small, they consist of a single part
+                # that is gathered from all ranks in-band
+                if not large:
+                    msgs = comm.gather((kind, parts[0].tobytes()), root=root)
+                    if(rank == root):
+                        kinds, recv_parts = zip(*[
+                            (kind, [np.frombuffer(msg, dtype=np.uint8)])
+                            for kind, msg in msgs])
+
+                # Else, exchange the kind and number of elements in every part
+                else:
+                    kinds, sizes = zip(*comm.allgather(
+                        (kind, [part.size for part in parts])))
+
+                    # Gather the parts with the same index from all ranks
+                    recv_parts = [[] for _ in range(size)]
+                    for i in range(max(map(len, sizes))):
+                        # Ranks without a part with this index send an empty
+                        # one
+                        shapes = [(n[i] if(i < len(n)) else 0,)
+                                  for n in sizes]
+                        part = (parts[i] if(i < len(parts))
+                                else np.empty(0, dtype=np.uint8))
+                        _, pieces = gather_buffer(
+                            part, shapes, root,
+                            max(shapes)[0]*size > chunk_size)
+
+                        # Receiver adds all received parts to their object
+                        if(rank == root):
+                            for recv, n, piece in zip(recv_parts, sizes,
+                                                      pieces):
+                                if(i < len(n)):
+                                    recv.append(piece)
+
+                # Receiver decompresses and unpickles all objects
+                if(rank == root):
+                    recvobj = [finish_message(kind, recv if(kind == HDR_PICKLE)
+                                              else recv[0])
+                               for kind, recv in zip(kinds, recv_parts)]
+
+                    # If requested, concatenate arrays with the same data
+                    # type, which were not gathered as buffers if compressed
+                    if(concatenate and
+                       all(get_buffer_kind(obj) == HDR_NDARRAY
+                           for obj in recvobj) and
+                       len(set(obj.dtype for obj in recvobj)) == 1):
+                        recvobj = concatenate_shape(
+                            np.concatenate([obj.ravel() for obj in recvobj]),
+                            [obj.shape for obj in recvobj])
+                else:
+                    recvobj = None
 
-        # Check who called this method and act accordingly
-        # SEND/RECV
-        if meth_name in ('recv', 'send'):
-            # SEND
-            if(meth_name == 'send'):
-                # Determine if this object is a buffer object
-                buff_flag = is_buffer_obj(obj)
+            # Return recvobj
+            return(recvobj)
 
-                # Send this to the receiver
-                comm.send(buff_flag, dest=src_dest, tag=tag)
+        # Specialized non-blocking allreduce function that uses buffers
+        @override
+        def iallreduce(self, sendobj, op=comm_MPI.SUM):
+            """
+            Non-blocking version of :meth:`~allreduce`, which returns a
+            request that reduces the provided `sendobj` over all MPI ranks.
 
-                # Return buff_flag
-                return(buff_flag)
+            Whether `sendobj` is a :obj:`~numpy.ndarray` on all MPI ranks is
+            negotiated with :meth:`~MPI.Intracomm.Iallreduce`, after which
+            all chunks of `sendobj` are reduced with
+            :meth:`~MPI.Intracomm.Iallreduce` as well. Other objects are
+            pickled and gathered with :meth:`~MPI.Intracomm.Iallgatherv`,
+            after which every MPI rank reduces them in rank order.
 
-            # RECV
-            else:
-                # Receive and return buff_flag
-                return(comm.recv(obj, source=src_dest, tag=tag))
+            Parameters
+            ----------
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to reduce over all MPI ranks.
+                If it is a :obj:`~numpy.ndarray` with the same shape and data
+                type on all MPI ranks, it is reduced as a buffer object.
+                It must not be modified before the request has completed.
 
-        # BCAST/SCATTER
-        elif meth_name in ('bcast', 'scatter'):
-            return(comm.bcast(is_buffer_obj(obj), root=src_dest))
+            Optional
+            --------
+            op : :obj:`~MPI.Op` object. Default: :obj:`~MPI.SUM`
+                The reduction operation to apply.
 
-        # GATHER
-        elif(meth_name == 'gather'):
-            return(comm.allreduce(is_buffer_obj(obj), op=MPI.MIN))
+            Returns
+            -------
+            request : :obj:`~mpi4pyd.MPI._request.HybridRequest` object
+                The request of the reduction, which returns the reduced object
+                when it is completed with
+                :meth:`~mpi4pyd.MPI._request.HybridRequest.wait`.
 
-        # NOT IMPLEMENTED
-        else:  # pragma: no cover
-            raise NotImplementedError
+            """
+
+            return(post_coll(allreduce_steps(sendobj, op)))
+
+        # Specialized non-blocking bcast function that uses buffers
+        @override
+        def ibcast(self, obj, root=0, compression=None):
+            """
+            Non-blocking version of :meth:`~bcast`, which returns a request
+            that broadcasts the provided `obj` to all MPI ranks.
+
+            The binary header that :meth:`~send` would send is broadcasted
+            with :meth:`~MPI.Intracomm.Ibcast`, preceded by its length. If the
+            payload of `obj` was not folded into the header, all of its chunks
+            are broadcasted with :meth:`~MPI.Intracomm.Ibcast` afterward.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to broadcast to all MPI ranks.
+                It must not be modified before the request has completed.
+
+            Optional
+            --------
+            root : int. Default: 0
+                The MPI rank that broadcasts `obj`.
+            compression : str, bool or None. Default: None
+                The codec that the payload of `obj` is compressed with, as
+                described in :meth:`~send`. Only used on `root`.
+
+            Returns
+            -------
+            request : :obj:`~mpi4pyd.MPI._request.HybridRequest` object
+                The request of the broadcast, which returns the broadcasted
+                `obj` when it is completed with
+                :meth:`~mpi4pyd.MPI._request.HybridRequest.wait`.
+
+            """
+
+            return(post_coll(bcast_steps(obj, root, get_codec(compression))))
+
+        # Specialized non-blocking recv function that uses buffers
+        @override
+        def irecv(self, buf=None, source=comm_MPI.ANY_SOURCE,
+                  tag=comm_MPI.ANY_TAG):
+            """
+            Non-blocking version of :meth:`~recv`, which returns a request
+            that receives an object sent with :meth:`~send` or
+            :meth:`~isend`.
+
+            The binary header is received as soon as it has arrived, after
+            which all chunks of the payload are received with
+            :meth:`~MPI.Intracomm.Irecv`.
+
+            Optional
+            --------
+            buf : :obj:`~numpy.ndarray` or None. Default: None
+                The array that a received NumPy array is received in, as
+                described in :meth:`~recv`.
+            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
+                The integer identifier of the MPI rank where the object will be
+                sent from.
+            tag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
+                The tag used for the send/receive communication between this
+                rank and `source`.
+
+            Returns
+            -------
+            request : :obj:`~mpi4pyd.MPI._request.HybridRequest` object
+                The request of the receive, which returns the received object
+                when it is completed with
+                :meth:`~mpi4pyd.MPI._request.HybridRequest.wait`.
+
+            """
+
+            return(post_recv(source, tag, comm_MPI.Status(), buf))
+
+        # Specialized non-blocking send function that uses buffers
+        @override
+        def isend(self, obj, dest, tag=0, compression=None):
+            """
+            Non-blocking version of :meth:`~send`, which returns a request
+            that sends the provided `obj` to the MPI rank `dest`.
+
+            All messages required for `obj` are posted directly with
+            :meth:`~MPI.Intracomm.Isend`.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to send to the MPI rank `dest`.
+                It must not be modified before the request has completed.
+            dest : int
+                The integer identifier of the MPI rank where `obj` must be sent
+                to.
+
+            Optional
+            --------
+            tag : int. Default: 0
+                The tag used for the send/receive communication between this
+                rank and `dest`.
+            compression : str, bool or None. Default: None
+                The codec that the payload of `obj` is compressed with, as
+                described in :meth:`~send`.
+
+            Returns
+            -------
+            request : :obj:`~mpi4pyd.MPI._request.HybridRequest` object
+                The request of the send.
+
+            """
+
+            return(HybridRequest(send_steps(obj, dest, tag,
+                                            get_codec(compression))))
+
+        # Persistent bcast function for repeated broadcasts of an array
+        @override
+        def plan_bcast(self, obj, root=0, out=None):
+            """
+            Creates a communication plan that broadcasts the NumPy array `obj`
+            from `root` to all MPI ranks every time it is started, for
+            iterative algorithms that broadcast an array with the same shape
+            and data type many times.
+
+            The shape and data type of `obj` are negotiated only once when
+            the plan is created, after which the receive buffers and chunks of
+            `obj` are fixed. If `comm` supports persistent collectives
+            (:meth:`~MPI.Intracomm.Bcast_init`), these are used. Otherwise, the
+            chunks are broadcasted with :meth:`~MPI.Intracomm.Ibcast` every
+            time the plan is started.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray`
+                The array to broadcast to all MPI ranks. Every time the plan is
+                started, the current contents of `obj` on `root` are
+                broadcasted.
+
+            Optional
+            --------
+            root : int. Default: 0
+                The MPI rank that broadcasts `obj`.
+            out : :obj:`~numpy.ndarray` or None. Default: None
+                The array that receivers receive `obj` in, as described in
+                :meth:`~bcast`.
+
+            Returns
+            -------
+            plan : :obj:`~mpi4pyd.dummyMPI.Prequest` object
+                The persistent request of the plan, which is started with
+                :meth:`~mpi4pyd.dummyMPI.Prequest.start` and returns the
+                broadcasted array when completed with
+                :meth:`~mpi4pyd.dummyMPI.Prequest.wait`. It can be started
+                again once it has completed, and must be started in the same
+                order on all MPI ranks with respect to other collective
+                communications. Its resources are released with
+                :meth:`~mpi4pyd.dummyMPI.Prequest.Free`.
+
+            """
+
+            # Let root decide how obj is broadcasted
+            header = negotiate_root(obj, root)
+
+            # Raise error if obj is not a NumPy array
+            if(header[0] != HDR_NDARRAY):
+                raise TypeError("Input argument 'obj' must be a NumPy array!")
+
+            # Obtain the array that the plan broadcasts
+            if(rank == root):
+                data, before, packed = plan_source(obj)
+            else:
+                obj = data = empty_array(*header[1:], out)
+                before = None
+                packed = []
+
+            # Create the plan
+            return(make_plan('Bcast', data, (root,), before, lambda: obj,
+                             packed))
+
+        # Persistent recv function for repeated receives of an array
+        @override
+        def plan_recv(self, buf=None, source=comm_MPI.ANY_SOURCE,
+                      tag=comm_MPI.ANY_TAG):
+            """
+            Creates a communication plan that receives a NumPy array sent with
+            a plan created by :meth:`~plan_send` every time it is started.
+
+            The shape and data type of the array are received from the sending
+            plan when this plan is created, after which the array is received
+            in the same buffer every time. If `comm` supports persistent
+            requests (:meth:`~MPI.Comm.Recv_init`), these are used. Otherwise,
+            the chunks of the array are received with
+            :meth:`~MPI.Comm.Irecv` every time the plan is started.
+
+            Optional
+            --------
+            buf : :obj:`~numpy.ndarray` or None. Default: None
+                The array that the array is received in, as described in
+                :meth:`~recv`.
+            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
+                The integer identifier of the MPI rank whose sending plan must
+                be received. The plan only receives from this MPI rank
+                afterward.
+            tag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
+                The tag of the sending plan.
+
+            Returns
+            -------
+            plan : :obj:`~mpi4pyd.dummyMPI.Prequest` object
+                The persistent request of the plan, which returns the received
+                array when completed, as described in :meth:`~plan_bcast`.
+
+            """
+
+            # Receive the shape and data type of the array once
+            status = comm_MPI.Status()
+            shape, dtype = self.recv(None, source, tag, status)
+
+            # Obtain the array that the plan receives in
+            if not fits_buffer(buf, shape, dtype):
+                buf = None
+            recvobj = empty_array(shape, dtype, buf)
+
+            # Create the plan
+            return(make_plan('Recv', recvobj,
+                             (status.Get_source(), status.Get_tag()),
+                             finish=lambda: recvobj))
+
+        # Persistent send function for repeated sends of an array
+        @override
+        def plan_send(self, obj, dest, tag=0):
+            """
+            Creates a communication plan that sends the NumPy array `obj` to
+            the MPI rank `dest` every time it is started, where it must be
+            received with a plan created by :meth:`~plan_recv`.
+
+            The shape and data type of `obj` are sent to `dest` only once when
+            the plan is created, after which only the data of `obj` is sent.
+            If `comm` supports persistent requests
+            (:meth:`~MPI.Comm.Send_init`), these are used. Otherwise, the
+            chunks of `obj` are sent with :meth:`~MPI.Comm.Isend` every time
+            the plan is started.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray`
+                The array to send to the MPI rank `dest`. Every time the plan
+                is started, the current contents of `obj` are sent.
+            dest : int
+                The integer identifier of the MPI rank where `obj` must be sent
+                to.
+
+            Optional
+            --------
+            tag : int. Default: 0
+                The tag used for the communication between this rank and
+                `dest`, which should not be used by other communications
+                between them while the plan exists.
+
+            Returns
+            -------
+            plan : :obj:`~mpi4pyd.dummyMPI.Prequest` object
+                The persistent request of the plan, as described in
+                :meth:`~plan_bcast`.
+
+            """
+
+            # Raise error if obj is not a NumPy array
+            if(get_buffer_kind(obj) != HDR_NDARRAY):
+                raise TypeError("Input argument 'obj' must be a NumPy array!")
+
+            # Send the shape and data type of obj once
+            self.send((obj.shape, obj.dtype), dest, tag)
+
+            # Create the plan
+            data, before, packed = plan_source(obj)
+            return(make_plan('Send', data, (dest, tag), before, None, packed))
+
+        # Specialized recv function that automatically makes use of buffers
+        @override
+        def recv(self, buf=None, source=comm_MPI.ANY_SOURCE,
+                 tag=comm_MPI.ANY_TAG, status=None):
+            """
+            Special receive method that receives an object sent with
+            :meth:`~send`.
+            Buffer objects are received as the same type they were sent as,
+            or as a :obj:`memoryview` if that type cannot be recreated.
+
+            The binary header sent by :meth:`~send` is received first, which
+            describes the object that is being received. If the object was
+            folded into the header message, it is obtained from there.
+            Otherwise, it is received with :meth:`~MPI.Intracomm.Irecv`.
+            Unfinished requests of :meth:`~irecv` that can receive the same
+            messages are completed first, such that objects are received in
+            the order they were requested.
+
+            Optional
+            --------
+            buf : :obj:`~numpy.ndarray` or None. Default: None
+                If the received object is a NumPy array and `buf` is a
+                writeable C-contiguous array with the same shape and data type,
+                the received array is written into `buf`, which is returned.
+                Else, the array is received in an array from
+                :attr:`~recv_pool` or a new array, and `buf` is ignored like
+                :meth:`~MPI.Intracomm.recv` does with buffers that are too
+                small.
+            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
+                The integer identifier of the MPI rank where the object will be
+                sent from.
+            tag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
+                The tag used for the send/receive communication between this
+                rank and `recv`.
+            status : :obj:`~mpi4py.MPI.Status` object or None. Default: None
+                If not *None*, the status object to use for storing the status
+                of this communication process.
+
+            Returns
+            -------
+            recvobj : object
+                The object that was received from `source`.
+
+            """
+
+            # Receive the object and return it
+            if status is None:
+                status = comm_MPI.Status()
+            return(post_recv(source, tag, status, buf).wait())
+
+        # Specialized reduce function that automatically makes use of buffers
+        @override
+        def reduce(self, sendobj, op=comm_MPI.SUM, root=0):
+            """
+            Special reduce method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.reduce` or
+            :meth:`~MPI.Intracomm.Reduce`) depending on the type of the
+            provided `sendobj`.
+
+            Parameters
+            ----------
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to reduce over all MPI ranks.
+                If :obj:`~numpy.ndarray` with the same shape and data type on
+                all MPI ranks, use :meth:`~MPI.Intracomm.Reduce`.
+                If not, use :meth:`~MPI.Intracomm.reduce` instead.
+
+            Optional
+            --------
+            op : :obj:`~MPI.Op` object. Default: :obj:`~MPI.SUM`
+                The reduction operation to apply.
+            root : int. Default: 0
+                The MPI rank that receives the reduced object.
+
+            Returns
+            -------
+            recvobj : :obj:`~numpy.ndarray`, object or None
+                If MPI rank is `root`, returns the reduced object.
+                Else, returns *None*.
+
+            """
+
+            # Check if obj can be reduced as a buffer object on all ranks
+            use_buffer, _, _ = negotiate_all(sendobj)
+
+            # If all provided objects use buffers
+            if use_buffer:
+                # Root reduces NumPy array into an empty array in chunks
+                if(rank == root):
+                    recvobj = np.empty(sendobj.shape, dtype=sendobj.dtype)
+                else:
+                    recvobj = None
+                for idx in get_chunk_slices(sendobj.shape, chunk_size):
+                    if(hierarchical and op.Is_commutative()):
+                        hier_reduce(sendobj[idx], None if recvobj is None else
+                                    recvobj[idx], op, root)
+                    else:
+                        packed = []
+                        comm.Reduce(
+                            array_msg(sendobj[idx], packed, derived=False),
+                            None if recvobj is None else
+                            buffer_msg(recvobj[idx]), op=op, root=root)
+                        release_packed(packed)
+
+            # If not, reduce obj the normal way
+            else:
+                recvobj = comm.reduce(sendobj, op=op, root=root)
+
+            # Return recvobj
+            return(recvobj)
+
+        # Specialized scatter function that automatically makes use of buffers
+        @override
+        def scatter(self, sendobj, root=0, counts=None, axis=0, out=None):
+            """
+            Special scatter method that automatically uses the appropriate
+            method (:meth:`~MPI.Intracomm.scatter` or
+            :meth:`~MPI.Intracomm.Scatterv`) depending on the type of the
+            provided `sendobj`.
+
+            Unlike :meth:`~MPI.Intracomm.scatter`, providing a buffer object
+            with more or less than :attr:`~_size` items will not raise an
+            error, but distribute all the items as evenly as possible instead.
+            Alternatively, the number of items each MPI rank receives can be
+            provided with `counts`.
+
+            Parameters
+            ----------
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to scatter to all MPI ranks.
+                If :obj:`~numpy.ndarray`, use :meth:`~MPI.Intracomm.Scatterv`.
+                If not, use :meth:`~MPI.Intracomm.scatter` instead.
+
+            Optional
+            --------
+            root : int. Default: 0
+                The MPI rank that scatters `sendobj`.
+            counts : list of int or None. Default: None
+                The number of items along `axis` that every MPI rank receives.
+                If *None*, the items are distributed as evenly as possible,
+                with the lowest MPI ranks receiving an extra item if required.
+                This argument is only significant on `root` and ignored if
+                `sendobj` is not a :obj:`~numpy.ndarray`.
+            axis : int. Default: 0
+                The axis of `sendobj` along which it is scattered.
+                This argument is only significant on `root` and ignored if
+                `sendobj` is not a :obj:`~numpy.ndarray`.
+            out : :obj:`~numpy.ndarray` or None. Default: None
+                If not *None*, the writeable C-contiguous array with the shape
+                and data type of the array this MPI rank receives, in which it
+                is received.
+                If *None*, the array is received in an array from
+                :attr:`~recv_pool` or a new array.
+                This argument is ignored if `sendobj` is not a
+                :obj:`~numpy.ndarray`.
+
+            Returns
+            -------
+            recvobj : :obj:`~numpy.ndarray` or object
+                The object that has been scattered to this MPI rank.
+                If `counts` is *None* and `sendobj` has exactly :attr:`~_size`
+                items along `axis`, this MPI rank receives the item itself
+                (removing `axis`), like :meth:`~MPI.Intracomm.scatter` would.
+
+            """
+
+            # Let root decide how obj is scattered
+            header = negotiate_root(sendobj, root, counts, axis)
+
+            # If provided object uses a buffer
+            if(header[0] == HDR_NDARRAY):
+                # Obtain the properties of sendobj
+                shape, dtype, counts, axis = header[1:]
+
+                # Raise error if axis is invalid
+                if not -len(shape) <= axis < len(shape):
+                    raise e13.ShapeError("Input argument 'axis' is out of "
+                                         "bounds for 'sendobj'!")
+                axis %= len(shape)
+
+                # Determine the shape and number of items along axis
+                item_shape = shape[:axis]+shape[axis+1:]
+                n_items = shape[axis]
+
+                # Check if every rank receives a single item
+                single = counts is None and (n_items == size)
+
+                # Determine the counts and displacements of all ranks
+                counts = split_counts(n_items, counts)
+                displs = np.cumsum([0, *counts[:-1]]).tolist()
+
+                # Determine the shape of the array this rank receives
+                if single:
+                    recv_shape = item_shape
+                else:
+                    recv_shape = (*shape[:axis], counts[rank], *shape[axis+1:])
+
+                # Obtain the array this rank receives in, which is only
+                # possible directly if axis is the first
+                if(single or not axis):
+                    recvobj = buff = empty_array(recv_shape, dtype, out)
+                else:
+                    recvobj = (None if out is None
+                               else empty_array(recv_shape, dtype, out))
+                    buff = np.empty((counts[rank], *item_shape), dtype=dtype)
+
+                # Root places the items of sendobj contiguously in memory
+                packed = []
+                if(rank == root):
+                    # Move axis to the front and pack it if required
+                    sendobj = np.moveaxis(sendobj, axis, 0)
+                    if not sendobj.flags.c_contiguous:
+                        sendobj = pack_array(sendobj, packed)
+
+                    # Determine element counts and displacements of all ranks
+                    item_size = int(np.prod(item_shape))
+                    sendbuf = buffer_msg(sendobj,
+                                         [item_size*n for n in counts],
+                                         [item_size*n for n in displs])
+                else:
+                    sendbuf = None
+
+                # Scatter NumPy array
+                comm.Scatterv(sendbuf, buffer_msg(buff), root=root)
+                release_packed(packed)
+
+                # Move scattered axis back if it was moved to the front
+                if buff is not recvobj:
+                    if recvobj is None:
+                        recvobj = np.moveaxis(buff, 0, axis)
+                    else:
+                        np.copyto(recvobj, np.moveaxis(buff, 0, axis))
+
+            # If not, scatter obj the normal way
+            else:
+                recvobj = comm.scatter(sendobj, root=root)
+
+            # Return recvobj
+            return(recvobj)
+
+        # Specialized send function that automatically makes use of buffers
+        @override
+        def send(self, obj, dest, tag=0, compression=None):
+            """
+            Special send method that sends the provided `obj` as a buffer
+            object, using a compact binary header to describe it.
+
+            If the payload of `obj` is at most :attr:`~INLINE_LIMIT` bytes, it
+            is folded into the header message, requiring only a single message
+            for the entire communication. Otherwise, the payload is sent with
+            :meth:`~MPI.Intracomm.Send` after the header message.
+            Inside an :meth:`~aggregate` context, single messages are queued
+            and sent together with other small objects instead.
+            If requested, the payload is compressed before it is sent, which
+            is recorded in the header such that :meth:`~recv` decompresses it.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to send to the MPI rank `dest`.
+                If it supports the buffer protocol (see
+                :func:`~mpi4pyd.MPI._helpers.get_buffer_kind`), send its data
+                buffer directly.
+                If not, send it as a pickled byte array instead, with its large
+                buffers sent separately (see
+                :func:`~mpi4pyd.MPI._helpers.pickle_parts`).
+            dest : int
+                The integer identifier of the MPI rank where `obj` must be sent
+                to.
+
+            Optional
+            --------
+            tag : int. Default: 0
+                The tag used for the send/receive communication between this
+                rank and `dest`.
+            compression : str, bool or None. Default: None
+                The name of the codec that the payload of `obj` is compressed
+                with if it has at least :attr:`~compress_threshold` bytes (see
+                :attr:`~compression`). If *None*, :attr:`~compression` is used.
+                If *False*, the payload is not compressed.
+
+            """
+
+            # Obtain all messages required for obj
+            packed = []
+            msgs = pack_message(obj, packed, dest, tag, get_codec(compression))
+
+            # If sends are aggregated and obj fits in a single message, queue
+            # it
+            if(aggregation is not None and len(msgs) == 1):
+                queue_message(msgs[0][0], dest, tag)
+
+            # Else, send all queued messages for dest and tag, and then obj
+            else:
+                flush_queue((dest, tag))
+                for msg in msgs:
+                    comm.Send(msg, dest=dest, tag=tag)
+            release_packed(packed)
+
+        # Context manager that aggregates small sends into batches
+        @override
+        @contextmanager
+        def aggregate(self, max_bytes=4*INLINE_LIMIT, max_delay=None):
+            """
+            Context manager in which :meth:`~send` aggregates small objects
+            that are sent to the same MPI rank with the same tag into a single
+            batch message, instead of sending every object separately.
+
+            Every object whose payload is folded into its header message (see
+            :meth:`~send`) is added to the queue of its destination and tag.
+            A queue is sent as a single message as soon as it holds at least
+            `max_bytes` bytes or :attr:`~MAX_BATCH` objects, or when its oldest
+            object has been queued for longer than `max_delay` seconds when
+            another object is queued. Objects that are not queued first send
+            the queue of their destination and tag, such that all objects
+            still arrive in the order they were sent. All queues are sent when
+            the context exits or when :meth:`~flush` is called.
+
+            Receivers do not have to do anything, as :meth:`~recv` and its
+            non-blocking versions split up batches and return their objects
+            one by one.
+
+            Optional
+            --------
+            max_bytes : int. Default: 65536
+                The number of bytes in a queue at which it is sent.
+            max_delay : float or None. Default: None
+                The number of seconds after which a queue is sent when another
+                object is queued.
+                If *None*, queues are never sent because of their age.
+
+            Yields
+            ------
+            self : :obj:`~HybridComm` object
+                This communicator.
+
+            Note
+            ----
+            As queued objects are only sent when :meth:`~send` is called again
+            or the context exits, :meth:`~flush` must be called before waiting
+            for a reply to a queued object. Like with MPI itself, objects sent
+            with different tags or to different MPI ranks may arrive in a
+            different order than they were sent in. Batches are not split up
+            by other methods, like :meth:`~MPI.Comm.Probe`.
+
+            """
+
+            nonlocal aggregation
+
+            # Check if max_bytes is a positive integer
+            if(int(max_bytes) != max_bytes or max_bytes < 1):
+                raise ValueError("Input argument 'max_bytes' must be a "
+                                 "positive integer!")
+
+            # Check if max_delay is a non-negative number or None
+            if max_delay is not None and not max_delay >= 0:
+                raise ValueError("Input argument 'max_delay' must be a "
+                                 "non-negative number or None!")
+
+            # Aggregate sends with the given policy, restoring the previous
+            # policy afterward
+            previous = aggregation
+            aggregation = (int(max_bytes), max_delay)
+            try:
+                yield self
+            finally:
+                aggregation = previous
+                self.flush()
+
+        # Function that sends all queued objects
+        @override
+        def flush(self):
+            """
+            Sends all objects that were queued by :meth:`~send` inside an
+            :meth:`~aggregate` context, with every queue sent as a single
+            message.
+
+            """
+
+            for key in list(send_queues):
+                flush_queue(key)
+
+        # Specialized sendrecv function that automatically uses buffers
+        @override
+        def sendrecv(self, sendobj, dest, sendtag=0, recvbuf=None,
+                     source=comm_MPI.ANY_SOURCE, recvtag=comm_MPI.ANY_TAG,
+                     status=None):
+            """
+            Special send-receive method that sends `sendobj` in the same way as
+            :meth:`~send` and receives an object in the same way as
+            :meth:`~recv`.
+
+            The messages for `sendobj` are posted with
+            :meth:`~MPI.Intracomm.Isend` before receiving, such that MPI ranks
+            can exchange objects with each other without deadlocking.
+
+            Parameters
+            ----------
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to send to the MPI rank `dest`.
+            dest : int
+                The integer identifier of the MPI rank where `sendobj` must be
+                sent to.
+
+            Optional
+            --------
+            sendtag : int. Default: 0
+                The tag used for sending `sendobj` to `dest`.
+            recvbuf : None. Default: None
+                The `recvbuf` argument that the
+                :meth:`~MPI.Intracomm.sendrecv` method takes. As the received
+                object is always returned, this argument has no use, but is
+                here to ensure that the method signature is the same.
+            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
+                The integer identifier of the MPI rank where the received
+                object will be sent from.
+            recvtag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
+                The tag used for receiving the object from `source`.
+            status : :obj:`~mpi4py.MPI.Status` object or None. Default: None
+                If not *None*, the status object to use for storing the status
+                of the receiving communication process.
+
+            Returns
+            -------
+            recvobj : object
+                The object that was received from `source`.
+
+            """
+
+            # Post all messages required for sendobj
+            request = self.isend(sendobj, dest, tag=sendtag)
+
+            # Receive object from source
+            recvobj = self.recv(None, source=source, tag=recvtag,
+                                status=status)
+
+            # Wait until sendobj has been sent and return recvobj
+            request.Wait()
+            return(recvobj)
+
+        # %% ASYNCHRONOUS COMMUNICATION METHODS
+        # Asynchronous allreduce function that does not block the event loop
+        @override
+        async def aallreduce(self, sendobj, op=comm_MPI.SUM, timeout=None):
+            """
+            Asynchronous version of :meth:`~allreduce`, which reduces the
+            provided `sendobj` with :meth:`~iallreduce` while the
+            :mod:`asyncio` event loop keeps running other tasks.
+
+            As all MPI ranks take part in the reduction, it is finished in the
+            background if the awaiting task is cancelled or `timeout` expires.
+
+            Parameters
+            ----------
+            sendobj : :obj:`~numpy.ndarray` or object
+                The object to reduce over all MPI ranks.
+
+            Optional
+            --------
+            op : :obj:`~MPI.Op` object. Default: :obj:`~MPI.SUM`
+                The reduction operation to apply.
+            timeout : float or None. Default: None
+                The maximum number of seconds to wait for the reduction.
+                If *None*, there is no time limit.
+
+            Returns
+            -------
+            recvobj : :obj:`~numpy.ndarray` or object
+                The reduced object.
+
+            """
+
+            return(await asyncio.wait_for(self.iallreduce(sendobj, op),
+                                          timeout))
+
+        # Asynchronous bcast function that does not block the event loop
+        @override
+        async def abcast(self, obj, root=0, timeout=None):
+            """
+            Asynchronous version of :meth:`~bcast`, which broadcasts the
+            provided `obj` with :meth:`~ibcast` while the :mod:`asyncio`
+            event loop keeps running other tasks.
+
+            As all MPI ranks take part in the broadcast, it is finished in the
+            background if the awaiting task is cancelled or `timeout` expires.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to broadcast to all MPI ranks.
+
+            Optional
+            --------
+            root : int. Default: 0
+                The MPI rank that broadcasts `obj`.
+            timeout : float or None. Default: None
+                The maximum number of seconds to wait for the broadcast.
+                If *None*, there is no time limit.
+
+            Returns
+            -------
+            obj : object
+                The broadcasted `obj`.
+
+            """
+
+            return(await asyncio.wait_for(self.ibcast(obj, root), timeout))
+
+        # Asynchronous recv function that does not block the event loop
+        @override
+        async def arecv(self, buf=None, source=comm_MPI.ANY_SOURCE,
+                        tag=comm_MPI.ANY_TAG, timeout=None):
+            """
+            Asynchronous version of :meth:`~recv`, which receives an object
+            with :meth:`~irecv` while the :mod:`asyncio` event loop keeps
+            running other tasks.
+
+            If the awaiting task is cancelled or `timeout` expires before the
+            header message of the object has arrived, the receive is cancelled
+            and the object can be received by a later call instead.
+            Otherwise, the object is received in the background.
+
+            Optional
+            --------
+            buf : :obj:`~numpy.ndarray` or None. Default: None
+                The array that a received NumPy array is received in, as
+                described in :meth:`~recv`.
+            source : int. Default: :obj:`~mpi4py.MPI.ANY_SOURCE`
+                The integer identifier of the MPI rank where the object will be
+                sent from.
+            tag : int. Default: :obj:`~mpi4py.MPI.ANY_TAG`
+                The tag used for the send/receive communication between this
+                rank and `source`.
+            timeout : float or None. Default: None
+                The maximum number of seconds to wait for the object.
+                If *None*, there is no time limit.
+
+            Returns
+            -------
+            recvobj : object
+                The object that was received from `source`.
+
+            """
+
+            return(await asyncio.wait_for(self.irecv(buf, source, tag),
+                                          timeout))
+
+        # Asynchronous send function that does not block the event loop
+        @override
+        async def asend(self, obj, dest, tag=0, timeout=None):
+            """
+            Asynchronous version of :meth:`~send`, which sends the provided
+            `obj` with :meth:`~isend` while the :mod:`asyncio` event loop
+            keeps running other tasks.
+
+            If the awaiting task is cancelled or `timeout` expires, `obj` is
+            still sent in the background.
+
+            Parameters
+            ----------
+            obj : :obj:`~numpy.ndarray` or object
+                The object to send to the MPI rank `dest`.
+            dest : int
+                The integer identifier of the MPI rank where `obj` must be sent
+                to.
+
+            Optional
+            --------
+            tag : int. Default: 0
+                The tag used for the send/receive communication between this
+                rank and `dest`.
+            timeout : float or None. Default: None
+                The maximum number of seconds to wait for `obj` to be sent.
+                If *None*, there is no time limit.
+
+            """
+
+            await asyncio.wait_for(self.isend(obj, dest, tag), timeout)
+
+    # %% UTILITY FUNCTIONS
+    # This function creates the messages required for sending an object
+    def pack_message(obj, packed, dest=None, tag=0, codec=None):
+        """
+        Returns a list of the buffer objects that must be sent to communicate
+        the provided `obj` to another MPI rank.
+
+        If the payload of `obj` is at most :attr:`~INLINE_LIMIT` bytes, it is
+        folded into its header message. Otherwise, all parts of the payload
+        (see :func:`~get_payload`) are returned as separate messages of at most
+        :attr:`~chunk_size` elements after the header message, as given by
+        :func:`~array_msg` with the provided `packed`.
+        If `dest` is not *None*, the header message is sent through the header
+        cache of `dest` (see :func:`~get_header_cache`), which replaces it by
+        a marker if it is the same as the last one that was sent with `tag`.
+        The payload is compressed with `codec` as described in
+        :func:`~get_payload`.
+
+        """
+
+        # Obtain the payload of obj, pickling or compressing it if required
+        kind, shape, dtype, parts = get_payload(obj, codec)
+
+        # Small payloads are folded into the header message
+        if(len(parts) == 1 and parts[0].nbytes <= INLINE_LIMIT):
+            header = pack_header(kind, shape, dtype, HDR_INLINE)
+            return([[pack_inline(header, parts[0]), comm_MPI.BYTE]])
+
+        # Large payloads are sent separately in chunks after the header,
+        # which is replaced by a marker if it was sent to dest with tag last
+        # time
+        else:
+            if dest is None:
+                header = pack_header(kind, shape, dtype)
+            else:
+                header = get_header_cache(dest).pack(
+                    tag, pack_header(kind, shape, dtype, HDR_CACHED))
+            return([[header, comm_MPI.BYTE],
+                    *[array_msg(part[idx], packed) for part in parts
+                      for idx in get_chunk_slices(part.shape, chunk_size)]])
+
+    # This function returns the header cache of a rank
+    def get_header_cache(rank):
+        """
+        Returns the :obj:`~mpi4pyd.MPI._header_cache.HeaderCache` object that
+        holds the headers that were recently sent to and received from `rank`,
+        creating it if required.
+
+        """
+
+        # Create the header cache of rank if it does not exist yet
+        cache = header_caches.get(rank)
+        if cache is None:
+            cache = header_caches.setdefault(rank, HeaderCache())
+        return(cache)
+
+    # This function adds a small message to the queue of its destination
+    def queue_message(msg, dest, tag):
+        """
+        Adds the header message `msg` of an object to the queue of `dest` and
+        `tag`, after which all queues that must be sent according to the
+        policy of :meth:`~HybridComm.aggregate` are sent.
+
+        """
+
+        # Add msg to its queue, which holds its messages, their total length
+        # and when the first one was added
+        queue = send_queues.setdefault((dest, tag), [[], 0, perf_counter()])
+        queue[0].append(msg)
+        queue[1] += len(msg)
+
+        # Send the queue if it is full
+        max_bytes, max_delay = aggregation
+        if(queue[1] >= max_bytes or len(queue[0]) == MAX_BATCH):
+            flush_queue((dest, tag))
+
+        # Send all queues that have been waiting for too long
+        if max_delay is not None:
+            now = perf_counter()
+            for key, (_, _, start) in list(send_queues.items()):
+                if(now-start > max_delay):
+                    flush_queue(key)
+
+    # This function sends the queue of a destination and tag
+    def flush_queue(key):
+        """
+        Sends all messages in the queue of the given `key` (the destination
+        and tag) as a single message if it exists, after which it is removed.
+
+        """
+
+        # Obtain the messages in the queue, if it exists
+        queue = send_queues.pop(key, None)
+        if queue is None:
+            return
+
+        # Send a single message as is, and multiple messages as a batch
+        msgs = queue[0]
+        msg = msgs[0] if(len(msgs) == 1) else pack_batch(msgs)
+        comm.Send([msg, comm_MPI.BYTE], dest=key[0], tag=key[1])
+
+    # This function returns a buffer specification of an array in any lay-out
+    def array_msg(arr, packed, derived=True):
+        """
+        Returns a buffer specification that describes the data of the provided
+        NumPy array `arr` in C-order.
+
+        If `arr` is not C-contiguous, a cached derived datatype describing its
+        lay-out is used if `derived` is *True* and such a datatype exists.
+        Otherwise, `arr` is packed with :func:`~pack_array`, which appends the
+        used buffer to `packed`. The used datatype is appended to `packed` as
+        well, and all of them must be released with :func:`~release_packed`
+        after the communication has completed.
+
+        """
+
+        # If arr is contiguous, use it as is
+        if arr.flags.c_contiguous:
+            return(buffer_msg(arr))
+
+        # Else, try to describe arr with a derived datatype
+        if(derived and comm_MPI is MPI):
+            msg = strided_msg(arr)
+            if msg is not None:
+                packed.append(msg[2])
+                return(msg)
+
+        # If that is not possible, pack arr into a contiguous buffer
+        return(buffer_msg(pack_array(arr, packed)))
+
+    # This function releases all buffers and datatypes used by a communication
+    def release_packed(packed):
+        """
+        Releases all buffers in the provided `packed` to the pack pool, and
+        all derived datatypes in it with
+        :func:`~mpi4pyd.MPI._datatypes.release_strided_datatype`.
+
+        """
+
+        pack_pool.release(*[buff for buff in packed
+                            if isinstance(buff, np.ndarray)])
+        for datatype in packed:
+            if not isinstance(datatype, np.ndarray):
+                release_strided_datatype(datatype)
+
+    # This function packs an array into a buffer from the pack pool
+    def pack_array(arr, packed):
+        """
+        Copies the provided NumPy array `arr` into a C-contiguous buffer
+        acquired from the pack pool, appends it to `packed` and returns it.
+
+        """
+
+        buff = pack_pool.acquire(arr.shape, arr.dtype)
+        np.copyto(buff, arr)
+        packed.append(buff)
+        return(buff)
+
+    # This function gives a gathered array the shape of a concatenation
+    def concatenate_shape(buff, shapes):
+        """
+        Reshapes the 1D array `buff` containing the data of arrays with the
+        given `shapes` to the shape of their concatenation along the first
+        axis, or their stack if they are all 0-dimensional.
+
+        """
+
+        # If all arrays are 0D, return buff as is
+        if not any(shapes):
+            return(buff)
+
+        # Raise error if arrays cannot be concatenated along the first axis
+        if(min(map(len, shapes)) == 0 or
+           len(set(shape[1:] for shape in shapes)) != 1):
+            raise e13.ShapeError("Gathered arrays cannot be concatenated "
+                                 "along their first axis!")
+
+        # Return reshaped buff
+        return(buff.reshape(sum(shape[0] for shape in shapes),
+                            *shapes[0][1:]))
+
+    # This function splits items over all ranks
+    def split_counts(n_items, counts=None):
+        """
+        Returns the number of items out of `n_items` that every MPI rank
+        receives. If `counts` is *None*, the items are distributed as evenly
+        as possible. Else, `counts` is checked for validity and returned.
+
+        """
+
+        # If counts is None, distribute the items as evenly as possible
+        if counts is None:
+            n, r = divmod(n_items, size)
+            return([n+1]*r+[n]*(size-r))
+
+        # Else, check if counts is valid
+        counts = list(map(int, counts))
+        if(len(counts) != size or min(counts) < 0 or
+           sum(counts) != n_items):
+            raise e13.ShapeError("Input argument 'counts' must contain a "
+                                 "non-negative count for every MPI rank, "
+                                 "that add up to the number of items!")
+
+        # Return counts
+        return(counts)
+
+    # This function gathers arrays in chunks
+    def gather_chunks(sendobj, pieces, shapes, root):
+        """
+        Gathers the NumPy array `sendobj` with shape ``shapes[i]`` on every MPI
+        rank `i` into the arrays `pieces` on `root`, in chunks of at most
+        :attr:`~chunk_size` elements.
+
+        Every chunk is gathered with a :meth:`~MPI.Intracomm.Gatherv` in which
+        only the MPI rank that owns the chunk contributes, such that no counts
+        or displacements can exceed :attr:`~chunk_size`.
+        The `pieces` argument is only significant on `root`.
+
+        """
+
+        # Root copies its own array directly
+        if(rank == root):
+            np.copyto(pieces[root], sendobj)
+
+        # Initialize the empty buffer used by ranks that do not contribute
+        empty = buffer_msg(np.empty(0, dtype=sendobj.dtype))
+
+        # Gather the chunks of all other ranks one by one
+        displs = [0]*size
+        for src, shape in enumerate(shapes):
+            if(src == root):
+                continue
+            for idx in get_chunk_slices(shape, chunk_size):
+                packed = []
+                if(rank == src):
+                    sendbuf = array_msg(sendobj[idx], packed)
+                else:
+                    sendbuf = empty
+                if(rank == root):
+                    chunk = pieces[src][idx]
+                    counts = [0]*size
+                    counts[src] = chunk.size
+                    recvbuf = buffer_msg(chunk, counts, displs)
+                else:
+                    recvbuf = None
+                comm.Gatherv(sendbuf, recvbuf, root=root)
+                release_packed(packed)
+
+    # This function gathers arrays into a single buffer array
+    def gather_buffer(sendobj, shapes, root, chunked):
+        """
+        Gathers the NumPy array `sendobj` with shape ``shapes[i]`` on every MPI
+        rank `i` into a single contiguous array on `root`.
+
+        If `chunked` is *True*, the arrays are gathered in chunks with
+        :func:`~gather_chunks`. Else, they are gathered hierarchically with
+        :func:`~hier_gather` if :attr:`~hierarchical` is *True*, or with a
+        single :meth:`~MPI.Intracomm.Gatherv` otherwise.
+        The `shapes` argument is only significant on `root`, unless `chunked`
+        or :attr:`~hierarchical` is *True*.
+
+        Returns
+        -------
+        buff : :obj:`~numpy.ndarray` or None
+            The 1D array containing all gathered arrays on `root`.
+            Else, *None*.
+        pieces : list of :obj:`~numpy.ndarray` or None
+            The views of `buff` holding the array of every MPI rank on `root`.
+            Else, *None*.
+
+        """
+
+        # Receiver sets up a buffer array for all NumPy arrays
+        if(rank == root):
+            # Determine the counts and displacements of all arrays
+            counts = [int(np.prod(shape)) for shape in shapes]
+            displs = np.cumsum([0, *counts[:-1]]).tolist()
+
+            # Initialize contiguous array for all gathered objects
+            buff = np.empty(sum(counts), dtype=sendobj.dtype)
+
+            # Split buff up into views for every rank
+            pieces = [buff[displ:displ+count].reshape(shape)
+                      for displ, count, shape in zip(displs, counts, shapes)]
+        else:
+            buff = pieces = None
+
+        # Gather all NumPy arrays from all ranks
+        if chunked:
+            gather_chunks(sendobj, pieces, shapes, root)
+        elif hierarchical:
+            hier_gather(sendobj, buff, shapes, root)
+        else:
+            packed = []
+            comm.Gatherv(array_msg(sendobj, packed),
+                         None if buff is None else
+                         buffer_msg(buff, counts, displs), root=root)
+            release_packed(packed)
+
+        # Return buff and pieces
+        return(buff, pieces)
+
+    # This function returns the codec that a payload is compressed with
+    def get_codec(value):
+        """
+        Returns the name of the codec that payloads are compressed with for
+        the provided `compression` argument `value`, or *None* if they are not
+        compressed.
+        If `value` is *None*, :attr:`~compression` is used instead.
+
+        """
+
+        # Use the codec of this communicator if value is not given
+        if value is None:
+            return(compression)
+        elif value is False:
+            return(None)
+        else:
+            return(check_codec(value))
+
+    # This function returns the payload of an object
+    def get_payload(obj, codec=None):
+        """
+        Returns the payload that must be communicated for the provided `obj`.
+
+        If `codec` is not *None* and the payload has at least
+        :attr:`~compress_threshold` bytes, it is compressed with `codec`.
+        A compressed payload is only used if it is smaller than the original.
+
+        Returns
+        -------
+        kind : int
+            The kind of `obj`, as given by :func:`~get_buffer_kind`, or
+            :attr:`~HDR_COMPRESSED` if the payload is compressed.
+        shape : tuple of int
+            The shape of the payload, which is the size of every part if `obj`
+            is pickled.
+        dtype : :obj:`~numpy.dtype`
+            The data type of the payload.
+        parts : list of :obj:`~numpy.ndarray`
+            If `obj` is compressed, a single array given by
+            :func:`~mpi4pyd.MPI._compression.compress_payload`.
+            If `obj` is pickled, the parts given by
+            :func:`~mpi4pyd.MPI._helpers.pickle_parts`. Else, a single array
+            sharing the memory of `obj`.
+
+        """
+
+        # If provided object does not use a buffer, pickle it into parts
+        kind = get_buffer_kind(obj)
+        if(kind == HDR_PICKLE):
+            parts = pickle_parts(obj)
+            shape, dtype = tuple(part.size for part in parts), parts[0].dtype
+
+        # If it does, use its buffer as is
+        else:
+            parts = [as_buffer_array(obj)]
+            shape, dtype = parts[0].shape, parts[0].dtype
+
+        # Compress the payload as an inline message if requested
+        nbytes = sum(part.nbytes for part in parts)
+        if codec is not None and nbytes >= compress_threshold:
+            data = np.concatenate(parts) if(len(parts) > 1) else parts[0]
+            payload = compress_payload(
+                pack_inline(pack_header(kind, shape, dtype, HDR_INLINE), data),
+                codec)
+
+            # Use the compressed payload if it is smaller
+            if(payload.nbytes < nbytes):
+                return(HDR_COMPRESSED, payload.shape, payload.dtype, [payload])
+
+        # Return the payload
+        return(kind, shape, dtype, parts)
+
+    # This function returns the array that a NumPy array is received in
+    def empty_array(shape, dtype, out=None):
+        """
+        Returns the array that a NumPy array with the given `shape` and `dtype`
+        is received in.
+
+        This is `out` if it is not *None*, which must be a writeable
+        C-contiguous array with this `shape` and `dtype`. Otherwise, it is an
+        array from :attr:`~recv_pool` if it is set, or a new array.
+
+        """
+
+        # If out is provided, check if the array can be received in it
+        if out is not None:
+            if not fits_buffer(out, shape, dtype):
+                raise e13.ShapeError(
+                    "Input argument 'out' must be a writeable C-contiguous "
+                    "NumPy array with shape %s and data type %r!"
+                    % (tuple(shape), dtype))
+            return(out)
+
+        # Else, take an array from recv_pool or create a new one
+        elif recv_pool is not None:
+            return(recv_pool.acquire(shape, dtype))
+        else:
+            return(np.empty(shape, dtype=dtype))
+
+    # This function creates the empty payload of an object
+    def empty_payload(kind, shape, dtype, out=None):
+        """
+        Creates the uninitialized payload of the given `kind`, `shape` and
+        `dtype`, as given by :func:`~get_payload`.
+        NumPy arrays are received in the array given by :func:`~empty_array`
+        with the provided `out`.
+
+        Returns
+        -------
+        recvobj : object
+            The object the payload is received in, which is passed to
+            :func:`~finish_message` afterward.
+        parts : list of :obj:`~numpy.ndarray`
+            The arrays that the parts of the payload must be received in.
+
+        """
+
+        # Create every part of a pickled object separately
+        if(kind == HDR_PICKLE):
+            parts = [np.empty(n, dtype=dtype) for n in shape]
+            return(parts, parts)
+
+        # Obtain the array that a NumPy array is received in
+        elif(kind == HDR_NDARRAY):
+            recvobj = empty_array(shape, dtype, out)
+            return(recvobj, [recvobj])
+
+        # Else, create buffer object
+        else:
+            recvobj, data = empty_buffer(kind, shape, dtype)
+            return(recvobj, [data])
+
+    # This function reads the header message of an object
+    def unpack_message(msg, buf=None, source=None):
+        """
+        Reads the header message `msg` created by :func:`~pack_message`, which
+        was sent by `source` if it was sent through its header cache.
+        If the payload is a NumPy array that fits in the provided `buf` (see
+        :func:`~mpi4pyd.MPI._helpers.fits_buffer`), it is received in `buf`.
+
+        Returns
+        -------
+        kind : int
+            The kind of the payload, as given by :func:`~get_buffer_kind`.
+        recvobj : object
+            The object the payload is received in, which is passed to
+            :func:`~finish_message` afterward.
+        parts : list of :obj:`~numpy.ndarray`
+            The arrays that the chunks of all parts of the payload must be
+            received in, which is empty if the payload was folded into `msg`.
+
+        """
+
+        # Replace the marker of a repeated header by the cached header
+        if(msg[:len(HDR_SAME)] == HDR_SAME):
+            msg = get_header_cache(source).unpack(msg)
+
+        # Read header
+        kind, flags, shape, dtype, offset = unpack_header(msg)
+
+        # Let the header cache of source record a header that was sent
+        # through it
+        if(flags & HDR_CACHED and len(msg) > offset):
+            msg = get_header_cache(source).unpack(msg)
+
+        # If a compressed payload was folded into the header message, read
+        # the message it holds instead
+        if(kind == HDR_COMPRESSED and flags & HDR_INLINE):
+            return(unpack_message(decompress_payload(msg[offset:]), buf))
+
+        # Ignore buf if the payload does not fit in it
+        if not(kind == HDR_NDARRAY and fits_buffer(buf, shape, dtype)):
+            buf = None
+
+        # If the payload was folded into the header message, obtain it
+        if flags & HDR_INLINE:
+            parts = []
+
+            # Pickled objects are split up into their parts
+            if(kind == HDR_PICKLE):
+                recvobj = np.split(
+                    unpack_inline(msg, (sum(shape),), dtype, offset),
+                    np.cumsum(shape[:-1]))
+
+            # Copy arrays into buf if provided
+            elif buf is not None:
+                np.copyto(buf, unpack_inline(msg, shape, dtype, offset))
+                recvobj = buf
+
+            # Copy it into a new buffer object if it is not an array
+            elif(kind != HDR_NDARRAY):
+                recvobj, buff = empty_buffer(kind, shape, dtype)
+                buff[...] = unpack_inline(msg, shape, dtype, offset)
+
+            # Else, use the array in msg
+            else:
+                recvobj = unpack_inline(msg, shape, dtype, offset)
+
+        # Else, create the parts of the payload with given kind, shape and
+        # dtype
+        else:
+            recvobj, parts = empty_payload(kind, shape, dtype, buf)
+
+        # Return kind, recvobj and parts
+        return(kind, recvobj, parts)
+
+    # This function finishes an object that was received
+    def finish_message(kind, recvobj, buf=None):
+        """
+        Returns the final object from the buffer object `recvobj` of the given
+        `kind` obtained with :func:`~unpack_message`, after its payload was
+        received.
+        If the payload is compressed, the NumPy array it holds is received in
+        the provided `buf` if it fits.
+
+        """
+
+        # If the payload is compressed, read the message it holds
+        if(kind == HDR_COMPRESSED):
+            kind, recvobj, _ = unpack_message(decompress_payload(recvobj), buf)
+
+        # If the payload is a pickled object, unpickle it from its parts
+        if(kind == HDR_PICKLE):
+            recvobj = unpickle_parts(recvobj)
+
+        # Return recvobj
+        return(finish_buffer(kind, recvobj))
+
+    # This function returns the node topology of comm
+    def get_topology():
+        """
+        Returns the node topology of `comm`, which is created the first time
+        this function is called.
+
+        Returns
+        -------
+        node_comm : :obj:`~MPI.Intracomm` object
+            Communicator of all MPI ranks on the same node as this MPI rank.
+        leader_comm : :obj:`~MPI.Intracomm` object
+            Communicator of the lowest MPI ranks on every node if this MPI rank
+            is one of them. Else, communicator of all other MPI ranks.
+        nodes : list of int
+            The rank in the leader communicator of the lowest MPI rank on the
+            node of every MPI rank.
+        node_ranks : list of int
+            The rank in its node communicator of every MPI rank.
+
+        """
+
+        nonlocal topology
+
+        # Create the node topology if required
+        if topology is None:
+            node_comm = comm.Split_type(comm_MPI.COMM_TYPE_SHARED, key=rank)
+            leader_comm = comm.Split(int(node_comm.Get_rank() != 0), rank)
+            node = node_comm.bcast(leader_comm.Get_rank(), root=0)
+            topology = (node_comm, leader_comm,
+                        *map(list, zip(*comm.allgather(
+                            (node, node_comm.Get_rank())))))
+
+        # Return topology
+        return(topology)
+
+    # %% HIERARCHICAL FUNCTIONS
+    # This function moves a buffer between root and the leader of its node
+    def move_root(buf, root, to_root):
+        """
+        Sends the buffer specification `buf` from `root` to the lowest MPI rank
+        on its node, or the other way around if `to_root` is *True*. Nothing
+        happens if `root` is the lowest MPI rank on its node itself.
+
+        """
+
+        # Obtain the node topology
+        node_comm, _, nodes, node_ranks = get_topology()
+
+        # Only root and the leader of its node take part
+        if(nodes[rank] != nodes[root] or not node_ranks[root]):
+            return
+        if(rank == root):
+            if to_root:
+                node_comm.Recv(buf, source=0)
+            else:
+                node_comm.Send(buf, dest=0)
+        elif not node_ranks[rank]:
+            if to_root:
+                node_comm.Send(buf, dest=node_ranks[root])
+            else:
+                node_comm.Recv(buf, source=node_ranks[root])
+
+    # This function broadcasts an array through the node leaders
+    def hier_bcast(buf, root):
+        """
+        Broadcasts the buffer specification `buf` from `root` to all MPI ranks,
+        by sending it to the lowest MPI rank on the node of `root`,
+        broadcasting it between the lowest MPI ranks of all nodes and then
+        within every node.
+
+        """
+
+        # Obtain the node topology
+        node_comm, leader_comm, nodes, node_ranks = get_topology()
+
+        # Move buf from root to the leader of its node
+        move_root(buf, root, False)
+
+        # Broadcast buf between all leaders and then within all nodes
+        if not node_ranks[rank]:
+            leader_comm.Bcast(buf, root=nodes[root])
+        node_comm.Bcast(buf, root=0)
+
+    # This function gathers arrays through the node leaders
+    def hier_gather(sendobj, buff, shapes, root):
+        """
+        Gathers the NumPy array `sendobj` with shape ``shapes[i]`` on every MPI
+        rank `i` into the 1D array `buff` on `root`, by gathering them within
+        every node onto its lowest MPI rank and then between the lowest MPI
+        ranks of all nodes.
+        The `buff` argument is only significant on `root`.
+
+        """
+
+        # Obtain the node topology
+        node_comm, leader_comm, nodes, node_ranks = get_topology()
+        leader = not node_ranks[rank]
+        on_root_node = (nodes[rank] == nodes[root])
+
+        # Determine the order in which the arrays of all ranks are gathered
+        order = sorted(range(size), key=lambda i: (nodes[i], i))
+        in_order = (order == list(range(size)))
+        counts = [int(np.prod(shapes[i])) for i in order]
+        displs = np.cumsum([0, *counts[:-1]]).tolist()
+
+        # Determine the counts and displacements of the ranks on this node
+        node_counts = [count for i, count in zip(order, counts)
+                       if(nodes[i] == nodes[rank])]
+        node_displs = np.cumsum([0, *node_counts[:-1]]).tolist()
+
+        # Gather the arrays within every node onto its leader
+        packed = []
+        gathered = None
+        if leader:
+            node_arr = pack_pool.acquire((sum(node_counts),), sendobj.dtype)
+            packed.append(node_arr)
+        node_comm.Gatherv(array_msg(sendobj, packed),
+                          buffer_msg(node_arr, node_counts, node_displs)
+                          if leader else None, root=0)
+
+        # Root receives all arrays directly into buff if they are in order
+        if(on_root_node and (leader or rank == root)):
+            if(rank == root and in_order):
+                gathered = buff
+            else:
+                gathered = pack_pool.acquire((sum(counts),), sendobj.dtype)
+                packed.append(gathered)
+
+        # Gather the arrays of all nodes onto the leader of the node of root
+        if leader:
+            totals = [sum(count for i, count in zip(order, counts)
+                          if(nodes[i] == node))
+                      for node in range(leader_comm.Get_size())]
+            leader_comm.Gatherv(
+                buffer_msg(node_arr),
+                buffer_msg(gathered, totals,
+                           np.cumsum([0, *totals[:-1]]).tolist())
+                if on_root_node else None, root=nodes[root])
+
+        # Move the gathered arrays to root and put them in rank order
+        move_root(None if gathered is None else buffer_msg(gathered), root,
+                  True)
+        if(rank == root and not in_order):
+            rank_counts = [int(np.prod(shape)) for shape in shapes]
+            rank_displs = np.cumsum([0, *rank_counts[:-1]])
+            for i, displ, count in zip(order, displs, counts):
+                buff[rank_displs[i]:rank_displs[i]+count] =\
+                    gathered[displ:displ+count]
+
+        # Release all used buffers to the pack pool
+        release_packed(packed)
+
+    # This function reduces an array through the node leaders
+    def hier_reduce(sendobj, recvobj, op, root=None):
+        """
+        Reduces the NumPy array `sendobj` over all MPI ranks with the
+        commutative `op`, by reducing it within every node onto its lowest MPI
+        rank and then between the lowest MPI ranks of all nodes.
+
+        If `root` is *None*, the result is written into the NumPy array
+        `recvobj` on all MPI ranks. Else, it is only written into `recvobj` on
+        `root`, after moving it there from the lowest MPI rank on its node.
+
+        """
+
+        # Obtain the node topology
+        node_comm, leader_comm, nodes, node_ranks = get_topology()
+        leader = not node_ranks[rank]
+
+        # Leaders use buffers from the pack pool for intermediate results
+        packed = []
+        if leader:
+            node_arr = pack_pool.acquire(sendobj.shape, sendobj.dtype)
+            packed.append(node_arr)
+            if(root is not None and rank != root and
+               nodes[rank] == nodes[root]):
+                recvobj = pack_pool.acquire(sendobj.shape, sendobj.dtype)
+                packed.append(recvobj)
+
+        # Reduce sendobj within every node onto its leader
+        node_comm.Reduce(array_msg(sendobj, packed, derived=False),
+                         buffer_msg(node_arr) if leader else None, op=op,
+                         root=0)
+
+        # If root is None, reduce between all leaders and broadcast in nodes
+        if root is None:
+            if leader:
+                leader_comm.Allreduce(buffer_msg(node_arr),
+                                      buffer_msg(recvobj), op=op)
+            node_comm.Bcast(buffer_msg(recvobj), root=0)
+
+        # Else, reduce onto the leader of root and move the result to root
+        else:
+            if leader:
+                leader_comm.Reduce(buffer_msg(node_arr),
+                                   buffer_msg(recvobj) if(
+                                       nodes[rank] == nodes[root]) else None,
+                                   op=op, root=nodes[root])
+            move_root(None if recvobj is None else buffer_msg(recvobj), root,
+                      True)
+
+        # Release all used buffers to the pack pool
+        release_packed(packed)
+
+    # %% NON-BLOCKING FUNCTIONS
+    # This function posts a receive that respects the order of receives
+    def post_recv(source, tag, status, buf=None):
+        """
+        Returns a :obj:`~HybridRequest` that receives an object from `source`
+        with `tag` and stores the status of the header message in `status`.
+        A received NumPy array is received in `buf` if it fits.
+
+        The request waits for all unfinished receives that could receive the
+        same messages, as these would otherwise be able to receive the chunks
+        of each other's objects.
+
+        """
+
+        # Determine all unfinished receives that overlap with this one
+        earlier = [request for src, tg, request in pending_recvs
+                   if(comm_MPI.ANY_SOURCE in (src, source) or src == source)
+                   and (comm_MPI.ANY_TAG in (tg, tag) or tg == tag)]
+
+        # Add this receive to the unfinished receives
+        entry = [source, tag, None]
+        pending_recvs.append(entry)
+
+        # Create request and return it
+        entry[2] = HybridRequest(recv_steps(entry, earlier, status, buf),
+                                 status)
+        return(entry[2])
+
+    # This function performs the steps of a non-blocking receive
+    def recv_steps(entry, earlier, status, buf):
+        """
+        Receives an object with the `entry` of :func:`~post_recv` in
+        :obj:`~HybridRequest` steps, after the `earlier` requests, using `buf`
+        for a NumPy array if it fits.
+
+        """
+
+        try:
+            # This function waits for all earlier receives that overlap with
+            # this one, without completing their requests
+            def wait_earlier(block):
+                return(all([request._advance(block) for request in earlier]))
+
+            # Wait for the earlier receives, which can be cancelled
+            if earlier:
+                wait_earlier.cancellable = True
+                yield wait_earlier
+
+            # Obtain the source and tag of this receive
+            source, tag = entry[:2]
+
+            # Check if a message from an earlier batch matches this receive
+            for batched in batched_msgs:
+                if(source in (comm_MPI.ANY_SOURCE, batched[0]) and
+                   tag in (comm_MPI.ANY_TAG, batched[1])):
+                    break
+            else:
+                batched = None
+
+            # If so, take its header message
+            if batched is not None:
+                batched_msgs.remove(batched)
+                source, tag, msg = batched
+                status.Set_source(source)
+                status.Set_tag(tag)
+
+            # Else, receive the header message
+            else:
+                # This function checks if the header message has arrived
+                def probe(block):
+                    if block:
+                        comm.Probe(source=source, tag=tag, status=status)
+                        return(True)
+                    else:
+                        return(comm.Iprobe(source=source, tag=tag,
+                                           status=status))
+
+                # Wait for the header message to arrive, which can be
+                # cancelled
+                probe.cancellable = True
+                yield probe
+
+                # Make sure that the remainder of the message comes from the
+                # same rank and has the same tag
+                source = status.Get_source()
+                tag = status.Get_tag()
+
+                # Receive the header message
+                msg = bytearray(status.Get_count(comm_MPI.BYTE))
+                comm.Recv([msg, comm_MPI.BYTE], source=source, tag=tag,
+                          status=status)
+
+                # If it is a batch, keep all but its first message for later
+                msg, *msgs = unpack_batch(msg)
+                batched_msgs.extend([source, tag, batched] for batched in msgs)
+
+            # Read the header message
+            kind, recvobj, parts = unpack_message(msg, buf, source)
+
+            # Receive all parts of the payload in chunks if it was not folded
+            # into the header message
+            if parts:
+                yield [comm.Irecv(buffer_msg(part[idx]), source=source,
+                                  tag=tag) for part in parts
+                       for idx in get_chunk_slices(part.shape, chunk_size)]
+
+            # Return the received object
+            return(finish_message(kind, recvobj, buf))
+
+        # Remove this receive from the unfinished receives
+        finally:
+            pending_recvs.remove(entry)
+
+    # This function posts a non-blocking collective after all unfinished ones
+    def post_coll(steps):
+        """
+        Returns a :obj:`~HybridRequest` that performs the provided `steps` of
+        a non-blocking collective after all unfinished ones have finished.
+
+        As the steps of a collective are posted while it progresses, this
+        ensures that every MPI rank posts them in the same order. The steps
+        use a duplicate of `comm`, such that they cannot be matched with
+        blocking collectives that are called in the meantime.
+
+        """
+
+        nonlocal coll_comm
+
+        # Create the communicator for non-blocking collectives if required
+        if coll_comm is None:
+            coll_comm = comm.Dup()
+
+        # Determine all unfinished collectives
+        earlier = [entry[0] for entry in pending_colls]
+
+        # Add this collective to the unfinished collectives
+        entry = [None]
+        pending_colls.append(entry)
+
+        # Create request and return it
+        entry[0] = HybridRequest(coll_steps(entry, earlier, steps))
+        return(entry[0])
+
+    # This function performs the steps of a non-blocking collective
+    def coll_steps(entry, earlier, steps):
+        """
+        Performs the provided `steps` with the `entry` of :func:`~post_coll`
+        in :obj:`~HybridRequest` steps, after the `earlier` requests.
+
+        """
+
+        try:
+            # Wait for all earlier collectives, without completing their
+            # requests
+            if earlier:
+                yield lambda block: all([request._advance(block)
+                                         for request in earlier])
+
+            # Perform the steps and return their value
+            return((yield from steps))
+
+        # Remove this collective from the unfinished collectives
+        finally:
+            pending_colls.remove(entry)
+
+    # This function performs the steps of a non-blocking send
+    def send_steps(obj, dest, tag, codec=None):
+        """
+        Sends the provided `obj` to `dest` with `tag` in :obj:`~HybridRequest`
+        steps.
+
+        """
+
+        # Send all queued messages for dest and tag first
+        flush_queue((dest, tag))
+
+        # Post all messages required for obj and wait for them
+        packed = []
+        yield [comm.Isend(msg, dest=dest, tag=tag)
+               for msg in pack_message(obj, packed, dest, tag, codec)]
+        release_packed(packed)
+
+    # This function performs the steps of a non-blocking broadcast
+    def bcast_steps(obj, root, codec=None):
+        """
+        Broadcasts the provided `obj` from `root` in :obj:`~HybridRequest`
+        steps.
+
+        """
+
+        # Root creates all messages required for obj, replacing the header
+        # message by a marker if it was broadcasted last time
+        packed = []
+        key = ('ibcast', root)
+        length = np.empty(1, dtype=np.int64)
+        if(rank == root):
+            msgs = pack_message(obj, packed, codec=codec)
+            if msgs[1:]:
+                if(header_cache.get(key) == msgs[0][0]):
+                    msgs[0][0] = HDR_SAME
+                else:
+                    header_cache[key] = msgs[0][0]
+            length[0] = len(msgs[0][0])
+
+        # Broadcast the length of the header message
+        yield [coll_comm.Ibcast(length, root=root)]
+
+        # Broadcast the header message, unless it is the marker of a repeated
+        # header, which receivers replace by the cached header themselves
+        if(rank != root):
+            msgs = [[bytearray(int(length[0])), comm_MPI.BYTE]]
+        if(length[0] == len(HDR_SAME)):
+            msgs[0][0] = header_cache[key]
+        else:
+            yield [coll_comm.Ibcast(msgs[0], root=root)]
+
+        # Receivers create the payload and its chunks from the header, which
+        # is cached if the payload is sent after it
+        if(rank != root):
+            kind, obj, parts = unpack_message(msgs[0][0])
+            if parts:
+                header_cache[key] = bytes(msgs[0][0])
+            msgs.extend(buffer_msg(part[idx]) for part in parts
+                        for idx in get_chunk_slices(part.shape, chunk_size))
+
+        # Broadcast the buffer object in chunks
+        if msgs[1:]:
+            yield [coll_comm.Ibcast(msg, root=root) for msg in msgs[1:]]
+        release_packed(packed)
+
+        # Return obj, which receivers unpickle or finish first
+        return(obj if(rank == root) else finish_message(kind, obj))
+
+    # This function performs the steps of a non-blocking allreduce
+    def allreduce_steps(sendobj, op):
+        """
+        Reduces the provided `sendobj` over all MPI ranks with `op` in
+        :obj:`~HybridRequest` steps.
+
+        """
+
+        # Broadcast the signature of obj on the first rank, unless it was
+        # broadcasted last time
+        answer, _, signature = get_signature(sendobj)
+        key = ('inegotiate', 0)
+        length = np.zeros(1, dtype=np.int64)
+        if(rank == 0 and signature != header_cache.get(key, (None,))[0]):
+            length[0] = len(signature)
+        yield [coll_comm.Ibcast(length, root=0)]
+        if length[0]:
+            msg = signature if(rank == 0) else bytearray(int(length[0]))
+            yield [coll_comm.Ibcast([msg, comm_MPI.BYTE], root=0)]
+            header_cache[key] = (bytes(msg), None)
+
+        # Check if obj can be reduced as a buffer object on all ranks
+        answers = np.empty(2, dtype=np.int64)
+        answers[0] = answer and header_cache[key][0] == signature
+        yield [coll_comm.Iallreduce(answers[:1], answers[1:], op=comm_MPI.MIN)]
+
+        # If all provided objects use buffers with the same shape and dtype
+        if answers[1]:
+            # Reduce NumPy array into an empty array in chunks
+            recvobj = np.empty(sendobj.shape, dtype=sendobj.dtype)
+            packed = []
+            yield [coll_comm.Iallreduce(
+                array_msg(sendobj[idx], packed, derived=False),
+                buffer_msg(recvobj[idx]), op=op)
+                for idx in get_chunk_slices(sendobj.shape, chunk_size)]
+            release_packed(packed)
+
+        # If not, gather all pickled objects and reduce them in rank order
+        else:
+            pickled = np.frombuffer(dumps(sendobj, HIGHEST_PROTOCOL), np.uint8)
+            counts = np.empty(size, dtype=np.int64)
+            yield [coll_comm.Iallgather(np.array([pickled.size]), counts)]
+            counts = counts.tolist()
+            displs = np.cumsum([0, *counts[:-1]]).tolist()
+            buff = np.empty(sum(counts), dtype=np.uint8)
+            yield [coll_comm.Iallgatherv(buffer_msg(pickled),
+                                         buffer_msg(buff, counts, displs))]
+            objs = [loads(buff[displ:displ+count])
+                    for displ, count in zip(displs, counts)]
+            recvobj = objs[0]
+            for obj in objs[1:]:
+                recvobj = op(recvobj, obj)
+
+        # Return recvobj
+        return(recvobj)
+
+    # %% PLAN FUNCTIONS
+    # This function returns the array that a plan sends
+    def plan_source(obj):
+        """
+        Returns the C-contiguous array that a plan sends the data of the
+        NumPy array `obj` from, the function that must be called before every
+        start of the plan (or *None*) and the list of buffers that must be
+        released to the pack pool when the plan is freed.
+
+        If `obj` is not C-contiguous, it is packed into a buffer from the pack
+        pool every time the plan is started.
+
+        """
+
+        # Contiguous arrays are sent directly
+        if obj.flags.c_contiguous:
+            return(obj, None, [])
+
+        # Other arrays are packed before every start
+        buff = pack_pool.acquire(obj.shape, obj.dtype)
+        return(buff, lambda: np.copyto(buff, obj), [buff])
+
+    # This function creates the persistent request of a plan
+    def make_plan(method, data, args, before=None, finish=None, packed=()):
+        """
+        Returns a :obj:`~mpi4pyd.dummyMPI.Prequest` that calls the given
+        `method` of `comm` (e.g., ``'Send'``) with the provided `args` for
+        every chunk of the C-contiguous array `data` every time it is started.
+
+        If `comm` supports persistent requests for `method` (e.g.,
+        :meth:`~MPI.Comm.Send_init`), these are created once and started
+        every time. Otherwise, the non-blocking version of `method` (e.g.,
+        :meth:`~MPI.Comm.Isend`) is called every time instead.
+        The function `before` is called before every start, and `finish`
+        returns the value of the request after every completion. The buffers
+        in `packed` are released to the pack pool when the request is freed.
+
+        """
+
+        # Obtain the buffer specifications of all chunks
+        msgs = [buffer_msg(data[idx])
+                for idx in get_chunk_slices(data.shape, chunk_size)]
+
+        # Try to create persistent requests for all chunks
+        try:
+            prequests = [getattr(comm, method+'_init')(msg, *args)
+                         for msg in msgs]
+        except (AttributeError, NotImplementedError):
+            prequests = None
+            post_msg = getattr(comm, 'I'+method.lower())
+
+        # This function starts the communication of all chunks
+        def post():
+            if before is not None:
+                before()
+            if prequests is not None:
+                comm_MPI.Prequest.Startall(prequests)
+                requests = prequests
+            else:
+                requests = [post_msg(msg, *args) for msg in msgs]
+
+            # This function completes the communication of all chunks
+            def progress(block, status):
+                if block:
+                    comm_MPI.Request.Waitall(requests)
+                elif not comm_MPI.Request.Testall(requests):
+                    return(False, None)
+                return(True, None if finish is None else finish())
+
+            # Return progress
+            return(progress)
+
+        # This function frees all persistent requests and packing buffers
+        def free():
+            for request in prequests or ():
+                request.Free()
+            release_packed(packed)
+
+        # Create request and return it
+        return(dummyMPI.Prequest(post, free))
+
+    # %% NEGOTIATION FUNCTIONS
+    # This function returns the answer of this rank for negotiate_all
+    def get_signature(obj, same_shape=True):
+        """
+        Returns whether the provided `obj` is a NumPy array, its number of
+        elements and its signature, which is its pickled data type (and shape
+        if `same_shape` is *True*), as used by :func:`~negotiate_all`.
+        If `obj` is a bool, it is used as the answer instead.
+
+        """
+
+        if isinstance(obj, bool):
+            return(obj, 0, dumps(None, HIGHEST_PROTOCOL))
+        elif(get_buffer_kind(obj) == HDR_NDARRAY):
+            return(True, obj.size, dumps((obj.dtype, obj.shape if same_shape
+                                          else None), HIGHEST_PROTOCOL))
+        else:
+            return(False, 0, dumps(None, HIGHEST_PROTOCOL))
+
+    # This function broadcasts the header of an object from the root
+    def bcast_header(header, root):
+        """
+        Broadcasts the provided `header` tuple from `root` to all MPI ranks and
+        returns it.
+
+        If `header` is the same as the last header that was broadcasted from
+        `root`, only a marker is broadcasted and all MPI ranks return their
+        cached copy of it instead. Headers are compared in pickled form, such
+        that later changes to mutable objects in a cached header are detected.
+        Headers that contain a pickled object are not cached.
+
+        This function must be called by all MPI ranks that are communicating.
+        Only the `header` provided on `root` is used.
+
+        """
+
+        # Root pickles header and broadcasts it, unless it was broadcasted
+        # last time
+        key = ('bcast', root)
+        msg, cached = bcast_pickled(
+            dumps(header, HIGHEST_PROTOCOL) if(rank == root) else None, root,
+            key)
+        if cached:
+            return(header if(rank == root) else header_cache[key][1])
+        if(rank != root):
+            header = loads(msg)
+
+        # Cache header with its pickled form, unless it contains a pickled
+        # object, and return it
+        if not isinstance(header[-1], bytes):
+            header_cache[key] = (msg, header)
+        return(header)
+
+    # This function broadcasts a pickled object from the root
+    def bcast_pickled(msg, root, key):
+        """
+        Broadcasts the provided pickled `msg` from `root` to all MPI ranks and
+        returns it, together with whether it is the pickled object cached in
+        :attr:`~header_cache` with `key`.
+        If so, only a marker is broadcasted instead of `msg`. Caching `msg` is
+        left to the caller.
+
+        This function must be called by all MPI ranks that are communicating.
+        Only the `msg` provided on `root` is used.
+
+        """
+
+        # Root checks if msg is the one that was cached
+        length = np.zeros(1, dtype=np.int64)
+        if(rank == root and msg != header_cache.get(key, (None,))[0]):
+            length[0] = len(msg)
+
+        # Broadcast the length of msg, which is zero if the cached msg must
+        # be used
+        comm.Bcast(length, root=root)
+        if not length[0]:
+            return(header_cache[key][0], True)
+
+        # Broadcast msg
+        if(rank != root):
+            msg = bytearray(int(length[0]))
+        comm.Bcast([msg, comm_MPI.BYTE], root=root)
+        return(bytes(msg), False)
+
+    # This function lets the root decide how an object is communicated
+    def negotiate_root(obj, root, *extra):
+        """
+        Lets the MPI rank `root` decide if the provided `obj` can be
+        communicated using an uppercase communication method, and broadcasts
+        this decision to all MPI ranks.
+
+        This function must be called by all MPI ranks that are communicating.
+        Only the arguments provided on `root` are used.
+
+        Returns
+        -------
+        header : tuple
+            If `obj` uses a buffer, `(kind, shape, dtype, *extra)` of `obj`,
+            with `kind` given by :func:`~get_buffer_kind` and `extra` the
+            remaining positional arguments.
+            Else, `(HDR_PICKLE,)`.
+
+        """
+
+        # Root determines the header
+        if(rank == root):
+            kind = get_buffer_kind(obj)
+            if(kind != HDR_PICKLE):
+                arr = as_buffer_array(obj)
+                header = (kind, arr.shape, arr.dtype, *extra)
+            else:
+                header = (HDR_PICKLE,)
+        else:
+            header = None
+
+        # Broadcast and return header
+        return(bcast_header(header, root))
+
+    # This function checks if all ranks can use a buffer object
+    def negotiate_all(obj, same_shape=True, large=False):
+        """
+        Determines if the provided `obj` on all MPI ranks is a NumPy array
+        with the same data type, and the same shape if `same_shape` is *True*,
+        such that it can be communicated using an uppercase communication
+        method, and if `large` is *True* on any MPI rank.
+        If `obj` is a bool, it is used as the answer for this MPI rank.
+
+        This function must be called by all MPI ranks that are communicating.
+
+        Returns
+        -------
+        use_buffer : bool
+            Whether `obj` is a NumPy array with the same data type (and shape)
+            on all MPI ranks.
+        max_size : int
+            The maximum number of elements of `obj` over all MPI ranks if
+            `use_buffer` is *True*.
+        any_large : bool
+            Whether `large` is *True* on any MPI rank.
+
+        """
+
+        # Determine the answer, number of elements and signature of this rank
+        answer, n_elements, signature = get_signature(obj, same_shape)
+
+        # Compare the signature with the one of the first rank
+        key = ('negotiate', 0)
+        msg, cached = bcast_pickled(signature, 0, key)
+        if not cached:
+            header_cache[key] = (msg, None)
+
+        # Determine answer, maximum number of elements and large flag for all
+        # ranks
+        flags[:3] = (answer and msg == signature, -n_elements, -large)
+        comm.Allreduce(flags[:3], flags[3:], op=comm_MPI.MIN)
+        return(bool(flags[3]), -int(flags[4]), bool(flags[5]))
+
+    # This function exchanges the headers of an object between all ranks
+    def negotiate_headers(obj):
+        """
+        Exchanges the shape and data type of the provided `obj` between all
+        MPI ranks, if `obj` is a NumPy array.
+
+        This function must be called by all MPI ranks that are communicating.
+
+        Returns
+        -------
+        headers : list of tuple or None
+            If `obj` uses a buffer with the same data type on all MPI ranks,
+            the `(HDR_NDARRAY, shape, dtype)` of `obj` on every MPI rank.
+            Else, *None*.
+
+        """
+
+        # Obtain the headers of obj on all ranks
+        headers = comm.allgather((HDR_NDARRAY, obj.shape, obj.dtype)
+                                 if(get_buffer_kind(obj) == HDR_NDARRAY)
+                                 else (HDR_PICKLE,))
+
+        # Return headers if all ranks use buffers with the same data type
+        if all(header[0] == HDR_NDARRAY and header[2] == headers[0][2]
+               for header in headers):
+            return(headers)
+        else:
+            return(None)
 
     # %% REMAINDER OF FUNCTION FACTORY
+    # Convert overridden_attrs to a tuple
+    overridden_attrs = tuple(overridden_attrs)
+
+    # Make frozenset of all attributes that are forwarded to comm
+    comm_attrs = frozenset(comm.__dir__()).difference(overridden_attrs)
+
     # Initialize HybridComm
     hybrid_comm = HybridComm()
 
-    # Register initialized HybridComm
-    hybrid_comm_registry[hex(id(comm))] = hybrid_comm
+    # Register initialized HybridComm. As every threadMPI.run() creates new
+    # communicators, threadMPI communicators store it themselves instead,
+    # such that it is freed together with them
+    if isinstance(comm, threadMPI.Intracomm):
+        comm._hybrid_comm = hybrid_comm._hybrid_comm = hybrid_comm
+    else:
+        hybrid_comm_registry[hex(id(comm))] = hybrid_comm
 
     # Return hybrid_comm
     return(hybrid_comm)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Hybrid Request
+==============
+Provides the request objects that are returned by the non-blocking
+communication methods of :obj:`~mpi4pyd.MPI.HybridComm` instances.
+
+"""
+
+
+# %% IMPORTS
+# mpi4pyd imports
+from mpi4pyd import dummyMPI
+
+# All declaration
+__all__ = ['HybridRequest']
+
+
+# %% CLASS DEFINITIONS
+# Class that progresses a non-blocking communication through its steps
+class HybridRequest(dummyMPI.Request):
+    """
+    Request of a non-blocking communication that consists of multiple steps,
+    like receiving a header message before the payload it describes can be
+    received.
+
+    The steps are given by a generator, which posts the MPI requests of a
+    step and then yields either a list of these requests, or a function
+    `poll(block)` that returns whether the step has completed (waiting for it
+    if `block` is *True*). The generator is resumed once a step has completed
+    and returns the value of the communication after the last step.
+    Poll functions that have a `cancellable` attribute set to *True* mark
+    steps in which the communication can be cancelled with :meth:`~Cancel`.
+
+    Besides the methods of :class:`~mpi4py.MPI.Request`, requests can be
+    awaited in an :mod:`asyncio` event loop, which returns their value.
+
+    """
+
+    def __init__(self, steps, status=None):
+        """
+        Initialize an instance of the :class:`~HybridRequest` class, which
+        directly posts the first step of the provided `steps`.
+
+        Parameters
+        ----------
+        steps : generator
+            The generator that performs the steps of the communication.
+
+        Optional
+        --------
+        status : :obj:`~MPI.Status` object or None. Default: None
+            If not *None*, the status object that is filled in by `steps`,
+            which is copied into the status objects given to this request.
+
+        """
+
+        # Initialize request
+        super().__init__()
+
+        # Save provided steps and status
+        self._steps = steps
+        self._status = status
+
+        # Initialize current step
+        self._step = None
+        self._done = False
+
+        # Post the first step
+        self._advance(False)
+
+    # %% CLASS METHODS
+    # This function checks if the current step has completed
+    def _poll_step(self, block):
+        # If the step is a poll function, call it
+        if callable(self._step):
+            return(self._step(block))
+
+        # Else, wait for or test all MPI requests of the step
+        elif block:
+            for request in self._step:
+                request.Wait()
+            return(True)
+        else:
+            return(all([request.Test() for request in self._step]))
+
+    # This function progresses the communication as far as possible
+    def _advance(self, block):
+        # Move on to the next step until a step has not completed yet
+        while not self._done:
+            if self._step is not None and not self._poll_step(block):
+                return(False)
+            try:
+                self._step = next(self._steps)
+            except StopIteration as stop:
+                self._done = True
+                self._value = stop.value
+        return(True)
+
+    # This function tries to complete the request
+    def _complete(self, block, status):
+        # Check if the communication has finished
+        if not self._advance(block):
+            return(False)
+
+        # Copy the status of the communication if requested
+        if status is not None and self._status is not None:
+            status.Set_source(self._status.Get_source())
+            status.Set_tag(self._status.Get_tag())
+            status.Set_error(self._status.Get_error())
+
+        # Deactivate request and return that it has completed
+        self._active = False
+        return(True)
+
+    # %% VISIBLE CLASS METHODS
+    def Cancel(self):
+        """
+        Cancels this request if its communication is waiting in a step that
+        has not posted any MPI requests yet, like a receive that is waiting
+        for its header message. Otherwise, the communication is unaffected
+        and must still be completed.
+
+        """
+
+        # Stop the communication if its current step is cancellable
+        if not self._done and getattr(self._step, 'cancellable', False):
+            self._steps.close()
+            self._done = True
+            self._cancelled = True
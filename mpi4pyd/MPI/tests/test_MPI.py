@@ -2,17 +2,40 @@
 
 # %% IMPORTS
 # Built-in imports
+from array import array
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import gc
+from pickle import HIGHEST_PROTOCOL
 from types import BuiltinMethodType, MethodType
+import weakref
 
 # Package imports
+from e13tools import ShapeError
 import numpy as np
 import pytest
 
 # mpi4pyd imports
-from mpi4pyd import MPI
-from mpi4pyd.dummyMPI import COMM_WORLD as d_comm
+from mpi4pyd import MPI, threadMPI
+from mpi4pyd.dummyMPI import COMM_WORLD as d_comm, Prequest
 from mpi4pyd.MPI import (COMM_WORLD as comm, HYBRID_COMM_WORLD as h_comm,
                          get_HybridComm_obj)
+from mpi4pyd.MPI._buffer_pool import BufferPool
+from mpi4pyd.MPI._header_cache import HeaderCache
+from mpi4pyd.MPI._compression import (
+    CODECS, check_codec, compress_payload, decompress_payload, register_codec)
+from mpi4pyd.MPI._datatypes import (
+    get_mpi_datatype, get_strided_datatype, release_strided_datatype,
+    strided_msg)
+from mpi4pyd.MPI._helpers import (
+    CHUNK_SIZE, HDR_ARRAY, HDR_BYTEARRAY, HDR_BYTES, HDR_CACHED,
+    HDR_MEMORYVIEW, HDR_NDARRAY, HDR_PICKLE, HDR_SAME, INLINE_LIMIT,
+    MAX_BATCH, empty_buffer, finish_buffer, get_buffer_kind,
+    get_chunk_slices, pack_batch, pack_header, pickle_parts, unpack_batch,
+    unpickle_parts)
+from mpi4pyd.MPI._hybrid_comm import hybrid_comm_registry
+from mpi4pyd.MPI._request import HybridRequest
 
 
 # Get size and rank
@@ -22,6 +45,45 @@ size = comm.Get_size()
 # Get method types
 m_types = (BuiltinMethodType, MethodType)
 
+# Number of rank threads that HybridComm tests are executed in in serial
+n_threads = 2
+
+
+# %% HELPER FUNCTIONS
+# This function returns the objects that HybridComm tests use in a rank
+def get_rank_objs(MPI, comm):
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+    array = np.random.RandomState(rank).rand(size, 10)
+    return({'MPI': MPI, 'comm': comm, 'h_comm': get_HybridComm_obj(comm),
+            'rank': rank, 'size': size, 'array': array,
+            'lst': array.tolist()})
+
+
+# This decorator makes all tests of a class execute in rank threads in serial
+def in_rank_threads(cls):
+    # This function wraps a single test
+    def wrap(test):
+        @wraps(test)
+        def wrapper(self, **kwargs):
+            # If there are multiple MPI ranks, execute test directly
+            if(size > 1):
+                return(test(self, **kwargs))
+
+            # Else, execute test in every rank thread with its own objects
+            def target():
+                objs = get_rank_objs(threadMPI, threadMPI.COMM_WORLD)
+                test(self, **{name: objs.get(name, value)
+                              for name, value in kwargs.items()})
+            threadMPI.run(n_threads, target)
+        return(wrapper)
+
+    # Wrap all tests of cls
+    for name, test in list(vars(cls).items()):
+        if name.startswith('test_'):
+            setattr(cls, name, wrap(test))
+    return(cls)
+
 
 # %% PYTEST CLASSES AND FUNCTIONS
 # Pytest for get_HybridComm_obj() function
@@ -55,36 +117,299 @@ class Test_get_HybridComm_obj(object):
             get_HybridComm_obj(0)
 
 
-# Pytest for standard HybridComm obj
-@pytest.mark.skipif(size == 1, reason="Pointless to pytest in serial")
+# Pytest for get_mpi_datatype() function
+class Test_get_mpi_datatype(object):
+    # Test if predefined datatypes are used for basic dtypes
+    @pytest.mark.parametrize('dtype, datatype', [
+        ('?', MPI.C_BOOL), ('i1', MPI.INT8_T), ('i8', MPI.INT64_T),
+        ('u2', MPI.UINT16_T), ('f4', MPI.FLOAT), ('f8', MPI.DOUBLE),
+        ('c8', MPI.C_FLOAT_COMPLEX), ('c16', MPI.C_DOUBLE_COMPLEX),
+        ('M8[s]', MPI.INT64_T)])
+    def test_basic(self, dtype, datatype):
+        assert get_mpi_datatype(np.dtype(dtype)) is datatype
+
+    # Test if derived datatypes are cached
+    @pytest.mark.parametrize('dtype', [
+        'S5', 'U3', 'V7', [('a', 'i4'), ('b', 'f8', (2,))],
+        [('a', 'u1'), ('b', [('c', 'c16'), ('d', 'S2')])]])
+    def test_derived(self, dtype):
+        dtype = np.dtype(dtype)
+        datatype = get_mpi_datatype(dtype)
+        assert get_mpi_datatype(dtype) is datatype
+        if(MPI.__package__ == 'mpi4py'):
+            assert datatype.Get_extent() == (0, dtype.itemsize)
+
+    # Test if object dtypes raise an error
+    def test_object(self):
+        with pytest.raises(TypeError):
+            get_mpi_datatype(np.dtype(object))
+
+
+# Pytest for get_buffer_kind() function
+class Test_get_buffer_kind(object):
+    # Test if all objects are given the correct kind
+    @pytest.mark.parametrize('obj, kind', [
+        (np.zeros(3), HDR_NDARRAY), (b'abc', HDR_BYTES),
+        (bytearray(3), HDR_BYTEARRAY), (array('d', [1, 2]), HDR_ARRAY),
+        (memoryview(b'abc'), HDR_MEMORYVIEW), (array('u', 'ab'), HDR_PICKLE),
+        (np.float64(1), HDR_PICKLE), ([1, 2], HDR_PICKLE), ('ab', HDR_PICKLE),
+        (np.array([None]), HDR_PICKLE)])
+    def test_kind(self, obj, kind):
+        assert get_buffer_kind(obj) == kind
+
+    # Test if buffer objects are recreated as the same type
+    @pytest.mark.parametrize('obj', [
+        b'abc', bytearray(b'abc'), array('i', [1, 2, 3]),
+        memoryview(np.arange(6.).reshape(2, 3))])
+    def test_empty_buffer(self, obj):
+        kind = get_buffer_kind(obj)
+        data = np.asarray(memoryview(obj))
+        new_obj, arr = empty_buffer(kind, data.shape, data.dtype)
+        arr[...] = data
+        new_obj = finish_buffer(kind, new_obj)
+        assert type(new_obj) is type(obj)
+        assert new_obj == obj
+
+
+# Pytest for get_chunk_slices() function
+class Test_get_chunk_slices(object):
+    # Test if chunks cover arrays in C-order with a limited size
+    @pytest.mark.parametrize('shape', [(), (5,), (0, 3), (20,), (4, 3, 5)])
+    @pytest.mark.parametrize('chunk_size', [1, 4, 7, 100])
+    def test_chunks(self, shape, chunk_size):
+        array = np.arange(int(np.prod(shape))).reshape(shape)
+        chunks = [array[idx] for idx in get_chunk_slices(shape, chunk_size)]
+        assert all(chunk.size <= chunk_size and chunk.flags.c_contiguous
+                   for chunk in chunks)
+        assert np.array_equal(np.concatenate([chunk.ravel()
+                                              for chunk in chunks]),
+                              array.ravel())
+
+
+# Pytest for pickle_parts() function
+class Test_pickle_parts(object):
+    # Test if only large buffers are kept out-of-band
+    @pytest.mark.skipif(HIGHEST_PROTOCOL < 5,
+                        reason="Out-of-band buffers require pickle protocol 5")
+    def test_parts(self):
+        obj = {'params': np.arange(10**5.), 'grid': np.ones((400, 50)).T,
+               'meta': {'small': np.arange(3), 'name': 'test'}}
+        parts = pickle_parts(obj)
+        assert len(parts) == 3
+        assert all(part.dtype == np.uint8 for part in parts)
+        assert np.shares_memory(parts[1], obj['params'])
+        assert parts[0].nbytes < INLINE_LIMIT
+        new_obj = unpickle_parts([part.copy() for part in parts])
+        assert new_obj['meta']['name'] == 'test'
+        for key in ('params', 'grid'):
+            assert np.array_equal(new_obj[key], obj[key])
+            assert new_obj[key].flags.writeable
+        assert np.array_equal(new_obj['meta']['small'], np.arange(3))
+
+    # Test if objects without large buffers are pickled in-band
+    def test_in_band(self):
+        parts = pickle_parts([np.arange(3), np.arange(10**5.)[::2], 'a'])
+        assert len(parts) == 1
+        new_obj = unpickle_parts(parts)
+        assert np.array_equal(new_obj[1], np.arange(10**5.)[::2])
+
+
+# Pytest for pack_batch() function
+def test_pack_batch():
+    msgs = [b'a'*17, bytearray(3), b'b'*32]
+    batch = pack_batch(msgs)
+    assert [bytes(msg) for msg in unpack_batch(batch)] == msgs
+    assert unpack_batch(msgs[2]) == [msgs[2]]
+    assert unpack_batch(HDR_SAME) == [HDR_SAME]
+
+
+# Pytest for the compression codecs
+def test_codecs():
+    msg = b'abc'*1000
+    for name in CODECS:
+        payload = compress_payload(msg, name)
+        assert payload[0] == CODECS[name][0] and payload.nbytes < len(msg)
+        assert decompress_payload(payload) == msg
+    register_codec('reverse', 16, lambda msg: bytes(msg)[::-1],
+                   lambda msg: bytes(msg)[::-1])
+    try:
+        payload = compress_payload(msg, 'reverse')
+        assert decompress_payload(payload) == msg
+        with pytest.raises(ValueError):
+            register_codec('copy', 16, bytes, bytes)
+    finally:
+        del CODECS['reverse']
+    with pytest.raises(ValueError):
+        decompress_payload(payload)
+    with pytest.raises(ValueError):
+        register_codec('copy', 1, bytes, bytes)
+    with pytest.raises(ValueError):
+        check_codec('rar')
+
+
+# Pytest for using the codecs in several threads at once
+def test_codecs_threads():
+    msgs = [bytes([i])*10**6 for i in range(8)]
+    with ThreadPoolExecutor(8) as executor:
+        for name in CODECS:
+            payloads = executor.map(compress_payload, msgs, [name]*8)
+            assert list(executor.map(decompress_payload, payloads)) == msgs
+
+
+# Pytest for get_strided_datatype() function
+@pytest.mark.skipif(MPI.__package__ != 'mpi4py',
+                    reason="Derived datatypes require mpi4py")
+class Test_get_strided_datatype(object):
+    # Test if strided datatypes are cached per collapsed lay-out
+    def test_cache(self):
+        array = np.zeros((6, 8, 4))
+        datatype = get_strided_datatype(array.dtype, (3, 8, 4),
+                                        (384, 32, 8))
+        assert get_strided_datatype(array.dtype, (3, 32), (384, 8)) is datatype
+        assert datatype.Get_size() == 3*8*4*8
+
+    # Test if strided views are described without copying them
+    @pytest.mark.parametrize('index', [
+        np.s_[:, 1], np.s_[::2, ::-3], np.s_[..., ::-1]])
+    def test_strided_msg(self, index):
+        array = np.arange(48.).reshape(6, 8)
+        for view in (array[index], array.T[index]):
+            msg = strided_msg(view)
+            assert np.shares_memory(msg[0], array)
+            assert msg[2].Get_size() == view.nbytes
+            release_strided_datatype(msg[2])
+
+    # Test if datatypes that are in use are only freed after their release
+    def test_eviction(self, monkeypatch):
+        monkeypatch.setattr('mpi4pyd.MPI._datatypes.STRIDED_CACHE_SIZE', 2)
+        array = np.zeros((5, 5, 5))
+        msg = strided_msg(array[:, ::2])
+        for i in range(3):
+            get_strided_datatype(array.dtype, (2, 5), (40+8*i, 8))
+        assert msg[2].Get_size() == 75*8
+        release_strided_datatype(msg[2])
+        assert msg[2] == MPI.DATATYPE_NULL
+
+
+# Pytest for BufferPool class
+class Test_BufferPool(object):
+    # Test if released arrays are reused
+    def test_reuse(self):
+        pool = BufferPool()
+        array = pool.acquire((3, 4), 'f8')
+        assert array.shape == (3, 4) and array.flags.c_contiguous
+        pool.release(array)
+        assert pool.nbytes == array.nbytes
+        assert pool.acquire((3, 4), np.float64) is array
+        assert pool.nbytes == 0
+        assert pool.acquire((3, 4), 'f8') is not array
+
+    # Test if the least recently used arrays are discarded
+    def test_max_bytes(self):
+        pool = BufferPool(max_bytes=100)
+        array1 = pool.acquire(8, 'f8')
+        array2 = pool.acquire(8, 'i8')
+        pool.release(array1, array2, pool.acquire(20, 'f8'))
+        assert pool.nbytes == 64
+        assert pool.acquire(8, 'i8') is array2
+        pool.release(array1)
+        pool.clear()
+        assert pool.nbytes == 0
+
+
+# Pytest for HeaderCache class
+class Test_HeaderCache(object):
+    # Test if repeated headers are replaced by a marker
+    def test_marker(self):
+        sender, receiver = HeaderCache(), HeaderCache()
+        headers = [pack_header(HDR_NDARRAY, (i,), np.dtype(int), HDR_CACHED)
+                   for i in (1, 1, 2)]
+        msgs = [sender.pack(0, header) for header in headers]
+        assert [msg[:len(HDR_SAME)] == HDR_SAME for msg in msgs] == [
+            False, True, False]
+        assert [receiver.unpack(msg) for msg in msgs] == headers
+        assert receiver.size == 1
+
+    # Test if evicted headers are received in any order
+    def test_max_size(self):
+        sender, receiver = HeaderCache(max_size=2), HeaderCache(max_size=2)
+        header = pack_header(HDR_NDARRAY, (1,), np.dtype(int), HDR_CACHED)
+        msgs = [sender.pack(tag, header) for tag in (0, 0, 1, 2, 0, 0)]
+        assert sender.max_size == 2 and sender.size == 2
+        for i in (2, 3, 4, 0, 5, 1):
+            assert receiver.unpack(msgs[i]) == header
+        assert receiver.size == 2
+        for tag in range(3, 100):
+            receiver.unpack(sender.pack(tag, header))
+        assert receiver.size == 2
+
+
+# Pytest for standard HybridComm obj, which is executed in rank threads in
+# serial
+@in_rank_threads
 class Test_HybridComm_class(object):
+    # Create fixture for all objects used in this rank
+    @pytest.fixture(scope='function')
+    def objs(self):
+        return(get_rank_objs(MPI, comm))
+
+    # Create fixture for the MPI module
+    @pytest.fixture(scope='function', name='MPI')
+    def mpi(self, objs):
+        return(objs['MPI'])
+
+    # Create fixture for the communicator
+    @pytest.fixture(scope='function', name='comm')
+    def comm_obj(self, objs):
+        return(objs['comm'])
+
+    # Create fixture for the HybridComm obj
+    @pytest.fixture(scope='function', name='h_comm')
+    def h_comm_obj(self, objs):
+        return(objs['h_comm'])
+
+    # Create fixture for the rank
+    @pytest.fixture(scope='function', name='rank')
+    def rank_obj(self, objs):
+        return(objs['rank'])
+
+    # Create fixture for the size
+    @pytest.fixture(scope='function', name='size')
+    def size_obj(self, objs):
+        return(objs['size'])
+
     # Create fixture for making dummy NumPy arrays
     @pytest.fixture(scope='function')
-    def array(self):
-        np.random.seed(comm.Get_rank())
-        return(np.random.rand(size, 10))
+    def array(self, objs):
+        return(objs['array'])
 
     # Create fixture for making dummy lists
     @pytest.fixture(scope='function')
-    def lst(self, array):
-        return(array.tolist())
+    def lst(self, objs):
+        return(objs['lst'])
 
     # Test if h_comm has the same attrs as comm
-    def test_has_attrs(self):
+    def test_has_attrs(self, comm, h_comm):
         instance_attrs = dir(comm)
         for attr in instance_attrs:
             assert hasattr(h_comm, attr)
 
     # Test if all non-overridden attrs in h_comm are the same as in comm
-    def test_get_attrs(self):
+    def test_get_attrs(self, comm, h_comm):
         skip_attrs = ['info']
         attrs = [attr for attr in dir(comm) if
                  attr not in (*h_comm.overridden_attrs, *skip_attrs)]
         for attr in attrs:
             assert getattr(comm, attr) == getattr(h_comm, attr), attr
 
+    # Test if all communication methods are marked as overridden
+    def test_overridden_attrs(self, comm, h_comm):
+        for attr in ('bcast', 'gather', 'recv', 'scatter', 'send'):
+            assert attr in h_comm.overridden_attrs
+            assert getattr(h_comm, attr) != getattr(comm, attr)
+
     # Test the attribute setters
-    def test_set_attrs(self):
+    def test_set_attrs(self, comm, h_comm):
         # Test if setting a comm attribute raises an error
         with pytest.raises(AttributeError):
             h_comm.rank = 1
@@ -97,25 +422,105 @@ class Test_HybridComm_class(object):
         assert not hasattr(comm, 'pytest_attr')
 
     # Test the attribute deleters
-    def test_del_attrs(self):
+    def test_del_attrs(self, h_comm):
         # Test if deleting a comm attribute raises an error
         with pytest.raises(AttributeError):
             del h_comm.rank
 
         # Test if deleting a new attribute can be done
+        h_comm.pytest_attr = 'test'
         del h_comm.pytest_attr
         assert not hasattr(h_comm, 'pytest_attr')
 
+    # Test default allgather with an array
+    def test_allgather_array(self, comm, h_comm, array):
+        g_array1 = comm.allgather(array)
+        g_array2 = h_comm.allgather(array)
+        for array1, array2 in zip(g_array1, g_array2):
+            assert np.array_equal(array1, array2)
+        assert np.array_equal(np.concatenate(g_array1),
+                              h_comm.allgather(array, concatenate=True))
+
+    # Test default allgather with a list
+    def test_allgather_list(self, comm, h_comm, lst):
+        assert comm.allgather(lst) == h_comm.allgather(lst)
+
+    # Test allgather with arrays with different data types
+    def test_allgather_mixed_dtype(self, h_comm, rank):
+        array = np.arange(3, dtype=np.float32 if rank else np.float64)
+        for array1 in h_comm.allgather(array):
+            assert np.array_equal(array1, array)
+
+    # Test if arrays with different data types are not used as buffers
+    def test_mixed_dtypes(self, h_comm, rank, size):
+        array = np.arange(1, 3, dtype=float if rank else int)
+        r_arrays = [h_comm.allreduce(array), h_comm.iallreduce(array).wait(),
+                    h_comm.reduce(array, root=1)]
+        for r_array in r_arrays[:2+(rank == 1)]:
+            assert r_array.dtype == float
+            assert np.array_equal(r_array, [size, 2*size])
+        a_list = h_comm.alltoall([array]*size)
+        assert [arr.dtype for arr in a_list] == [int]+[float]*(size-1)
+        g_list = h_comm.gather(array, 1)
+        if(rank == 1):
+            assert [arr.dtype for arr in g_list] == [int]+[float]*(size-1)
+            assert all(np.array_equal(arr, [1, 2]) for arr in g_list)
+
+    # Test default allreduce with an array
+    def test_allreduce_array(self, MPI, comm, h_comm, array):
+        assert np.allclose(comm.allreduce(array), h_comm.allreduce(array))
+        assert np.allclose(np.max(comm.allgather(array), axis=0),
+                           h_comm.allreduce(array, op=MPI.MAX))
+
+    # Test default allreduce with a list
+    def test_allreduce_list(self, comm, h_comm, lst):
+        assert comm.allreduce(lst) == h_comm.allreduce(lst)
+
+    # Test default alltoall with an array
+    def test_alltoall_array(self, comm, h_comm, array):
+        r_array1 = comm.alltoall(array)
+        r_array2 = h_comm.alltoall(array)
+        for array1, array2 in zip(r_array1, r_array2):
+            assert np.array_equal(array1, array2)
+
+    # Test alltoall with a list of arrays with different shapes
+    def test_alltoall_list_array(self, h_comm, rank, size):
+        lst = [np.full((rank+1, i), rank) for i in range(size)]
+        r_lst = h_comm.alltoall(lst)
+        for i, array in enumerate(r_lst):
+            assert np.array_equal(array, np.full((i+1, rank), i))
+
+    # Test default alltoall with a list
+    def test_alltoall_list(self, comm, h_comm, lst):
+        assert comm.alltoall(lst) == h_comm.alltoall(lst)
+
+    # Test alltoall with an invalid number of objects
+    def test_alltoall_invalid(self, h_comm, size):
+        with pytest.raises(ShapeError):
+            h_comm.alltoall(list(range(size+1)))
+
     # Test default broadcast with an array
-    def test_bcast_array(self, array):
+    def test_bcast_array(self, comm, h_comm, array):
         assert np.allclose(comm.bcast(array, 0), h_comm.bcast(array, 0))
 
+    # Test send/recv and gather with an array holding Python objects
+    def test_object_array(self, h_comm, rank, size):
+        array = np.array([rank, 'a', None], dtype=object)
+        if not rank:
+            h_comm.send(array, 1, 678)
+        elif(rank == 1):
+            assert list(h_comm.recv(None, 0, 678)) == [0, 'a', None]
+        g_array = h_comm.gather(array, 0)
+        if not rank:
+            assert [list(x) for x in g_array] == [[i, 'a', None]
+                                                  for i in range(size)]
+
     # Test default broadcast with a list
-    def test_bcast_list(self, lst):
+    def test_bcast_list(self, comm, h_comm, lst):
         assert np.allclose(comm.bcast(lst, 0), h_comm.bcast(lst, 0))
 
     # Test default gather with an array
-    def test_gather_array(self, array):
+    def test_gather_array(self, comm, h_comm, rank, array):
         g_array1 = comm.gather(array, 0)
         g_array2 = h_comm.gather(array, 0)
         assert type(g_array1) == type(g_array2)
@@ -123,8 +528,28 @@ class Test_HybridComm_class(object):
             for array1, array2 in zip(g_array1, g_array2):
                 assert np.allclose(array1, array2)
 
+    # Test gather with arrays of different lengths
+    def test_gather_uneven_array(self, comm, h_comm, rank):
+        array = np.random.rand(rank+1, 3)
+        g_array1 = comm.gather(array, 0)
+        g_array2 = h_comm.gather(array, 0)
+        g_array3 = h_comm.gather(array, 0, concatenate=True)
+        if not rank:
+            for array1, array2 in zip(g_array1, g_array2):
+                assert np.array_equal(array1, array2)
+            assert g_array2[0].base is g_array2[-1].base
+            assert np.array_equal(np.concatenate(g_array1), g_array3)
+        else:
+            assert g_array2 is None and g_array3 is None
+
+    # Test gather with 0D arrays and concatenation
+    def test_gather_scalar_array(self, h_comm, rank, size):
+        g_array = h_comm.gather(np.array(rank), 0, concatenate=True)
+        if not rank:
+            assert np.array_equal(g_array, np.arange(size))
+
     # Test default gather with a list
-    def test_gather_list(self, lst):
+    def test_gather_list(self, comm, h_comm, rank, lst):
         g_lst1 = comm.gather(lst, 0)
         g_lst2 = h_comm.gather(lst, 0)
         assert type(g_lst1) == type(g_lst2)
@@ -132,17 +557,121 @@ class Test_HybridComm_class(object):
             for lst1, lst2 in zip(g_lst1, g_lst2):
                 assert np.allclose(lst1, lst2)
 
+    # Test default reduce with an array
+    def test_reduce_array(self, comm, h_comm, rank, array):
+        r_array1 = comm.reduce(array, root=0)
+        r_array2 = h_comm.reduce(array, root=0)
+        if not rank:
+            assert np.allclose(r_array1, r_array2)
+        else:
+            assert r_array2 is None
+
+    # Test default reduce with a list
+    def test_reduce_list(self, comm, h_comm, lst):
+        assert comm.reduce(lst, root=0) == h_comm.reduce(lst, root=0)
+
     # Test default scatter with an array
-    def test_scatter_array(self, array):
+    def test_scatter_array(self, comm, h_comm, array):
         assert np.allclose(comm.scatter(array, 0), h_comm.scatter(array, 0))
 
+    # Test scatter with an array that cannot be divided evenly
+    def test_scatter_uneven_array(self, h_comm, rank, size):
+        array = np.arange(3*(size+1)).reshape(size+1, 3)
+        s_array = h_comm.scatter(array, 0)
+        assert np.array_equal(s_array, np.array_split(array, size)[rank])
+
+    # Test scatter with provided counts along a different axis
+    def test_scatter_counts_axis(self, h_comm, rank, size):
+        array = np.arange(4*(size+2)).reshape(4, size+2)
+        counts = [3]+[1]*(size-1)
+        s_array = h_comm.scatter(array, 0, counts=counts, axis=-1)
+        splits = np.split(array, np.cumsum(counts)[:-1], axis=1)
+        assert np.array_equal(s_array, splits[rank])
+
+    # Test if a counts list that is changed in place is not cached
+    def test_scatter_mutated_counts(self, h_comm, rank, size):
+        array = np.arange(size+2)
+        counts = [3]+[1]*(size-1)
+        for _ in range(2):
+            s_array = h_comm.scatter(array, 0, counts=counts)
+            splits = np.split(array, np.cumsum(counts)[:-1])
+            assert np.array_equal(s_array, splits[rank])
+            counts[0], counts[-1] = counts[-1], counts[0]
+
+    # Test if arrays are received in the provided destinations
+    def test_out(self, comm, h_comm, rank, size, array):
+        out = np.empty_like(array)
+        root_array = comm.bcast(array, 0)
+        if not rank:
+            h_comm.send(array, 1, 147)
+            h_comm.send(array, 1, 258)
+        elif(rank == 1):
+            assert h_comm.recv(out, 0, 147) is out
+            assert np.array_equal(out, root_array)
+            r_array = h_comm.recv(out[:, ::2], 0, 258)
+            assert np.array_equal(r_array, root_array)
+        b_array = h_comm.bcast(array, 0, out=out)
+        assert np.array_equal(b_array, root_array)
+        assert (b_array is out) == bool(rank)
+        assert h_comm.bcast(array, 0, 10, out) is (out if rank else array)
+        s_out = np.empty((4, 1), dtype=np.arange(1).dtype)
+        s_array = h_comm.scatter(np.arange(4*size).reshape(4, size), 0,
+                                 axis=1, counts=[1]*size, out=s_out)
+        assert s_array is s_out
+        assert np.array_equal(s_out[:, 0], np.arange(rank, 4*size, size))
+        with pytest.raises(ShapeError):
+            h_comm.scatter(array, 0, out=out)
+
+    # Test if received arrays are taken from recv_pool
+    def test_recv_pool(self, h_comm, rank, array):
+        h_comm.recv_pool = BufferPool()
+        try:
+            b_array = h_comm.bcast(array, 0)
+            if rank:
+                h_comm.recv_pool.release(b_array)
+            assert h_comm.bcast(array, 0) is b_array
+            s_array = h_comm.scatter(array, 1)
+            h_comm.recv_pool.release(s_array)
+            assert h_comm.scatter(array, 1) is s_array
+        finally:
+            h_comm.recv_pool = None
+
+    # Test if steady-state exchanges reuse the arrays of a recv_pool
+    def test_recv_pool_ring(self, h_comm, rank, size):
+        h_comm.recv_pool = BufferPool()
+        try:
+            arrays = []
+            for i in range(3):
+                array = np.arange(10**5)*i
+                request = h_comm.irecv(source=(rank-1) % size)
+                send = h_comm.isend(array, (rank+1) % size)
+                r_array = request.wait()
+                send.wait()
+                b_array = h_comm.bcast(array, 0)
+                assert np.array_equal(r_array, array)
+                assert np.array_equal(b_array, array)
+                arrays.append((r_array, b_array))
+                h_comm.recv_pool.release(r_array, *([b_array] if rank else []))
+            first = list(map(id, arrays[0][:1+bool(rank)]))
+            assert all(id(arr) in first for pair in arrays[1:]
+                       for arr in pair[:1+bool(rank)])
+        finally:
+            h_comm.recv_pool = None
+
+    # Test scatter with invalid counts or axis
+    def test_scatter_invalid(self, h_comm, size, array):
+        with pytest.raises(ShapeError):
+            h_comm.scatter(array, 0, counts=[2]*size)
+        with pytest.raises(ShapeError):
+            h_comm.scatter(array, 0, axis=2)
+
     # Test default scatter with a list
-    def test_scatter_list(self, lst):
+    def test_scatter_list(self, comm, h_comm, lst):
         assert np.allclose(comm.scatter(list(lst), 0),
                            h_comm.scatter(list(lst), 0))
 
     # Test default send/recv with an array
-    def test_sendrecv_array(self, array):
+    def test_sendrecv_array(self, comm, h_comm, rank, array):
         if not rank:
             comm.send(array, 1, 123)
             h_comm.send(array, 1, 456)
@@ -151,10 +680,577 @@ class Test_HybridComm_class(object):
                                h_comm.recv(None, 0, 456))
 
     # Test default send/recv with a list
-    def test_sendrecv_list(self, lst):
+    def test_sendrecv_list(self, comm, h_comm, rank, lst):
         if not rank:
             comm.send(list(lst), 1, 123)
             h_comm.send(list(lst), 1, 456)
         else:
             assert np.allclose(comm.recv(None, 0, 123),
                                h_comm.recv(None, 0, 456))
+
+    # Test send/recv with an array that does not fit in the header message
+    def test_sendrecv_large_array(self, h_comm, rank):
+        array = np.arange(10**5, dtype=float)
+        if not rank:
+            h_comm.send(array, 1, 789)
+        elif(rank == 1):
+            assert np.array_equal(h_comm.recv(None, 0, 789), array)
+
+    # Test if nested objects with arrays are communicated correctly
+    @pytest.mark.parametrize('chunk_size', [10**4, CHUNK_SIZE])
+    def test_nested_arrays(self, h_comm, rank, size, chunk_size):
+        obj = {'params': np.arange(10**5.)+rank, 'meta': {'rank': rank},
+               'arrays': [np.ones((300, 100)).T*rank, np.arange(2)]}
+        h_comm.chunk_size = chunk_size
+        try:
+            if not rank:
+                h_comm.send(obj, 1, 321)
+                h_comm.isend(obj, 1, 654).wait()
+            elif(rank == 1):
+                for tag in (321, 654):
+                    r_obj = h_comm.recv(None, 0, tag)
+                    assert r_obj['meta'] == {'rank': 0}
+                    assert np.array_equal(r_obj['params'], obj['params']-1)
+                    assert np.array_equal(r_obj['arrays'][0],
+                                          np.zeros((100, 300)))
+            for b_obj in (h_comm.bcast(obj, 1), h_comm.ibcast(obj, 1).wait(),
+                          h_comm.bcast(obj, 1, 1000)):
+                assert b_obj['meta'] == {'rank': 1}
+                assert np.array_equal(b_obj['params'], np.arange(10**5.)+1)
+            g_obj = h_comm.gather(obj if rank else [0], 1)
+            if(rank == 1):
+                assert g_obj[0] == [0]
+                for i in range(1, size):
+                    assert g_obj[i]['meta'] == {'rank': i}
+                    assert np.array_equal(g_obj[i]['params'],
+                                          np.arange(10**5.)+i)
+                    assert np.array_equal(g_obj[i]['arrays'][0],
+                                          np.ones((100, 300))*i)
+        finally:
+            h_comm.chunk_size = CHUNK_SIZE
+
+    # Test send/recv with a structured array
+    def test_sendrecv_struct_array(self, h_comm, rank):
+        array = np.zeros(5, dtype=[('a', 'i4'), ('b', 'f8', (2,))])
+        array['a'] = np.arange(5)
+        if not rank:
+            h_comm.send(array, 1, 123)
+        elif(rank == 1):
+            r_array = h_comm.recv(None, 0, 123)
+            assert r_array.dtype == array.dtype
+            assert np.array_equal(r_array, array)
+
+    # Test send/recv, bcast and gather with non-contiguous arrays
+    @pytest.mark.parametrize('index', [
+        np.s_[:, 1], np.s_[::2, ::-3], np.s_[2:3, 1:], np.s_[..., 1::2]])
+    @pytest.mark.parametrize('transpose', [False, True])
+    def test_strided_array(self, h_comm, rank, size, index, transpose):
+        array = np.arange(3*10**4, dtype=float).reshape(150, 200)
+        array = array.T[index] if transpose else array[index]
+        if not rank:
+            h_comm.send(array, 1, 345)
+        elif(rank == 1):
+            assert np.array_equal(h_comm.recv(None, 0, 345), array)
+        assert np.array_equal(h_comm.bcast(array, 0), array)
+        g_array = h_comm.gather(array, 0, concatenate=True)
+        if not rank:
+            assert np.array_equal(g_array, np.concatenate([array]*size))
+        assert np.array_equal(h_comm.allreduce(array), size*array)
+
+    # Test send/recv and bcast with objects supporting the buffer protocol
+    @pytest.mark.parametrize('n', [10, 10**5])
+    @pytest.mark.parametrize('make_obj', [
+        lambda x: x.tobytes(), lambda x: bytearray(x.tobytes()),
+        lambda x: array('d', x), lambda x: memoryview(x.reshape(-1, 10))])
+    def test_buffer_objs(self, h_comm, rank, n, make_obj):
+        obj = make_obj(np.arange(n, dtype=float))
+        if not rank:
+            h_comm.send(obj, 1, 567)
+        elif(rank == 1):
+            r_obj = h_comm.recv(None, 0, 567)
+            assert type(r_obj) is type(obj) and r_obj == obj
+        b_obj = h_comm.bcast(obj if not rank else None, 0)
+        assert type(b_obj) is type(obj) and b_obj == obj
+
+    # Test if all methods split up buffer objects larger than chunk_size
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64])
+    def test_chunks(self, h_comm, rank, size, chunk_size):
+        array = np.arange(600., dtype=float).reshape(6, 10, 10)+rank
+        view = array[:, ::2, ::-3]
+        obj = list(range(10**4))
+        h_comm.chunk_size = chunk_size
+        try:
+            for arr in (array, view):
+                if not rank:
+                    h_comm.send(arr, 1, 789)
+                elif(rank == 1):
+                    assert np.array_equal(h_comm.recv(None, 0, 789), arr-1)
+                assert np.array_equal(h_comm.bcast(arr, 0), arr-rank)
+                g_arr = h_comm.gather(arr[rank:], 0, concatenate=True)
+                if not rank:
+                    assert np.array_equal(g_arr, np.concatenate(
+                        [arr[i:]+i-rank for i in range(size)]))
+                a_arr = h_comm.allgather(arr, concatenate=True)
+                assert np.array_equal(a_arr, np.concatenate(
+                    [arr+i-rank for i in range(size)]))
+                assert np.array_equal(h_comm.allreduce(arr),
+                                      np.sum(a_arr.reshape(size, *arr.shape),
+                                             axis=0))
+            if not rank:
+                h_comm.send(obj, 1, 789)
+            elif(rank == 1):
+                assert h_comm.recv(None, 0, 789) == obj
+            assert h_comm.bcast(obj if not rank else None, 0) == obj
+        finally:
+            h_comm.chunk_size = CHUNK_SIZE
+
+    # Test if bcast pipelines buffer objects in segments
+    @pytest.mark.parametrize('segment_size', [1, 7, 64, 10**4])
+    def test_bcast_segments(self, h_comm, rank, segment_size):
+        array = np.arange(600., dtype=float).reshape(6, 10, 10)+rank
+        for arr in (array, array[:, ::2, ::-3]):
+            assert np.array_equal(h_comm.bcast(arr, 1, segment_size),
+                                  arr-rank+1)
+            done = np.zeros(arr.shape, dtype=bool)
+            for obj, idx in h_comm.bcast_iter(arr, 0, segment_size):
+                assert np.array_equal(obj[idx], arr[idx]-rank)
+                assert not done[idx].any()
+                done[idx] = True
+            assert done.all()
+        obj = list(range(10**4))
+        assert h_comm.bcast(obj if not rank else None, 0, 7) == obj
+        assert list(h_comm.bcast_iter(b'abc', 0, 2)) == [(b'abc',
+                                                         (Ellipsis,))]
+
+    # Test if bcast_shared gives every rank a read-only shared array
+    def test_bcast_shared(self, comm, h_comm, rank, array):
+        for arr in (array, array.T[::2]):
+            s_array = h_comm.bcast_shared(arr, 1)
+            assert np.array_equal(s_array, comm.bcast(arr, 1))
+            assert not s_array.flags.writeable
+        assert h_comm.bcast_shared([rank], 1) == [1]
+        h_comm.free_shared()
+
+    # Test if invalid segment sizes raise an error
+    @pytest.mark.parametrize('segment_size', [0, 1.5])
+    def test_invalid_segment_size(self, h_comm, segment_size):
+        with pytest.raises(ValueError):
+            next(h_comm.bcast_iter(1, 0, segment_size))
+
+    # Test if invalid chunk sizes raise an error
+    @pytest.mark.parametrize('chunk_size', [0, 1.5])
+    def test_invalid_chunk_size(self, h_comm, chunk_size):
+        with pytest.raises(ValueError):
+            h_comm.chunk_size = chunk_size
+
+    # Test if the hierarchical collectives give the same results
+    def test_hierarchical(self, MPI, h_comm, array):
+        flat = [h_comm.gather(array, 1, concatenate=True),
+                h_comm.allreduce(array), h_comm.reduce(array, MPI.MAX, 1),
+                h_comm.bcast(array, 1)]
+        h_comm.hierarchical = True
+        try:
+            hier = [h_comm.gather(array, 1, concatenate=True),
+                    h_comm.allreduce(array), h_comm.reduce(array, MPI.MAX, 1),
+                    h_comm.bcast(array, 1)]
+        finally:
+            h_comm.hierarchical = False
+        for f_obj, h_obj in zip(flat, hier):
+            assert (f_obj is None and h_obj is None or
+                    np.array_equal(f_obj, h_obj))
+
+    # Test if an invalid hierarchical value raises an error
+    def test_invalid_hierarchical(self, h_comm):
+        with pytest.raises(TypeError):
+            h_comm.hierarchical = 1
+
+    # Test if an invalid recv_pool raises an error
+    def test_invalid_recv_pool(self, h_comm):
+        with pytest.raises(TypeError):
+            h_comm.recv_pool = {}
+
+    # Test send/recv and bcast with arrays of various dtypes
+    @pytest.mark.parametrize('dtype', [
+        '?', 'f2', 'g', 'c8', 'G', 'S4', 'U2', 'M8[ms]',
+        [('a', 'i4'), ('b', 'f8', (2,))]])
+    def test_dtypes(self, h_comm, rank, dtype):
+        array = np.zeros(10**4, dtype=dtype)
+        array.view('u1')[:] = np.arange(array.nbytes) % 251
+        if not rank:
+            h_comm.send(array, 1, 234)
+        elif(rank == 1):
+            r_array = h_comm.recv(None, 0, 234)
+            assert r_array.dtype == array.dtype
+            assert r_array.tobytes() == array.tobytes()
+        b_array = h_comm.bcast(array if not rank else None, 0)
+        assert b_array.tobytes() == array.tobytes()
+
+    # Test reductions with complex and boolean arrays
+    def test_reduce_dtypes(self, MPI, h_comm, rank, size):
+        array = np.arange(4)+1j*rank
+        assert np.allclose(h_comm.allreduce(array),
+                           size*np.arange(4)+1j*sum(range(size)))
+        array = np.array([rank == 0, True, False])
+        assert np.array_equal(h_comm.allreduce(array, op=MPI.LOR),
+                              [True, True, False])
+
+    # Test send/recv with any source and tag
+    def test_sendrecv_any(self, MPI, h_comm, rank):
+        obj = {'a': 1, 'b': [2, 3]}
+        if not rank:
+            h_comm.send(obj, 1, 321)
+        elif(rank == 1):
+            status = MPI.Status()
+            assert h_comm.recv(status=status) == obj
+            assert status.Get_source() == 0
+            assert status.Get_tag() == 321
+
+    # Test sendrecv with an array between all ranks
+    def test_sendrecv_ring_array(self, comm, h_comm, rank, size, array):
+        dest = (rank+1) % size
+        source = (rank-1) % size
+        r_array1 = comm.sendrecv(array, dest, source=source)
+        r_array2 = h_comm.sendrecv(array, dest, source=source)
+        assert np.array_equal(r_array1, r_array2)
+
+    # Test sendrecv with a list between all ranks
+    def test_sendrecv_ring_list(self, comm, h_comm, rank, size, lst):
+        dest = (rank+1) % size
+        source = (rank-1) % size
+        assert (comm.sendrecv(lst, dest, source=source) ==
+                h_comm.sendrecv(lst, dest, source=source))
+
+    # Test isend/irecv with overlapping receives between all ranks
+    @pytest.mark.parametrize('chunk_size', [7, CHUNK_SIZE])
+    def test_isend_irecv_ring(self, MPI, comm, h_comm, rank, size, array,
+                              lst, chunk_size):
+        h_comm.chunk_size = chunk_size
+        try:
+            dest = (rank+1) % size
+            requests = [h_comm.irecv(source=(rank-1) % size)
+                        for _ in range(3)]
+            status = MPI.Status()
+            assert not HybridRequest.Testall(requests)
+            comm.Barrier()
+            objs = [array, array[:, ::3], lst]
+            sends = [h_comm.isend(obj, dest, tag=tag)
+                     for tag, obj in enumerate(objs)]
+            index, r_obj = HybridRequest.waitany(requests, status)
+            assert status.Get_tag() == index
+            r_objs = HybridRequest.waitall(requests)
+            assert r_objs[index] is r_obj
+            r_array = comm.sendrecv(array, dest, source=(rank-1) % size)
+            assert np.array_equal(r_objs[0], r_array)
+            assert np.array_equal(r_objs[1], r_array[:, ::3])
+            assert r_objs[2] == r_array.tolist()
+            HybridRequest.Waitall(sends)
+        finally:
+            h_comm.chunk_size = CHUNK_SIZE
+
+    # Test the non-blocking collectives
+    def test_ibcast_iallreduce(self, comm, h_comm, rank, size, array, lst):
+        requests = [h_comm.ibcast(array, 0), h_comm.ibcast(lst, 1),
+                    h_comm.iallreduce(array), h_comm.iallreduce(rank)]
+        if not rank:
+            HybridRequest.Testall(requests[::-1])
+        assert h_comm.allreduce(rank+1) == sum(range(size+1))
+        b_array, b_lst, r_array, r_int = HybridRequest.waitall(requests)
+        assert np.array_equal(b_array, comm.bcast(array, 0))
+        assert b_lst == comm.bcast(lst, 1)
+        assert np.allclose(r_array, comm.allreduce(array))
+        assert r_int == sum(range(size))
+
+    # Test if repeated headers are replaced by a marker
+    def test_header_cache(self, MPI, comm, h_comm, rank, size):
+        arrays = [np.arange(10**4)*i for i in range(3)]+[np.ones(10**4)]
+        status = MPI.Status()
+        for i, arr in enumerate(arrays):
+            if not rank:
+                h_comm.send(arr, 1, tag=7)
+            elif(rank == 1):
+                comm.Probe(0, 7, status)
+                assert ((status.Get_count(MPI.BYTE) < 16) == (i in (1, 2)))
+                assert np.array_equal(h_comm.recv(None, 0, 7), arr)
+            obj = arr if(rank == 1) else None
+            assert np.array_equal(h_comm.bcast(obj, 1), arr)
+            assert np.array_equal(h_comm.ibcast(obj, 1).wait(), arr)
+            assert h_comm.bcast([rank, i], 0) == [0, i]
+        counts = np.ones(size, dtype=int)
+        for _ in range(2):
+            assert h_comm.scatter(np.arange(size), 0, counts) == [rank]
+
+    # Test if aggregated sends arrive in order as separate objects
+    @pytest.mark.parametrize('max_bytes, max_delay', [
+        (4*INLINE_LIMIT, None), (10**9, None), (10**9, 0)])
+    def test_aggregate(self, MPI, comm, h_comm, rank, max_bytes, max_delay):
+        objs = [[i] if i % 3 else np.arange(i) for i in range(2*MAX_BATCH)]
+        objs[100] = np.arange(10**5)
+        status = MPI.Status()
+        if not rank:
+            with h_comm.aggregate(max_bytes, max_delay) as a_comm:
+                for obj in objs:
+                    a_comm.send(obj, 1, tag=8)
+        elif(rank == 1):
+            comm.Probe(0, 8, status)
+            assert (status.Get_count(MPI.BYTE) > 10**4) == (max_delay is None)
+            requests = [h_comm.irecv(source=MPI.ANY_SOURCE) for _ in objs]
+            for obj, request in zip(objs, requests):
+                assert np.array_equal(request.wait(status), obj)
+                assert status.Get_source() == 0 and status.Get_tag() == 8
+
+    # Test if aggregate() raises errors on invalid policies
+    @pytest.mark.parametrize('max_bytes, max_delay', [
+        (0, None), (1.5, None), (10, -1)])
+    def test_invalid_aggregate(self, h_comm, max_bytes, max_delay):
+        with pytest.raises(ValueError):
+            with h_comm.aggregate(max_bytes, max_delay):
+                pass
+
+    # Test the persistent communication plans
+    def test_plans(self, comm, h_comm, rank, array):
+        arrays = [comm.bcast(array, root).copy() for root in (0, 1)]
+        out = np.empty_like(array)
+        if(rank < 2):
+            plan = (h_comm.plan_recv(None, 0, 5) if rank else
+                    h_comm.plan_send(array.T, 1, 5))
+        b_plan = h_comm.plan_bcast(array, 1, out)
+        for i in range(1, 4):
+            array += 1
+            b_plan.start()
+            if(rank < 2):
+                plan.start()
+                r_array = plan.wait()
+            b_array = b_plan.wait()
+            assert np.array_equal(b_array, arrays[1]+i)
+            assert (b_array is out) == (rank != 1)
+            if(rank == 1):
+                assert np.array_equal(r_array, arrays[0].T+i)
+        b_plan.Free()
+        if(rank < 2):
+            plan.Free()
+        with pytest.raises(TypeError):
+            h_comm.plan_bcast([rank], 0)
+        with pytest.raises(TypeError):
+            h_comm.plan_send([rank], 0)
+
+    # Test if compressed payloads are decompressed by the receivers
+    def test_compression(self, MPI, comm, h_comm, rank, size):
+        objs = [np.zeros(10**5), ['metadata']*10**4, bytes(10**5)]
+        status = MPI.Status()
+        h_comm.compression = 'zlib'
+        h_comm.compress_threshold = 1000
+        try:
+            for obj in objs:
+                if not rank:
+                    h_comm.send(obj, 1, tag=10)
+                    h_comm.isend(obj, 1, tag=11, compression=False).wait()
+                elif(rank == 1):
+                    comm.Probe(0, 10, status)
+                    assert status.Get_count(MPI.BYTE) < INLINE_LIMIT
+                    assert np.array_equal(h_comm.recv(None, 0, 10), obj)
+                    assert not comm.Iprobe(0, 10)
+                    assert np.array_equal(h_comm.recv(None, 0, 11), obj)
+                b_obj = h_comm.bcast(obj if(rank == 1) else None, 1,
+                                     compression='lzma')
+                assert np.array_equal(b_obj, obj)
+                assert np.array_equal(h_comm.ibcast(obj, 0).wait(), obj)
+                g_obj = h_comm.gather(obj if rank else [rank], 0)
+                if not rank:
+                    assert g_obj[0] == [0]
+                    assert all(np.array_equal(r_obj, obj)
+                               for r_obj in g_obj[1:])
+            g_obj = h_comm.gather(np.zeros((100, 1000))[rank:], 0,
+                                  concatenate=True)
+            if not rank:
+                assert np.array_equal(g_obj, np.zeros((
+                    100*size-sum(range(size)), 1000)))
+            g_obj = h_comm.gather(np.random.rand(10)+rank, 0,
+                                  concatenate=True)
+            if not rank:
+                assert g_obj.shape == (10*size,)
+                assert (g_obj[10*(size-1):] >= size-1).all()
+            out = np.empty(10**5)
+            assert (h_comm.bcast(objs[0], 0, out=out) is out) == bool(rank)
+        finally:
+            h_comm.compression = None
+            h_comm.compress_threshold = 2**16
+
+    # Test if invalid compression settings raise an error
+    def test_invalid_compression(self, h_comm, rank):
+        with pytest.raises(ValueError):
+            h_comm.compression = 'rar'
+        with pytest.raises(ValueError):
+            h_comm.compress_threshold = -1
+        with pytest.raises(ValueError):
+            h_comm.send([rank], 0, compression='rar')
+
+    # Test the asynchronous methods with concurrent tasks
+    def test_async(self, comm, h_comm, rank, size, array):
+        async def main():
+            dest, source = (rank+1) % size, (rank-1) % size
+            with pytest.raises(asyncio.TimeoutError):
+                await h_comm.arecv(source=source, tag=9, timeout=0.01)
+            results = await asyncio.gather(
+                h_comm.arecv(source=source, tag=1),
+                h_comm.asend(array, dest, 1), h_comm.abcast(array, 1),
+                h_comm.aallreduce(rank))
+            assert np.array_equal(results[0], comm.sendrecv(array, dest))
+            assert np.array_equal(results[2], comm.bcast(array, 1))
+            assert results[3] == sum(range(size))
+            await h_comm.asend([rank], dest, tag=9)
+            assert await h_comm.arecv(source=source, tag=9) == [source]
+        asyncio.run(main())
+
+
+# Pytest for the HybridComm class in rank threads that are specific to the
+# thread backend or use more ranks than Test_HybridComm_class
+class Test_HybridComm_threadMPI(object):
+    # This function executes func with a HybridComm in every rank thread
+    def run(self, func, n_ranks=3, node_size=None):
+        def target():
+            t_comm = threadMPI.COMM_WORLD
+            return(func(get_HybridComm_obj(t_comm), t_comm.Get_rank(),
+                        t_comm.Get_size()))
+        return(threadMPI.run(n_ranks, target, node_size=node_size))
+
+    # Test if the rank threads form a single communicator
+    def test_comm(self):
+        def func(t_comm, rank, size):
+            assert type(t_comm).__mro__[1] is threadMPI.Intracomm
+            assert get_HybridComm_obj(t_comm.Split(rank, 0)) is d_comm
+            return(rank, size)
+        assert self.run(func) == [(0, 3), (1, 3), (2, 3)]
+
+    # Test if the communicators of the rank threads are freed after a run
+    def test_free(self):
+        def func(t_comm, rank, size):
+            assert get_HybridComm_obj(threadMPI.COMM_WORLD) is t_comm
+            assert get_HybridComm_obj(t_comm) is t_comm
+            d_comm = get_HybridComm_obj(t_comm.Dup())
+            assert d_comm.bcast([rank], 1) == [1]
+            return([weakref.ref(obj) for obj in (t_comm, d_comm)])
+        n_comms = len(hybrid_comm_registry)
+        refs = sum(self.run(func), [])
+        gc.collect()
+        assert len(hybrid_comm_registry) == n_comms
+        assert all(ref() is None for ref in refs)
+
+    # Test the collective methods with arrays and lists
+    @pytest.mark.parametrize('n_ranks', [3, 4])
+    def test_collectives(self, n_ranks):
+        def func(t_comm, rank, size):
+            array = np.arange(20.).reshape(2, 10)+rank
+            total = sum(np.arange(20.).reshape(2, 10)+i for i in range(size))
+            assert np.array_equal(t_comm.allreduce(array), total)
+            assert t_comm.allreduce(rank) == sum(range(size))
+            assert np.array_equal(t_comm.bcast(array, 1), array-rank+1)
+            a_arr = t_comm.allgather(array, concatenate=True)
+            assert a_arr.shape == (2*size, 10)
+            g_arr = t_comm.gather(array[:rank % 2+1], 0, concatenate=True)
+            if not rank:
+                assert g_arr.shape == (size+size//2, 10)
+            s_arr = t_comm.scatter(np.arange(5*size) if not rank else None, 0)
+            assert np.array_equal(s_arr, np.arange(5*rank, 5*rank+5))
+            assert t_comm.alltoall(list(range(size))) == [rank]*size
+        self.run(func, n_ranks)
+
+    # Test if bcast_shared gives all rank threads the same memory
+    def test_bcast_shared(self):
+        def func(t_comm, rank, size):
+            s_array = t_comm.bcast_shared(np.arange(10**4)*rank, 2)
+            assert np.array_equal(s_array, np.arange(10**4)*2)
+            t_comm.free_shared()
+            return(s_array)
+        arrays = self.run(func)
+        assert all(np.shares_memory(arr, arrays[0]) for arr in arrays)
+
+    # Test if hierarchical collectives match the flat ones on emulated nodes
+    @pytest.mark.parametrize('n_ranks, node_size, chunk_size', [
+        (5, 2, CHUNK_SIZE), (5, 2, 7), (4, 3, 64), (4, 1, CHUNK_SIZE)])
+    def test_hierarchical(self, n_ranks, node_size, chunk_size):
+        def func(t_comm, rank, size):
+            node_comm = t_comm.Split_type(threadMPI.COMM_TYPE_SHARED)
+            assert node_comm.Get_size() == min(node_size,
+                                               size-rank//node_size*node_size)
+            array = np.arange(600., dtype=float).reshape(6, 10, 10)+rank
+            t_comm.chunk_size = chunk_size
+
+            def collect(arr):
+                return([t_comm.gather(arr[rank:], 0, concatenate=True),
+                        t_comm.gather(arr[rank:], 3, concatenate=True),
+                        t_comm.allreduce(arr),
+                        t_comm.reduce(arr, threadMPI.MAX, 3),
+                        t_comm.bcast(arr, 3)])
+            for arr in (array, array[:, ::2, ::-3]):
+                flat = collect(arr)
+                t_comm.hierarchical = True
+                hier = collect(arr)
+                t_comm.hierarchical = False
+                for f_obj, h_obj in zip(flat, hier):
+                    assert (f_obj is None and h_obj is None or
+                            np.array_equal(f_obj, h_obj))
+                if(rank == 3):
+                    assert np.array_equal(hier[1], np.concatenate(
+                        [arr[i:]+i-rank for i in range(size)]))
+        self.run(func, n_ranks, node_size)
+
+    # Test if nested objects with different numbers of parts are gathered
+    @pytest.mark.parametrize('hierarchical', [False, True])
+    def test_gather_nested(self, hierarchical):
+        def func(t_comm, rank, size):
+            t_comm.hierarchical = hierarchical
+            obj = {'rank': rank, 'arrays': [np.arange(10**4.)*i
+                                            for i in range(rank)]}
+            g_obj = t_comm.gather(obj, 2)
+            t_comm.hierarchical = False
+            if(rank == 2):
+                for i, r_obj in enumerate(g_obj):
+                    assert r_obj['rank'] == i and len(r_obj['arrays']) == i
+                    assert all(np.array_equal(arr, np.arange(10**4.)*j)
+                               for j, arr in enumerate(r_obj['arrays']))
+        self.run(func, 4, 2)
+
+    # Test if small objects are gathered with a single collective after
+    # the negotiation
+    def test_gather_small(self, monkeypatch):
+        calls = []
+        collect = threadMPI.Comm._icollect
+        monkeypatch.setattr(threadMPI.Comm, '_icollect', lambda self, *args:
+                            calls.append(self.rank) or collect(self, *args))
+
+        def func(t_comm, rank, size):
+            obj = np.arange(3.) if(rank == 2) else {'rank': [rank]*rank}
+            t_comm.gather(obj, 1)
+            n_calls = calls.count(rank)
+            g_obj = t_comm.gather(obj, 1)
+            assert calls.count(rank) == n_calls+3
+            if(rank == 1):
+                assert np.array_equal(g_obj.pop(2), np.arange(3.))
+                assert g_obj == [{'rank': [i]*i} for i in range(2)]
+        self.run(func)
+
+    # Test if objects that are not compressed are only pickled once
+    def test_compression_gather(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            'mpi4pyd.MPI._hybrid_comm.pickle_parts',
+            lambda obj: calls.append(obj) or pickle_parts(obj))
+
+        def func(t_comm, rank, size):
+            obj = {'rank': rank, 'data': np.random.rand(10**(2*rank))}
+            g_obj = t_comm.gather(obj, 0, compression='zlib')
+            if not rank:
+                for i, r_obj in enumerate(g_obj):
+                    assert r_obj['rank'] == i
+                    assert len(r_obj['data']) == 10**(2*i)
+            return(sum(call is obj for call in calls))
+        assert self.run(func) == [1, 1, 1]
+
+    # Test if an exception in one rank is raised again
+    def test_exception(self):
+        def func(t_comm, rank, size):
+            if(rank == 1):
+                raise ShapeError("Rank 1 failed!")
+            t_comm.recv(source=1)
+        with pytest.raises(ShapeError):
+            self.run(func)
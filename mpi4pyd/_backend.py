@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+Backend
+=======
+Provides the functionality that is shared by the :mod:`mpi4pyd.localMPI` and
+:mod:`mpi4pyd.threadMPI` modules, which both emulate multiple MPI ranks
+without an MPI library.
+
+"""
+
+
+# %% IMPORTS
+# Package imports
+import numpy as np
+
+# mpi4pyd imports
+from mpi4pyd.dummyMPI import (
+    Request, Status, _make_immediate as make_immediate)
+
+# All declaration
+__all__ = ['Request', 'Status', 'get_array', 'get_buffer', 'get_regions',
+           'make_immediate', 'reduce_arrays', 'reduce_objects']
+
+
+# %% HELPER FUNCTIONS
+# This function interprets a buffer specification
+def get_buffer(buf):
+    """
+    Returns the C-contiguous byte array, the item size and the counts and
+    displacements (*None* if not provided) described by the buffer
+    specification `buf`.
+
+    """
+
+    # Unwrap buffer specification, dropping the datatype of any MPI module
+    counts = displs = None
+    if isinstance(buf, (list, tuple)):
+        args = [arg for arg in buf[1:]
+                if isinstance(arg, (int, np.integer, list, tuple))]
+        buf = buf[0]
+        if(len(args) == 1 and isinstance(args[0], (list, tuple))):
+            counts, displs = args[0]
+        elif(len(args) == 1):
+            counts = args[0]
+        elif(len(args) == 2):
+            counts, displs = args
+
+    # Obtain the bytes of buf and the size of its items
+    if isinstance(buf, np.ndarray):
+        if not buf.flags.c_contiguous:
+            raise ValueError("Buffer is not contiguous!")
+        data = buf.reshape(-1).view(np.uint8)
+        itemsize = buf.itemsize
+    else:
+        data = np.frombuffer(buf, np.uint8)
+        itemsize = memoryview(buf).itemsize
+
+    # If a single count was given, truncate data
+    if isinstance(counts, (int, np.integer)):
+        data = data[:counts*itemsize]
+        counts = None
+
+    # Return buffer information
+    return(data, itemsize, counts, displs)
+
+
+# This function returns the typed array described by a buffer specification
+def get_array(buf):
+    # Unwrap buffer specification
+    if isinstance(buf, (list, tuple)):
+        buf = buf[0]
+
+    # Return buf as an array
+    return(buf if isinstance(buf, np.ndarray) else
+           np.asarray(memoryview(buf)))
+
+
+# This function returns the regions of a vector buffer for all ranks
+def get_regions(buf, size):
+    # Obtain buffer information
+    data, itemsize, counts, displs = get_buffer(buf)
+
+    # If no counts were given, split data up evenly
+    if counts is None:
+        counts = [len(data)//itemsize//size]*size
+    if displs is None:
+        displs = np.cumsum([0, *counts[:-1]]).tolist()
+
+    # Return the regions
+    return([data[displ*itemsize:(displ+n)*itemsize]
+            for n, displ in zip(counts, displs)])
+
+
+# This function reduces arrays in rank order
+def reduce_arrays(arrays, op):
+    """
+    Returns the result of reducing the provided `arrays` of all ranks in rank
+    order with the :obj:`~mpi4pyd.dummyMPI.Op` object `op`.
+
+    """
+
+    # Reduce arrays into a copy of the last one, as op is associative
+    result = np.array(arrays[-1], copy=True)
+    for array in arrays[-2::-1]:
+        op.Reduce_local(array, result)
+    return(result)
+
+
+# This function reduces objects in rank order
+def reduce_objects(objs, op):
+    """
+    Returns the result of reducing the provided `objs` of all ranks in rank
+    order with the :obj:`~mpi4pyd.dummyMPI.Op` object `op`.
+
+    """
+
+    result = objs[0]
+    for obj in objs[1:]:
+        result = op(result, obj)
+    return(result)
@@ -9,12 +9,21 @@ available.
 This is a specialized version of the `mpi_dummy` package available at
 https://gitlab.mpcdf.mpg.de/ift/mpi_dummy
 
+By default, communication methods without a receiving buffer return copies of
+the provided objects, like :mod:`mpi4py.MPI` does. Setting the
+:attr:`~Comm.zero_copy` property of a communicator to *True* makes them return
+the provided objects themselves instead, which avoids copying large arrays in
+serial runs.
+
 """
 
 
 # %% IMPORTS
 # Built-in imports
+import asyncio
+from contextlib import contextmanager
 from copy import deepcopy as copy
+import operator
 from pkg_resources import parse_version
 
 # Package imports
@@ -25,6 +34,7 @@ from mpi4pyd import __version__
 
 # All declaration
 __all__ = ['COMM_SELF', 'COMM_WORLD', 'Comm', 'Datatype', 'Intracomm', 'Op',
+           'Prequest', 'Request', 'Status', 'Win',
            'AINT', 'BAND', 'BOOL', 'BOR', 'BXOR', 'BYTE', 'CHAR', 'CHARACTER',
            'COMPLEX', 'COMPLEX16', 'COMPLEX32', 'COMPLEX4', 'COMPLEX8',
            'COUNT', 'CXX_BOOL', 'CXX_DOUBLE_COMPLEX', 'CXX_FLOAT_COMPLEX',
@@ -45,7 +55,39 @@ __all__ = ['COMM_SELF', 'COMM_WORLD', 'Comm', 'Datatype', 'Intracomm', 'Op',
            'SINT64_T', 'SINT8_T', 'SUM', 'TWOINT', 'UB', 'UINT16_T',
            'UINT32_T', 'UINT64_T', 'UINT8_T', 'UNSIGNED', 'UNSIGNED_CHAR',
            'UNSIGNED_INT', 'UNSIGNED_LONG', 'UNSIGNED_LONG_LONG',
-           'UNSIGNED_SHORT', 'WCHAR', 'ANY_SOURCE', 'ANY_TAG', 'get_vendor']
+           'UNSIGNED_SHORT', 'WCHAR', 'ANY_SOURCE', 'ANY_TAG',
+           'COMM_TYPE_SHARED', 'UNDEFINED', 'get_vendor']
+
+
+# %% MISCELLANEOUS
+ANY_SOURCE = -2
+ANY_TAG = -1
+COMM_TYPE_SHARED = 1
+UNDEFINED = -32766
+
+
+# %% HELPER FUNCTIONS
+# This function creates a non-blocking version of a blocking method
+def _make_immediate(method):
+    # Perform method directly and return a request that has completed
+    def immediate(self, *args, **kwargs):
+        return(Request(value=method(self, *args, **kwargs)))
+    return(immediate)
+
+
+# This function copies an array into a buffer array if it fits in it
+def _copy_into(buf, obj):
+    # Copy obj into buf if it is a writeable C-contiguous array with the same
+    # shape and dtype, like HybridComm does
+    if(isinstance(obj, np.ndarray) and isinstance(buf, np.ndarray) and
+       buf.shape == obj.shape and buf.dtype == obj.dtype and
+       buf.flags.c_contiguous and buf.flags.writeable):
+        buf[...] = obj
+        return(buf)
+
+    # Else, return obj itself
+    else:
+        return(obj)
 
 
 # %% COMM CLASS DEFINITION
@@ -64,6 +106,12 @@ class Comm(object):
         self._rank = 0
         self._size = 1
 
+        # Return copies of objects by default
+        self._zero_copy = False
+
+        # Initialize list of messages this rank sent to itself
+        self._messages = []
+
     # %% CLASS PROPERTIES
     @property
     def name(self):
@@ -84,6 +132,24 @@ class Comm(object):
     def size(self):
         return(self._size)
 
+    @property
+    def zero_copy(self):
+        """
+        bool: Whether communication methods without a receiving buffer return
+        the provided objects themselves instead of copies of them.
+
+        """
+
+        return(self._zero_copy)
+
+    @zero_copy.setter
+    def zero_copy(self, zero_copy):
+        if isinstance(zero_copy, bool):
+            self._zero_copy = zero_copy
+        else:
+            raise TypeError("Input argument 'zero_copy' is not of type "
+                            "'bool'!")
+
     # %% GENERAL CLASS METHODS
     def _get_buffer(self, buff):
         # If buff is a list or tuple, return the first element
@@ -98,18 +164,78 @@ class Comm(object):
         sendbuf = self._get_buffer(sendbuf)
         recvbuf = self._get_buffer(recvbuf)
 
-        # If no receiving buffer was supplied, return a copy of sendbuf
+        # If no receiving buffer was supplied, return sendbuf or a copy of it
         if recvbuf is None:
-            # Make a copy of sendbuf
-            return(copy(sendbuf))
-        # If a receiving buffer was supplied, use it
+            # In zero-copy mode, return sendbuf itself
+            if self._zero_copy:
+                return(sendbuf)
+            # Else, copy arrays directly and other objects recursively
+            elif(isinstance(sendbuf, np.ndarray) and
+                 not sendbuf.dtype.hasobject):
+                return(sendbuf.copy())
+            else:
+                return(copy(sendbuf))
+        # If a receiving array was supplied, copy sendbuf into it if required
+        elif isinstance(recvbuf, np.ndarray):
+            if recvbuf is not sendbuf:
+                np.copyto(recvbuf, sendbuf, casting='unsafe')
+            return(recvbuf)
         else:
             recvbuf[:] = sendbuf
             return(recvbuf)
 
+    # This function returns the first message with a matching tag
+    def _match(self, tag, status=None, remove=True, block=True):
+        # Search for a matching message
+        for i, message in enumerate(self._messages):
+            if tag in (ANY_TAG, message[0]):
+                if remove:
+                    del self._messages[i]
+                if status is not None:
+                    status._set(0, message[0], message[2])
+                return(message)
+
+        # If none was found, blocking on it would never complete
+        if block:
+            raise RuntimeError("No message with tag %i was sent to this rank, "
+                               "so receiving it would never complete!" % (tag))
+        return(None)
+
+    # This function returns a request that receives a message.
+    # If obj is True, the message is an object, which is copied into buf if it
+    # is an array that fits in it
+    def _irecv(self, buf, tag, obj=False):
+        def progress(block, status):
+            message = self._match(tag, status, block=block)
+            if message is None:
+                return(False, None)
+            elif buf is None:
+                return(True, message[1])
+            elif obj:
+                return(True, _copy_into(buf, message[1]))
+            else:
+                data = np.frombuffer(self._get_buffer(buf), np.uint8)
+                data[:message[2]] = message[1]
+                return(True, None)
+        return(Request(progress, cancellable=True, local=True))
+
+    # %% ASYNCHRONOUS CLASS METHODS
+    async def aallreduce(self, sendobj, op=None, timeout=None):
+        return(await asyncio.wait_for(self.iallreduce(sendobj, op), timeout))
+
+    async def abcast(self, obj, root=0, timeout=None):
+        return(await asyncio.wait_for(self.ibcast(obj, root), timeout))
+
+    async def arecv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG,
+                    timeout=None):
+        return(await asyncio.wait_for(self.irecv(buf, source, tag), timeout))
+
+    async def asend(self, obj, dest, tag=0, timeout=None):
+        await asyncio.wait_for(self.isend(obj, dest, tag), timeout)
+
     # %% VISIBLE CLASS METHODS
     # TODO: Implement dummy versions of missing communication methods
-    # Still missing: Alltoall and non-blocking/synchronous (I/S) methods
+    # Still missing: persistent, scan and reduce-scatter methods
     def Get_name(self):
         return(self.name)
 
@@ -119,6 +245,11 @@ class Comm(object):
     def Get_size(self):
         return(self.size)
 
+    # Objects are sent directly, so there is nothing to aggregate
+    @contextmanager
+    def aggregate(self, *args, **kwargs):
+        yield self
+
     def Allgather(self, sendbuf, recvbuf, *args, **kwargs):
         return(self.Gather(sendbuf, recvbuf))
 
@@ -134,6 +265,15 @@ class Comm(object):
     def allreduce(self, sendobj, *args, **kwargs):
         return(self.reduce(sendobj))
 
+    def Alltoall(self, sendbuf, recvbuf, *args, **kwargs):
+        return(self._scatter_gather(sendbuf, recvbuf))
+
+    def alltoall(self, sendobj, *args, **kwargs):
+        return([sendobj[0]])
+
+    def Alltoallv(self, sendbuf, recvbuf, *args, **kwargs):
+        return(self._scatter_gather(sendbuf, recvbuf))
+
     def Barrier(self):
         pass
 
@@ -146,6 +286,22 @@ class Comm(object):
     def bcast(self, obj, *args, **kwargs):
         return(obj)
 
+    def bcast_iter(self, obj, *args, **kwargs):
+        yield(obj, (Ellipsis,))
+
+    # Arrays are shared with the single rank as a read-only view
+    def bcast_shared(self, obj, *args, **kwargs):
+        if(isinstance(obj, np.ndarray) and not obj.dtype.hasobject):
+            obj = obj.view()
+            obj.flags.writeable = False
+        return(obj)
+
+    def flush(self):
+        pass
+
+    def free_shared(self):
+        pass
+
     def Gather(self, sendbuf, recvbuf, *args, **kwargs):
         return(self._scatter_gather(sendbuf, recvbuf))
 
@@ -155,12 +311,71 @@ class Comm(object):
     def Gatherv(self, sendbuf, recvbuf, *args, **kwargs):
         return(self._scatter_gather(sendbuf, recvbuf))
 
+    Iallgather = _make_immediate(Allgather)
+    Iallgatherv = _make_immediate(Allgatherv)
+    Iallreduce = _make_immediate(Allreduce)
+    iallreduce = _make_immediate(allreduce)
+    Ialltoall = _make_immediate(Alltoall)
+    Ialltoallv = _make_immediate(Alltoallv)
+    Ibarrier = _make_immediate(Barrier)
+    Ibcast = _make_immediate(Bcast)
+    ibcast = _make_immediate(bcast)
+    Igather = _make_immediate(Gather)
+    Igatherv = _make_immediate(Gatherv)
+
+    def Iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self._match(tag, status, remove=False,
+                           block=False) is not None)
+
+    def iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Iprobe(source, tag, status))
+
+    def Irecv(self, buf, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._irecv(buf, tag))
+
+    def irecv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._irecv(None, tag))
+
     def Is_intra(self):
         return(isinstance(self, Intracomm))
 
+    # Plans repeat the communication of the object they were created with
+    def plan_bcast(self, obj, *args, **kwargs):
+        return(Prequest(value=obj))
+
+    def plan_recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        return(Prequest(lambda: self._irecv(buf, tag, obj=True)._progress))
+
+    def plan_send(self, obj, dest, tag=0):
+        return(Prequest(lambda: self.send(obj, dest, tag)))
+
     def Is_inter(self):
         return(False)
 
+    def Isend(self, buf, dest, tag=0):
+        self.Send(buf, dest, tag)
+        return(Request())
+
+    def isend(self, obj, dest, tag=0, compression=None):
+        self.send(obj, dest, tag)
+        return(Request())
+
+    Issend = Isend
+    issend = isend
+
+    def Probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._match(tag, status, remove=False)
+        return(True)
+
+    def probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Probe(source, tag, status))
+
+    def Recv(self, buf, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._irecv(buf, tag).Wait(status)
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self._irecv(None, tag).wait(status))
+
     def Reduce(self, sendbuf, recvbuf, *args, **kwargs):
         return(self._scatter_gather(sendbuf, recvbuf))
 
@@ -170,6 +385,8 @@ class Comm(object):
         else:
             return(self._scatter_gather(sendobj))
 
+    Ireduce = _make_immediate(Reduce)
+
     def Scatter(self, sendbuf, recvbuf, *args, **kwargs):
         return(self._scatter_gather(sendbuf, recvbuf))
 
@@ -179,12 +396,28 @@ class Comm(object):
     def Scatterv(self, sendbuf, recvbuf, *args, **kwargs):
         return(self._scatter_gather(sendbuf, recvbuf))
 
+    Iscatter = _make_immediate(Scatter)
+    Iscatterv = _make_immediate(Scatterv)
+
+    def Send(self, buf, dest, tag=0):
+        data = np.frombuffer(self._get_buffer(buf), np.uint8)
+        self._messages.append((tag, data.copy(), data.nbytes))
+
+    def send(self, obj, dest, tag=0, compression=None):
+        self._messages.append((tag, obj if self._zero_copy else copy(obj), 0))
+
     def Sendrecv(self, sendbuf, *args, **kwargs):
         return(sendbuf)
 
     def sendrecv(self, sendobj, *args, **kwargs):
         return(sendobj)
 
+    def Split_type(self, split_type, key=0, info=None):
+        return(Intracomm(self.name))
+
+    Ssend = Send
+    ssend = send
+
 
 # %% INTRACOMM CLASS DEFINITION
 # Make dummy Intracomm class
@@ -205,6 +438,22 @@ class Datatype(object):
     def __init__(self, name):
         self.name = name
 
+    def Commit(self):
+        return(self)
+
+    def Create_contiguous(self, count):
+        return(Datatype('dummyMPI_CONTIGUOUS'))
+
+    def Create_resized(self, lb, extent):
+        return(Datatype('dummyMPI_RESIZED'))
+
+    @classmethod
+    def Create_struct(cls, blocklengths, displacements, datatypes):
+        return(cls('dummyMPI_STRUCT'))
+
+    def Free(self):
+        pass
+
 
 # MPI standard datatypes
 AINT = Datatype('dummyMPI_AINT')
@@ -300,36 +549,398 @@ UNSIGNED_INT = UNSIGNED
 
 
 # %% OPERATOR DEFINITIONS
+# This function returns the value and location fields of pair-type buffers
+def _get_pairs(buf):
+    # Structured arrays store pairs in two fields, others in their last axis
+    if buf.dtype.names:
+        return(buf[buf.dtype.names[0]], buf[buf.dtype.names[1]])
+    else:
+        return(buf[..., 0], buf[..., 1])
+
+
+# This function creates the in-place array function of MAXLOC or MINLOC
+def _make_loc_func(compare):
+    def loc_func(inbuf, inoutbuf):
+        # Obtain values and locations of both buffers
+        in_vals, in_locs = _get_pairs(inbuf)
+        out_vals, out_locs = _get_pairs(inoutbuf)
+
+        # Take the lowest location of equal values
+        equal = in_vals == out_vals
+        out_locs[equal] = np.minimum(in_locs[equal], out_locs[equal])
+
+        # Take all pairs of inbuf with better values
+        better = compare(in_vals, out_vals)
+        inoutbuf[better] = inbuf[better]
+    return(loc_func)
+
+
+# This function creates the object function of MAXLOC or MINLOC
+def _make_loc_obj_func(compare):
+    def loc_obj_func(x, y):
+        if compare(x[0], y[0]):
+            return(x)
+        elif compare(y[0], x[0]):
+            return(y)
+        else:
+            return((x[0], min(x[1], y[1])))
+    return(loc_obj_func)
+
+
+# This function creates the in-place array function of a NumPy ufunc
+def _make_ufunc_func(ufunc):
+    def ufunc_func(inbuf, inoutbuf):
+        ufunc(inbuf, inoutbuf, out=inoutbuf, casting='unsafe')
+    return(ufunc_func)
+
+
+# This function copies inbuf into inoutbuf
+def _copy_in(inbuf, inoutbuf):
+    np.copyto(inoutbuf, inbuf, casting='unsafe')
+
+
+# This function leaves inoutbuf unchanged
+def _keep(inbuf, inoutbuf):
+    pass
+
+
 # Make dummy Op class
 class Op(object):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, array_func=None, object_func=None, commute=True,
+                 *args, **kwargs):
+        # Save the functions that apply the operator to arrays and objects
+        self._array_func = array_func
+        self._object_func = object_func
+        self._commute = commute
         self.is_predefined = True
 
-    def __call__(self, *args, **kwargs):
+    # %% CLASS PROPERTIES
+    @property
+    def is_commutative(self):
+        return(self._commute)
+
+    # %% GENERAL CLASS METHODS
+    # This function returns the array of a buffer specification
+    def _get_array(self, buf):
+        # Unwrap buffer specification
+        if isinstance(buf, (list, tuple)):
+            buf = buf[0]
+
+        # Return buf as an array
+        return(buf if isinstance(buf, np.ndarray) else
+               np.asarray(memoryview(buf)))
+
+    # %% VISIBLE CLASS METHODS
+    # This function applies the operator to two objects
+    def __call__(self, x, y):
+        # Apply user-defined functions directly
+        if not self.is_predefined:
+            return(self._array_func(x, y, None))
+
+        # Apply the operator element-wise to arrays
+        elif(isinstance(x, np.ndarray) or isinstance(y, np.ndarray)):
+            x, y = np.broadcast_arrays(x, y)
+            out = y.astype(np.result_type(x, y))
+            self._array_func(x, out)
+            return(out)
+
+        # Else, apply the operator to the objects themselves
+        else:
+            return(self._object_func(x, y))
+
+    # This function applies the operator in-place to two buffers
+    def Reduce_local(self, inbuf, inoutbuf):
+        # Apply user-defined functions to the buffers themselves
+        if not self.is_predefined:
+            self._array_func(self._get_array(inbuf),
+                             self._get_array(inoutbuf), None)
+
+        # Else, apply the operator element-wise
+        else:
+            self._array_func(self._get_array(inbuf),
+                             self._get_array(inoutbuf))
+
+    def Is_commutative(self):
+        return(self.is_commutative)
+
+    def Free(self):
         pass
 
+    @classmethod
+    def Create(cls, function, commute=False):
+        """
+        Returns a user-defined operator that applies `function(inbuf,
+        inoutbuf, datatype)` to buffers. The result must be stored in
+        `inoutbuf`, and must be returned as well if `function` is applied to
+        objects with :meth:`~__call__`.
+
+        """
+
+        op = cls(function, None, commute)
+        op.is_predefined = False
+        return(op)
+
 
 # MPI standard operators
-BAND = Op()
-BOR = Op()
-BXOR = Op()
-LAND = Op()
-LOR = Op()
-LXOR = Op()
-MAX = Op()
-MAXLOC = Op()
-MIN = Op()
-MINLOC = Op()
-NO_OP = Op()
+BAND = Op(_make_ufunc_func(np.bitwise_and), operator.and_)
+BOR = Op(_make_ufunc_func(np.bitwise_or), operator.or_)
+BXOR = Op(_make_ufunc_func(np.bitwise_xor), operator.xor)
+LAND = Op(_make_ufunc_func(np.logical_and), lambda x, y: x and y)
+LOR = Op(_make_ufunc_func(np.logical_or), lambda x, y: x or y)
+LXOR = Op(_make_ufunc_func(np.logical_xor),
+          lambda x, y: (x or y) and not (x and y))
+MAX = Op(_make_ufunc_func(np.maximum), lambda x, y: y if(y > x) else x)
+MAXLOC = Op(_make_loc_func(np.greater), _make_loc_obj_func(operator.gt))
+MIN = Op(_make_ufunc_func(np.minimum), lambda x, y: y if(y < x) else x)
+MINLOC = Op(_make_loc_func(np.less), _make_loc_obj_func(operator.lt))
+NO_OP = Op(_copy_in, lambda x, y: x, False)
 OP_NULL = Op()
-PROD = Op()
-REPLACE = Op()
-SUM = Op()
+PROD = Op(_make_ufunc_func(np.multiply), operator.mul)
+REPLACE = Op(_keep, lambda x, y: y, False)
+SUM = Op(_make_ufunc_func(np.add), operator.add)
 
 
-# %% MISCELLANEOUS
-ANY_SOURCE = -2
-ANY_TAG = -1
+# %% STATUS AND REQUEST CLASS DEFINITIONS
+# Make dummy Status class
+class Status(object):
+    def __init__(self):
+        self.source = ANY_SOURCE
+        self.tag = ANY_TAG
+        self.error = 0
+        self.count = 0
+
+    # This function fills in the status of a received message
+    def _set(self, source, tag, count):
+        self.source = source
+        self.tag = tag
+        self.count = count
+
+    def Get_source(self):
+        return(self.source)
+
+    def Get_tag(self):
+        return(self.tag)
+
+    def Get_error(self):
+        return(self.error)
+
+    # Datatypes carry no size, so the count is always given in bytes
+    def Get_count(self, datatype=BYTE):
+        return(self.count)
+
+    def Set_source(self, source):
+        self.source = source
+
+    def Set_tag(self, tag):
+        self.tag = tag
+
+    def Set_error(self, error):
+        self.error = error
+
+
+# Make dummy Request class
+class Request(object):
+    # Maximum number of seconds between tests of a request that is awaited
+    max_poll_interval = 0.001
+
+    def __init__(self, progress=None, value=None, cancellable=False,
+                 local=False):
+        # Save function that progresses the request, if any
+        self._progress = progress
+        self._value = value
+
+        # Save whether the request can only be completed by this rank, such
+        # that waiting for it fails if testing it does not complete it
+        self._local = local
+
+        # Requests are active until they have been completed
+        self._active = True
+
+        # Save whether the request can be cancelled before it has completed
+        self._cancellable = cancellable
+        self._cancelled = False
+
+    # This function lets the request be awaited in an asyncio event loop
+    def __await__(self):
+        return(self._await().__await__())
+
+    @property
+    def cancelled(self):
+        """
+        bool: Whether this request was cancelled with :meth:`~Cancel` before
+        it completed.
+
+        """
+
+        return(self._cancelled)
+
+    # This function tries to complete the request
+    def _complete(self, block, status):
+        if self._progress is not None:
+            done, self._value = self._progress(block, status)
+            if not done:
+                return(False)
+            self._progress = None
+        self._active = False
+        return(True)
+
+    # This function tests the request until it has completed
+    async def _poll(self):
+        # Yield to the event loop for increasingly long intervals in between
+        delay = 0
+        while not self.Test():
+            await asyncio.sleep(delay)
+            delay = min(2*delay or 1e-6, self.max_poll_interval)
+        return(self._value)
+
+    # This function awaits the request
+    async def _await(self):
+        try:
+            return(await self._poll())
+
+        # If the awaiting task is cancelled, cancel the request or finish it in
+        # the background if that is not possible
+        except asyncio.CancelledError:
+            self.Cancel()
+            if not self.Test():
+                task = asyncio.ensure_future(self._poll())
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            raise
+
+    def Test(self, status=None):
+        return(self._complete(False, status))
+
+    def Wait(self, status=None):
+        self._complete(True, status)
+
+    def test(self, status=None):
+        done = self._complete(False, status)
+        return(done, self._value if done else None)
+
+    def wait(self, status=None):
+        self._complete(True, status)
+        return(self._value)
+
+    def Cancel(self):
+        if self._cancellable and self._progress is not None:
+            self._progress = None
+            self._cancelled = True
+
+    def Free(self):
+        pass
+
+    @classmethod
+    def Testall(cls, requests, statuses=None):
+        return(all([request.Test() for request in requests]))
+
+    @classmethod
+    def Waitall(cls, requests, statuses=None):
+        for request in requests:
+            request.Wait()
+
+    # Completed requests are inactive and skipped, like null requests in MPI
+    @classmethod
+    def Testany(cls, requests, status=None):
+        active = [i for i, request in enumerate(requests) if request._active]
+        for i in active:
+            if requests[i]._complete(False, status):
+                return(i, True)
+        return(UNDEFINED, not active)
+
+    @classmethod
+    def Waitany(cls, requests, status=None):
+        while True:
+            index, done = cls.Testany(requests, status)
+            if done:
+                return(index)
+
+            # If no other rank can complete any of the active requests, wait
+            # for the first one, which fails like Wait if it never completes
+            active = [i for i, request in enumerate(requests)
+                      if request._active]
+            if all(requests[i]._local for i in active):
+                requests[active[0]].Wait(status)
+                return(active[0])
+
+    @classmethod
+    def testall(cls, requests, statuses=None):
+        done = cls.Testall(requests)
+        return(done, [request._value for request in requests]
+               if done else None)
+
+    @classmethod
+    def waitall(cls, requests, statuses=None):
+        return([request.wait() for request in requests])
+
+    @classmethod
+    def testany(cls, requests, status=None):
+        index, done = cls.Testany(requests, status)
+        return(index, done, requests[index]._value
+               if(done and index != UNDEFINED) else None)
+
+    @classmethod
+    def waitany(cls, requests, status=None):
+        index = cls.Waitany(requests, status)
+        return(index, None if(index == UNDEFINED) else
+               requests[index]._value)
+
+
+# Make dummy Prequest class, which posts its communication every time it is
+# started
+class Prequest(Request):
+    def __init__(self, post=None, free=None, value=None):
+        # Save functions that post the communication and free the request.
+        # Posting returns the function that progresses the communication
+        self._post = post
+        self._free = free
+
+        # Initialize request, which is inactive until it is started
+        super().__init__(value=value)
+        self._active = False
+
+    def Start(self):
+        if self._post is not None:
+            self._progress = self._post()
+        self._active = True
+
+    start = Start
+
+    @classmethod
+    def Startall(cls, requests):
+        for request in requests:
+            request.Start()
+
+    def Free(self):
+        if self._free is not None:
+            self._free()
+        self._post = self._free = None
+
+
+# Set of tasks that finish awaited requests whose tasks were cancelled
+_background_tasks = set()
+
+
+# %% WIN CLASS DEFINITION
+# Make dummy Win class
+class Win(object):
+    def __init__(self, memories, disp_units):
+        # Save the memory and displacement unit of every rank
+        self._memories = memories
+        self._disp_units = disp_units
+
+    @classmethod
+    def Allocate_shared(cls, size, disp_unit=1, info=None, comm=None):
+        return(cls([memoryview(bytearray(size))], [disp_unit]))
+
+    def Shared_query(self, rank):
+        return(self._memories[rank], self._disp_units[rank])
+
+    def Fence(self, assertion=0):
+        pass
+
+    def Free(self):
+        pass
 
 
 # %% DUMMY FUNCTIONS
@@ -0,0 +1,648 @@
+# -*- coding: utf-8 -*-
+
+"""
+Local MPI
+=========
+Module that emulates the functionality of the :mod:`mpi4py.MPI` module with
+multiple local processes, which are started with the :mod:`mpi4pyd.run`
+launcher::
+
+    python -m mpi4pyd.run -n 4 script.py
+
+It is automatically imported as :mod:`mpi4pyd.MPI` in every process that was
+started this way.
+All processes are connected to each other with pipes. Payloads that are
+larger than :attr:`~SHM_THRESHOLD` bytes are moved through
+:mod:`multiprocessing.shared_memory` segments instead, such that they are
+copied only once by the sender and once by the receiver, which requires
+Python 3.8 or later.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from itertools import count
+from multiprocessing.connection import Client, Listener
+import os
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from socket import gethostname
+from struct import Struct
+import sys
+from threading import Condition, Lock, Thread
+from time import perf_counter, sleep
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    raise ImportError("The localMPI module requires Python 3.8 or later!")
+
+# Package imports
+import numpy as np
+from pkg_resources import parse_version
+
+# mpi4pyd imports
+from mpi4pyd import __version__, dummyMPI
+from mpi4pyd._backend import (
+    Request, Status, get_array, get_buffer, get_regions, make_immediate,
+    reduce_arrays, reduce_objects)
+from mpi4pyd.dummyMPI import *
+from mpi4pyd.run import (
+    ENV_ADDRESS, ENV_AUTHKEY, ENV_RANK, ENV_SHM_PREFIX, ENV_SIZE)
+
+# All declaration
+__all__ = list(dummyMPI.__all__)
+__all__.extend(['SHM_THRESHOLD', 'Get_processor_name', 'Wtime'])
+
+
+# %% GLOBALS
+# Payloads of more than this many bytes are moved through shared memory
+SHM_THRESHOLD = 2**16
+
+# Envelope that precedes every message: context, tag and payload size
+_ENVELOPE = Struct('<qqQ')
+
+# Number of seconds a process waits for the others to start listening
+_CONNECT_TIMEOUT = 60
+
+
+# %% MESSAGE AND TRANSPORT CLASS DEFINITIONS
+# Class holding a single received message
+class _Message(object):
+    __slots__ = ('source', 'context', 'tag', 'nbytes', 'payload')
+
+    def __init__(self, source, context, tag, nbytes, payload):
+        self.source = source
+        self.context = context
+        self.tag = tag
+        self.nbytes = nbytes
+        self.payload = payload
+
+    # This function copies the payload into a provided byte array
+    def copy_to(self, buf):
+        # Check if the payload fits in buf
+        if(self.nbytes > len(buf)):
+            raise ValueError("Message of %i bytes is truncated by a receive "
+                             "buffer of %i bytes!" % (self.nbytes, len(buf)))
+
+        # Copy the payload and release its shared memory segment if used
+        if isinstance(self.payload, SharedMemory):
+            buf[:self.nbytes] = np.frombuffer(self.payload.buf, np.uint8,
+                                              self.nbytes)
+            self._release()
+        else:
+            buf[:self.nbytes] = np.frombuffer(self.payload, np.uint8)
+
+    # This function returns the payload as a bytes object
+    def read(self):
+        if isinstance(self.payload, SharedMemory):
+            data = bytes(self.payload.buf[:self.nbytes])
+            self._release()
+            return(data)
+        else:
+            return(self.payload)
+
+    # This function closes and removes the shared memory segment
+    def _release(self):
+        self.payload.close()
+        self.payload.unlink()
+
+
+# Class that moves messages between the processes
+class _Transport(object):
+    def __init__(self, rank, size, address, authkey, shm_prefix):
+        # Save rank and size of the world and the shared memory prefix
+        self.rank = rank
+        self.size = size
+        self.shm_prefix = shm_prefix
+        self.shm_counter = count()
+
+        # Initialize the list of received messages that are not matched yet
+        self.messages = []
+        self.condition = Condition()
+
+        # Initialize the context that is given to the next communicator
+        self.next_context = 2
+
+        # Connect to all other processes if there are any
+        self.conns = [None]*size
+        self.locks = [Lock() for _ in range(size)]
+        if(size == 1):
+            return
+        listener = Listener(address % (rank), authkey=authkey)
+        for dest in range(rank):
+            self.conns[dest] = self._connect(address % (dest), authkey)
+            self.conns[dest].send_bytes(_ENVELOPE.pack(rank, 0, 0))
+        for _ in range(rank+1, size):
+            conn = listener.accept()
+            self.conns[_ENVELOPE.unpack(conn.recv_bytes())[0]] = conn
+        listener.close()
+
+        # Start receiving messages from all other processes
+        for source, conn in enumerate(self.conns):
+            if conn is not None:
+                Thread(target=self._receive, args=(source, conn),
+                       daemon=True).start()
+
+    # This function connects to a listening process
+    def _connect(self, address, authkey):
+        # Keep trying until the process is listening
+        t = perf_counter()
+        while True:
+            try:
+                return(Client(address, authkey=authkey))
+            except (FileNotFoundError, ConnectionRefusedError):
+                if(perf_counter()-t > _CONNECT_TIMEOUT):
+                    raise
+                sleep(0.01)
+
+    # This function receives all messages coming from a single process
+    def _receive(self, source, conn):
+        try:
+            while True:
+                # Receive envelope
+                envelope = conn.recv_bytes()
+                context, tag, nbytes = _ENVELOPE.unpack_from(envelope)
+
+                # Attach to the shared memory segment or receive the payload
+                if(len(envelope) > _ENVELOPE.size):
+                    payload = SharedMemory(
+                        envelope[_ENVELOPE.size:].decode('ascii'))
+                else:
+                    payload = conn.recv_bytes()
+
+                # Store the message
+                self.deliver(_Message(source, context, tag, nbytes, payload))
+        except (EOFError, OSError):
+            pass
+
+    # This function stores a received message
+    def deliver(self, message):
+        with self.condition:
+            self.messages.append(message)
+            self.condition.notify_all()
+
+    # This function sends a message to another process
+    def send(self, dest, context, tag, data):
+        # Messages to this process are stored directly
+        if(dest == self.rank):
+            self.deliver(_Message(dest, context, tag, len(data),
+                                  bytes(data)))
+            return
+
+        # Large payloads are copied into a shared memory segment
+        if(len(data) > SHM_THRESHOLD):
+            shm = SharedMemory(
+                '%s_%i_%i' % (self.shm_prefix, self.rank,
+                              next(self.shm_counter)),
+                create=True, size=len(data))
+            np.frombuffer(shm.buf, np.uint8, len(data))[:] = data
+
+            # Hand the segment over to the receiver, who removes it
+            resource_tracker.unregister(shm._name, 'shared_memory')
+            shm.close()
+            with self.locks[dest]:
+                self.conns[dest].send_bytes(
+                    _ENVELOPE.pack(context, tag, len(data)) +
+                    shm.name.encode('ascii'))
+
+        # Else, send the payload through the pipe
+        else:
+            with self.locks[dest]:
+                self.conns[dest].send_bytes(
+                    _ENVELOPE.pack(context, tag, len(data)))
+                self.conns[dest].send_bytes(data)
+
+    # This function returns the first message matching the given envelope
+    def match(self, sources, context, tag, remove=True, block=True):
+        with self.condition:
+            while True:
+                # Search for a matching message
+                for i, message in enumerate(self.messages):
+                    if(message.context == context and
+                       (sources is None or message.source in sources) and
+                       (tag == ANY_TAG or message.tag == tag)):
+                        if remove:
+                            del self.messages[i]
+                        return(message)
+
+                # Wait for the next message if requested
+                if not block:
+                    return(None)
+                self.condition.wait()
+
+
+# %% COMM CLASS DEFINITION
+# Make Comm class
+class Comm(object):
+    def __init__(self, name, group, context):
+        # Save name, group of world ranks and context of communicator
+        self.name = name
+        self._group = tuple(group)
+        self._index = {world: i for i, world in enumerate(self._group)}
+        self._context = context
+
+        # Save rank and size of communicator
+        self._rank = self._index.get(_transport.rank, ANY_SOURCE)
+        self._size = len(self._group)
+
+    # %% CLASS PROPERTIES
+    @property
+    def name(self):
+        return(self._name)
+
+    @name.setter
+    def name(self, name):
+        if isinstance(name, str):
+            self._name = name
+        else:
+            raise TypeError("Input argument 'name' is not of type 'str'!")
+
+    @property
+    def rank(self):
+        return(self._rank)
+
+    @property
+    def size(self):
+        return(self._size)
+
+    # %% GENERAL CLASS METHODS
+    # This function sends bytes to a rank of this communicator
+    def _send(self, data, dest, tag, coll=False):
+        _transport.send(self._group[dest], 2*self._context+coll, tag, data)
+
+    # This function receives the message matching the given envelope
+    def _recv(self, source, tag, coll=False, status=None, remove=True,
+              block=True):
+        # Match message
+        sources = None if(source == ANY_SOURCE) else (self._group[source],)
+        message = _transport.match(sources, 2*self._context+coll, tag, remove,
+                                   block)
+
+        # Fill in status and return message
+        if message is not None and status is not None:
+            status._set(self._index[message.source], message.tag,
+                        message.nbytes)
+        return(message)
+
+    # This function returns a request that receives into a buffer
+    def _recv_request(self, data, source, tag, unpickle=False):
+        def progress(block, status):
+            message = self._recv(source, tag, status=status, block=block)
+            if message is None:
+                return(False, None)
+            elif unpickle:
+                return(True, loads(message.read()))
+            else:
+                message.copy_to(data)
+                return(True, None)
+        return(Request(progress))
+
+    # %% VISIBLE CLASS METHODS
+    def Get_name(self):
+        return(self.name)
+
+    def Set_name(self, name):
+        self.name = name
+
+    def Get_rank(self):
+        return(self.rank)
+
+    def Get_size(self):
+        return(self.size)
+
+    def Is_intra(self):
+        return(isinstance(self, Intracomm))
+
+    def Is_inter(self):
+        return(False)
+
+    def Abort(self, errorcode=0):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(errorcode)
+
+    def Free(self):
+        pass
+
+    # POINT-TO-POINT
+    def Send(self, buf, dest, tag=0):
+        self._send(get_buffer(buf)[0], dest, tag)
+
+    Ssend = Send
+
+    def Isend(self, buf, dest, tag=0):
+        self.Send(buf, dest, tag)
+        return(Request())
+
+    Issend = Isend
+
+    def Recv(self, buf, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._recv(source, tag, status=status).copy_to(get_buffer(buf)[0])
+
+    def Irecv(self, buf, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._recv_request(get_buffer(buf)[0], source, tag))
+
+    def Sendrecv(self, sendbuf, dest, sendtag=0, recvbuf=None,
+                 source=ANY_SOURCE, recvtag=ANY_TAG, status=None):
+        self.Send(sendbuf, dest, sendtag)
+        self.Recv(recvbuf, source, recvtag, status)
+
+    def Probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._recv(source, tag, status=status, remove=False)
+        return(True)
+
+    def Iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self._recv(source, tag, status=status, remove=False,
+                          block=False) is not None)
+
+    def send(self, obj, dest, tag=0):
+        self._send(dumps(obj, HIGHEST_PROTOCOL), dest, tag)
+
+    ssend = send
+
+    def isend(self, obj, dest, tag=0):
+        self.send(obj, dest, tag)
+        return(Request())
+
+    issend = isend
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(loads(self._recv(source, tag, status=status).read()))
+
+    def irecv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._recv_request(None, source, tag, unpickle=True))
+
+    def sendrecv(self, sendobj, dest, sendtag=0, recvbuf=None,
+                 source=ANY_SOURCE, recvtag=ANY_TAG, status=None):
+        self.send(sendobj, dest, sendtag)
+        return(self.recv(None, source, recvtag, status))
+
+    def probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Probe(source, tag, status))
+
+    def iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Iprobe(source, tag, status))
+
+    # COLLECTIVES (BUFFERS)
+    def Barrier(self):
+        self.barrier()
+
+    def Bcast(self, buf, root=0):
+        data = get_buffer(buf)[0]
+        if(self.rank == root):
+            for dest in range(self.size):
+                if(dest != root):
+                    self._send(data, dest, 0, True)
+        else:
+            self._recv(root, 0, True).copy_to(data)
+
+    def Gather(self, sendbuf, recvbuf, root=0):
+        self.Gatherv(sendbuf, recvbuf, root)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0):
+        data = get_buffer(sendbuf)[0]
+        if(self.rank == root):
+            for source, region in enumerate(get_regions(recvbuf, self.size)):
+                if(source == root):
+                    region[:] = data
+                else:
+                    self._recv(source, 0, True).copy_to(region)
+        else:
+            self._send(data, root, 0, True)
+
+    def Allgather(self, sendbuf, recvbuf):
+        self.Allgatherv(sendbuf, recvbuf)
+
+    def Allgatherv(self, sendbuf, recvbuf):
+        self.Gatherv(sendbuf, recvbuf, 0)
+        self.Bcast(recvbuf, 0)
+
+    def Scatter(self, sendbuf, recvbuf, root=0):
+        self.Scatterv(sendbuf, recvbuf, root)
+
+    def Scatterv(self, sendbuf, recvbuf, root=0):
+        data = get_buffer(recvbuf)[0]
+        if(self.rank == root):
+            for dest, region in enumerate(get_regions(sendbuf, self.size)):
+                if(dest == root):
+                    data[:len(region)] = region
+                else:
+                    self._send(region, dest, 0, True)
+        else:
+            self._recv(root, 0, True).copy_to(data)
+
+    def Alltoall(self, sendbuf, recvbuf):
+        self.Alltoallv(sendbuf, recvbuf)
+
+    def Alltoallv(self, sendbuf, recvbuf):
+        sendregions = get_regions(sendbuf, self.size)
+        recvregions = get_regions(recvbuf, self.size)
+        for dest, region in enumerate(sendregions):
+            if(dest != self.rank):
+                self._send(region, dest, 0, True)
+        recvregions[self.rank][:] = sendregions[self.rank]
+        for source, region in enumerate(recvregions):
+            if(source != self.rank):
+                self._recv(source, 0, True).copy_to(region)
+
+    def Reduce(self, sendbuf, recvbuf, op=SUM, root=0):
+        array = get_array(sendbuf)
+        if(self.rank == root):
+            arrays = [array if(source == root) else
+                      np.frombuffer(self._recv(source, 0, True).read(),
+                                    array.dtype).reshape(array.shape)
+                      for source in range(self.size)]
+            get_array(recvbuf)[...] = reduce_arrays(arrays, op)
+        else:
+            self._send(get_buffer(sendbuf)[0], root, 0, True)
+
+    def Allreduce(self, sendbuf, recvbuf, op=SUM):
+        self.Reduce(sendbuf, recvbuf, op, 0)
+        self.Bcast(recvbuf, 0)
+
+    # NON-BLOCKING COLLECTIVES
+    # All ranks start collectives in the same order, so they complete directly
+    Ibarrier = make_immediate(Barrier)
+    Ibcast = make_immediate(Bcast)
+    Igather = make_immediate(Gather)
+    Igatherv = make_immediate(Gatherv)
+    Iallgather = make_immediate(Allgather)
+    Iallgatherv = make_immediate(Allgatherv)
+    Iscatter = make_immediate(Scatter)
+    Iscatterv = make_immediate(Scatterv)
+    Ialltoall = make_immediate(Alltoall)
+    Ialltoallv = make_immediate(Alltoallv)
+    Ireduce = make_immediate(Reduce)
+    Iallreduce = make_immediate(Allreduce)
+
+    # COLLECTIVES (OBJECTS)
+    def barrier(self):
+        self.gather(None, 0)
+        self.bcast(None, 0)
+
+    def bcast(self, obj, root=0):
+        if(self.rank == root):
+            data = dumps(obj, HIGHEST_PROTOCOL)
+            for dest in range(self.size):
+                if(dest != root):
+                    self._send(data, dest, 0, True)
+            return(obj)
+        else:
+            return(loads(self._recv(root, 0, True).read()))
+
+    def gather(self, sendobj, root=0):
+        if(self.rank == root):
+            return([sendobj if(source == root) else
+                    loads(self._recv(source, 0, True).read())
+                    for source in range(self.size)])
+        else:
+            self._send(dumps(sendobj, HIGHEST_PROTOCOL), root, 0, True)
+
+    def allgather(self, sendobj):
+        return(self.bcast(self.gather(sendobj, 0), 0))
+
+    def scatter(self, sendobj, root=0):
+        if(self.rank == root):
+            if(len(sendobj) != self.size):
+                raise ValueError("Number of objects to scatter does not "
+                                 "match the size of the communicator!")
+            for dest, obj in enumerate(sendobj):
+                if(dest != root):
+                    self._send(dumps(obj, HIGHEST_PROTOCOL), dest, 0, True)
+            return(sendobj[root])
+        else:
+            return(loads(self._recv(root, 0, True).read()))
+
+    def alltoall(self, sendobj):
+        if(len(sendobj) != self.size):
+            raise ValueError("Number of objects to exchange does not match "
+                             "the size of the communicator!")
+        for dest, obj in enumerate(sendobj):
+            if(dest != self.rank):
+                self._send(dumps(obj, HIGHEST_PROTOCOL), dest, 0, True)
+        return([sendobj[source] if(source == self.rank) else
+                loads(self._recv(source, 0, True).read())
+                for source in range(self.size)])
+
+    def reduce(self, sendobj, op=SUM, root=0):
+        objs = self.gather(sendobj, root)
+        if(self.rank == root):
+            return(reduce_objects(objs, op))
+
+    def allreduce(self, sendobj, op=SUM):
+        return(self.bcast(self.reduce(sendobj, op, 0), 0))
+
+    # COMMUNICATOR CREATION
+    def Dup(self):
+        # Agree on the context of the new communicator
+        context = self.allreduce(_transport.next_context, MAX)
+        _transport.next_context = context+1
+
+        # Create new communicator
+        return(self.__class__(self.name, self._group, context))
+
+    Clone = Dup
+
+    def Split(self, color=0, key=0):
+        # Agree on the context of the new communicator
+        context = self.allreduce(_transport.next_context, MAX)
+        _transport.next_context = context+1
+
+        # Determine the world ranks of all ranks with the same color
+        members = sorted((k, rank, world) for (c, k), rank, world in
+                         zip(self.allgather((color, key)), range(self.size),
+                             self._group) if(c == color))
+
+        # Create new communicator
+        return(self.__class__(self.name, [world for _, _, world in members],
+                              context))
+
+    # All processes are started on the same node by the launcher
+    def Split_type(self, split_type, key=0, info=None):
+        return(self.Split(0, key))
+
+
+# %% INTRACOMM CLASS DEFINITION
+# Make Intracomm class
+class Intracomm(Comm):
+    pass
+
+
+# %% WIN CLASS DEFINITION
+# Make Win class
+class Win(dummyMPI.Win):
+    def __init__(self, memories, disp_units, segments, comm):
+        # Save the shared memory segments of all ranks and their communicator
+        super().__init__(memories, disp_units)
+        self._segments = segments
+        self._comm = comm
+
+    # Every rank creates a shared memory segment that all others attach to
+    @classmethod
+    def Allocate_shared(cls, size, disp_unit=1, info=None, comm=None):
+        if comm is None:
+            comm = COMM_SELF
+
+        # Create the segment of this rank, which cannot be empty
+        shm = SharedMemory(
+            '%s_%i_%i' % (_transport.shm_prefix, _transport.rank,
+                          next(_transport.shm_counter)),
+            create=True, size=max(size, 1))
+
+        # Attach to the segments of all other ranks
+        infos = comm.allgather((shm.name, size, disp_unit))
+        segments = []
+        for rank, (name, _, _) in enumerate(infos):
+            if(rank == comm.rank):
+                segments.append(shm)
+            else:
+                segments.append(SharedMemory(name))
+                resource_tracker.unregister(segments[-1]._name,
+                                            'shared_memory')
+
+        # Create window
+        return(cls([segment.buf[:nbytes] for segment, (_, nbytes, _) in
+                    zip(segments, infos)],
+                   [disp_unit for _, _, disp_unit in infos], segments, comm))
+
+    def Free(self):
+        # Wait until all ranks are done with the segments
+        self._comm.Barrier()
+
+        # Close all segments, unless they are still used by arrays
+        self._memories = None
+        for segment in self._segments:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+
+        # Remove the segment of this rank
+        self._segments[self._comm.rank].unlink()
+
+
+# %% MISCELLANEOUS FUNCTIONS
+def Get_processor_name():
+    return(gethostname())
+
+
+def Wtime():
+    return(perf_counter())
+
+
+def get_vendor():
+    return("localMPI", parse_version(__version__)._version.release)
+
+
+# %% INITIALIZE TRANSPORT, COMM_WORLD AND COMM_SELF
+# Connect to all other processes started by the launcher
+_transport = _Transport(int(os.environ.get(ENV_RANK, 0)),
+                        int(os.environ.get(ENV_SIZE, 1)),
+                        os.environ.get(ENV_ADDRESS, ''),
+                        bytes.fromhex(os.environ.get(ENV_AUTHKEY, '')),
+                        os.environ.get(ENV_SHM_PREFIX, 'mpi4pyd_%i' %
+                                       (os.getpid())))
+
+COMM_WORLD = Intracomm('localMPI_COMM_WORLD', range(_transport.size), 0)
+COMM_SELF = Intracomm('localMPI_COMM_SELF', [_transport.rank], 1)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+Run
+===
+Launcher that executes a Python script or module with multiple local
+processes, which communicate with each other through the
+:mod:`mpi4pyd.localMPI` module::
+
+    python -m mpi4pyd.run -n 4 script.py [args]
+    python -m mpi4pyd.run -n 4 -m module [args]
+
+This allows for MPI algorithms written with :mod:`mpi4pyd.MPI` to be executed
+in parallel on a single node without an MPI library being installed.
+As the processes share large payloads through
+:mod:`multiprocessing.shared_memory`, this requires Python 3.8 or later.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from argparse import REMAINDER, ArgumentParser
+from glob import glob
+import os
+from os import path
+import shutil
+import subprocess
+import sys
+from tempfile import mkdtemp
+from time import sleep
+
+# All declaration
+__all__ = ['main', 'run']
+
+
+# %% GLOBALS
+# Names of the environment variables that are read by mpi4pyd.localMPI
+ENV_RANK = 'MPI4PYD_LOCAL_RANK'
+ENV_SIZE = 'MPI4PYD_LOCAL_SIZE'
+ENV_ADDRESS = 'MPI4PYD_LOCAL_ADDRESS'
+ENV_AUTHKEY = 'MPI4PYD_LOCAL_AUTHKEY'
+ENV_SHM_PREFIX = 'MPI4PYD_LOCAL_SHM_PREFIX'
+
+
+# %% FUNCTION DEFINITIONS
+# This function executes a command with the given number of processes
+def run(n_procs, args):
+    """
+    Executes the Python interpreter with the provided `args` in `n_procs`
+    local processes that together form the :obj:`~mpi4pyd.MPI.COMM_WORLD`
+    communicator, and waits for all of them to finish.
+
+    If any process exits with a non-zero exit code, all other processes are
+    terminated.
+
+    Parameters
+    ----------
+    n_procs : int
+        The number of processes to start.
+    args : list of str
+        The arguments that are given to the Python interpreter, like
+        ``['script.py', 'arg']`` or ``['-m', 'module', 'arg']``.
+
+    Returns
+    -------
+    exit_code : int
+        The first non-zero exit code of any process, or 0 if all processes
+        finished successfully.
+
+    """
+
+    # Check if n_procs is a positive integer
+    if(int(n_procs) != n_procs or n_procs < 1):
+        raise ValueError("Input argument 'n_procs' must be a positive "
+                         "integer!")
+
+    # Check if shared memory is available, which the processes require
+    if(sys.version_info < (3, 8)):
+        raise RuntimeError("Launching local processes requires Python 3.8 or "
+                           "later!")
+
+    # Create temporary directory for the addresses of all processes
+    tmpdir = mkdtemp(prefix='mpi4pyd_')
+    shm_prefix = 'mpi4pyd_%i' % (os.getpid())
+
+    # Determine the addresses that the processes listen on
+    if(sys.platform == 'win32'):
+        address = r'\\.\pipe\%s_%%i' % (path.basename(tmpdir))
+    else:
+        address = path.join(tmpdir, 'rank_%i')
+
+    # Set the environment variables that are shared by all processes
+    env = dict(os.environ)
+    env[ENV_SIZE] = str(n_procs)
+    env[ENV_ADDRESS] = address
+    env[ENV_AUTHKEY] = os.urandom(16).hex()
+    env[ENV_SHM_PREFIX] = shm_prefix
+
+    # Start all processes
+    procs = []
+    try:
+        for rank in range(n_procs):
+            env[ENV_RANK] = str(rank)
+            procs.append(subprocess.Popen([sys.executable, *args],
+                                          env=dict(env)))
+
+        # Wait until all processes are finished or one of them failed
+        while True:
+            exit_codes = [proc.poll() for proc in procs]
+            exit_code = next((code for code in exit_codes if code), 0)
+            if exit_code or None not in exit_codes:
+                break
+            sleep(0.01)
+
+    # Terminate all processes that are still running and clean up
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+                proc.wait()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+        for name in glob('/dev/shm/%s_*' % (shm_prefix)):
+            os.remove(name)
+
+    # Return exit_code
+    return(exit_code)
+
+
+# This function is executed when running the module
+def main():
+    """
+    Parses the command-line arguments and executes :func:`~run`.
+
+    """
+
+    # Create parser
+    parser = ArgumentParser(
+        'mpi4pyd.run',
+        description=("Execute a Python script or module with multiple local "
+                     "processes that communicate through mpi4pyd.localMPI."))
+    parser.add_argument('-n', '--np', type=int, default=1, dest='n_procs',
+                        help="Number of processes to start")
+    parser.add_argument('-m', dest='module', nargs=REMAINDER,
+                        metavar='module ...',
+                        help="Module to execute instead of a script, and its "
+                             "arguments")
+    parser.add_argument('args', nargs=REMAINDER,
+                        help="Script to execute and its arguments")
+    args = parser.parse_args()
+
+    # Check if a script or module was given
+    if args.module:
+        cmd = ['-m', *args.module]
+    elif args.args:
+        cmd = args.args
+    else:
+        parser.error("No script or module to execute was given!")
+
+    # Execute command
+    sys.exit(run(args.n_procs, cmd))
+
+
+# %% MAIN EXECUTION
+if(__name__ == '__main__'):
+    main()
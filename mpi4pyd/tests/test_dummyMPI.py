@@ -1,14 +1,19 @@
 # -*- coding: utf-8 -*-
 
 # %% IMPORTS
+# Built-in imports
+import asyncio
+
 # Package imports
 import numpy as np
 import pytest
 
 # mpi4pyd imports
 from mpi4pyd import MPI
-from mpi4pyd.dummyMPI import (Comm, Intracomm, COMM_WORLD as comm, get_vendor,
-                              SUM)
+from mpi4pyd.dummyMPI import (
+    Comm, Datatype, Intracomm, Op, Prequest, Request, Status,
+    COMM_WORLD as comm, get_vendor, BAND, BOR, BXOR, INT, LAND, LOR, LXOR,
+    MAX, MAXLOC, MIN, MINLOC, NO_OP, PROD, REPLACE, SUM, UNDEFINED)
 
 
 # Skip entire module if MPI is used
@@ -79,6 +84,12 @@ class Test_COMM_WORLD(object):
         comm.Bcast(self.array, self.buffer)
         assert (self.buffer == self.array).all()
         assert (comm.bcast(self.array) == self.array).all()
+        assert list(comm.bcast_iter(self.array)) == [(self.array,
+                                                      (Ellipsis,))]
+        shared = comm.bcast_shared(self.array)
+        assert (shared == self.array).all()
+        assert not shared.flags.writeable and self.array.flags.writeable
+        comm.free_shared()
 
     def test_Gather(self):
         comm.Gather(self.array, self.buffer)
@@ -110,6 +121,70 @@ class Test_COMM_WORLD(object):
         assert (comm.Sendrecv(self.array) == self.array).all()
         assert (comm.sendrecv(self.array) == self.array).all()
 
+    def test_Send_Recv(self):
+        status = Status()
+        comm.Send(self.array, 0, tag=2)
+        assert comm.Iprobe(tag=2, status=status)
+        assert status.Get_count() == self.array.nbytes
+        comm.Recv(self.buffer, 0, tag=2, status=status)
+        assert (self.buffer == self.array).all()
+        assert status.Get_tag() == 2
+        with pytest.raises(RuntimeError):
+            comm.recv(tag=2)
+
+    def test_Isend_Irecv(self):
+        request = comm.Irecv(self.buffer, 0)
+        assert not request.Test()
+        comm.Isend(self.array, 0).Wait()
+        assert request.Test()
+        assert (self.buffer == self.array).all()
+        request = comm.irecv(tag=3)
+        comm.isend([1], 0, tag=3)
+        assert request.wait() == [1]
+        comm.isend([2], 0, tag=4, compression='zlib')
+        assert comm.irecv(tag=4).wait() == [2]
+
+    def test_nonblocking_collectives(self):
+        request = comm.Iallreduce(self.array, self.buffer)
+        assert request.Test()
+        assert (self.buffer == self.array).all()
+        assert comm.ibcast([1]).wait() == [1]
+        assert comm.iallreduce(2).wait() == 2
+        comm.Ibarrier().Wait()
+
+    def test_Alltoall(self):
+        comm.Alltoall(self.array, self.buffer)
+        assert (self.buffer == self.array).all()
+        assert comm.alltoall([1]) == [1]
+
+    def test_copy(self):
+        assert comm.Gather(self.array, None) is not self.array
+        assert comm.reduce(self.array) is not self.array
+        lst = [[1, 2], [3]]
+        assert comm.Allgather(lst, None) == lst[0]
+        assert comm.Allgather(lst, None) is not lst[0]
+
+    def test_zero_copy(self):
+        assert not comm.zero_copy
+        comm.zero_copy = True
+        try:
+            assert comm.Gather(self.array, None) is self.array
+            assert comm.Allreduce(self.array, None) is self.array
+            assert comm.reduce(self.array) is self.array
+            assert comm.Reduce(self.array, self.array) is self.array
+        finally:
+            comm.zero_copy = False
+        with pytest.raises(TypeError):
+            comm.zero_copy = 1
+
+
+# Pytest for derived Datatype objects
+def test_Datatype():
+    datatype = Datatype.Create_struct([1], [0], [INT]).Commit()
+    assert isinstance(datatype, Datatype)
+    assert isinstance(INT.Create_contiguous(2).Create_resized(0, 8), Datatype)
+    datatype.Free()
+
 
 # Pytest for get_vendor() function
 def test_get_vendor():
@@ -118,4 +193,109 @@ def test_get_vendor():
 
 # Pytest for SUM operator
 def test_SUM():
-    assert SUM() is None
+    assert SUM(1, 2) == 3
+    assert SUM([1], [2]) == [1, 2]
+    assert (SUM(np.arange(3), 1.5) == [1.5, 2.5, 3.5]).all()
+
+
+# Pytest for the Request class
+def test_Request():
+    requests = [comm.irecv(tag=4), Request(value=1)]
+    assert Request.testany(requests) == (1, True, 1)
+    assert Request.Testany(requests) == (UNDEFINED, False)
+    assert Request.testall(requests) == (False, None)
+    comm.send(0, 0, tag=4)
+    assert Request.waitany(requests) == (0, 0)
+    assert Request.Waitany(requests) == UNDEFINED
+    assert Request.waitall(requests) == [0, 1]
+    with pytest.raises(RuntimeError):
+        Request.Waitany([comm.Irecv(np.empty(3), tag=5)])
+    with pytest.raises(RuntimeError):
+        Request.waitany([requests[1], comm.irecv(tag=5)])
+
+
+# Pytest for the Prequest class and persistent communication plans
+def test_Prequest():
+    array = np.arange(3)
+    requests = [comm.plan_recv(None, 0, tag=6), comm.plan_send(array, 0, 6)]
+    assert Prequest.Testall(requests)
+    for i in range(2):
+        array += 1
+        requests[0].start()
+        assert not requests[0].Test()
+        requests[1].start()
+        assert (Prequest.waitall(requests)[0] == array).all()
+    buf = np.empty_like(array)
+    requests[0] = comm.plan_recv(buf, 0, tag=6)
+    for request in requests:
+        request.start()
+    assert Prequest.waitall(requests)[0] is buf and (buf == array).all()
+    b_plan = comm.plan_bcast(array)
+    b_plan.start()
+    assert b_plan.wait() is array
+    for request in requests+[b_plan]:
+        request.Free()
+
+
+# Pytest for aggregating sends
+def test_aggregate():
+    with comm.aggregate(max_delay=0) as a_comm:
+        a_comm.send([1], 0, tag=7)
+        a_comm.flush()
+    assert comm.recv(tag=7) == [1]
+
+
+# Pytest for awaiting requests in an event loop
+def test_async():
+    async def main():
+        task = asyncio.ensure_future(comm.arecv(tag=5))
+        await comm.asend({'a': 1}, 0, tag=5)
+        assert await task == {'a': 1}
+        with pytest.raises(asyncio.TimeoutError):
+            await comm.arecv(tag=6, timeout=0.01)
+        comm.send(2, 0, tag=6)
+        assert await comm.arecv(tag=6) == 2
+        assert await comm.abcast(3) == 3
+        assert await comm.aallreduce(4) == 4
+    asyncio.run(main())
+
+
+# Pytest for the predefined operators
+class Test_Op(object):
+    @pytest.mark.parametrize('op, x, y, result', [
+        (MAX, 1, 2, 2), (MIN, 1, 2, 1), (PROD, 3, 2, 6), (LAND, 1, 0, 0),
+        (LOR, 0, 3, 3), (LXOR, True, True, False), (BAND, 6, 3, 2),
+        (BOR, 6, 3, 7), (BXOR, 6, 3, 5), (REPLACE, 1, 2, 2),
+        (NO_OP, 1, 2, 1), (MAXLOC, (3, 1), (3, 0), (3, 0)),
+        (MINLOC, (1, 4), (2, 0), (1, 4))])
+    def test_objects(self, op, x, y, result):
+        assert op(x, y) == result
+
+    def test_Reduce_local(self):
+        inoutbuf = np.array([1, 5, 3])
+        MAX.Reduce_local(np.array([4, 2, 3]), inoutbuf)
+        assert (inoutbuf == [4, 5, 3]).all()
+        LAND.Reduce_local([np.array([1, 0, 1]), INT], inoutbuf)
+        assert (inoutbuf == [1, 0, 1]).all()
+
+    def test_loc(self):
+        dtype = [('value', 'f8'), ('index', 'i4')]
+        inoutbuf = np.array([(1, 5), (5, 6), (0, 7)], dtype=dtype)
+        MAXLOC.Reduce_local(np.array([(1, 0), (2, 1), (3, 2)], dtype=dtype),
+                            inoutbuf)
+        assert inoutbuf.tolist() == [(1, 0), (5, 6), (3, 2)]
+        inoutbuf = np.array([[1, 2], [2, 0]])
+        MINLOC.Reduce_local(np.array([[1, 3], [4, 1]]), inoutbuf)
+        assert (inoutbuf == [[1, 2], [2, 0]]).all()
+
+    def test_Create(self):
+        def func(inbuf, inoutbuf, datatype):
+            inoutbuf -= inbuf
+            return(inoutbuf)
+        op = Op.Create(func)
+        assert not op.is_predefined and not op.Is_commutative()
+        assert op(1, 5) == 4
+        inoutbuf = np.full(3, 5.)
+        op.Reduce_local(np.ones(3), inoutbuf)
+        assert (inoutbuf == 4).all()
+        op.Free()
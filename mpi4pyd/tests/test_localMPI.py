@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+# %% IMPORTS
+# Built-in imports
+import subprocess
+import sys
+from textwrap import dedent
+
+# Package imports
+import pytest
+
+# mpi4pyd imports
+from mpi4pyd import MPI
+from mpi4pyd.run import run
+
+
+# Skip entire module if MPI is used or shared memory is not available
+pytestmark = pytest.mark.skipif(MPI.COMM_WORLD.Get_size() > 1,
+                                reason="Cannot be pytested in MPI")
+pytest.importorskip('multiprocessing.shared_memory')
+
+
+# %% HELPER FUNCTIONS
+# This function executes the given code with the launcher
+def launch(tmpdir, code, n_procs=3):
+    script = tmpdir.join('script.py')
+    script.write(dedent(code))
+    return(subprocess.run([sys.executable, '-m', 'mpi4pyd.run', '-n',
+                           str(n_procs), str(script)], timeout=120,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True))
+
+
+# %% PYTEST CLASSES AND FUNCTIONS
+# Pytest for the point-to-point methods
+def test_p2p(tmpdir):
+    proc = launch(tmpdir, """
+        import numpy as np
+        from mpi4pyd import MPI
+        comm = MPI.COMM_WORLD
+        rank, size = comm.Get_rank(), comm.Get_size()
+        assert MPI.get_vendor()[0] == 'localMPI'
+        assert size == 3
+
+        # Small and large (shared memory) buffers
+        for n in [10, 10**6]:
+            if(rank == 0):
+                for dest in range(1, size):
+                    comm.Send(np.arange(n)*dest, dest, tag=dest)
+            else:
+                status = MPI.Status()
+                buf = np.empty(n, dtype=int)
+                comm.Recv(buf, 0, status=status)
+                assert (buf == np.arange(n)*rank).all()
+                assert status.Get_source() == 0
+                assert status.Get_tag() == rank
+
+        # Objects and requests
+        req = comm.irecv(source=(rank-1) % size)
+        comm.send({'rank': rank}, (rank+1) % size)
+        assert req.wait() == {'rank': (rank-1) % size}
+        assert comm.sendrecv(rank, (rank+1) % size,
+                             source=(rank-1) % size) == (rank-1) % size
+    """)
+    assert proc.returncode == 0, proc.stderr
+
+
+# Pytest for the collective methods
+def test_collectives(tmpdir):
+    proc = launch(tmpdir, """
+        import numpy as np
+        from mpi4pyd import MPI
+        comm = MPI.COMM_WORLD
+        rank, size = comm.Get_rank(), comm.Get_size()
+
+        # Object collectives
+        comm.barrier()
+        assert comm.bcast(rank, 1) == 1
+        assert comm.allgather(rank) == list(range(size))
+        assert comm.allreduce(rank) == sum(range(size))
+        assert comm.allreduce(rank, MPI.MAX) == size-1
+        assert comm.scatter(list(range(size)), 2) == rank
+        assert comm.alltoall([rank]*size) == list(range(size))
+
+        # Buffer collectives
+        array = np.full(4, rank, dtype=float)
+        buff = np.empty(4*size)
+        comm.Allgather(array, buff)
+        assert (buff == np.repeat(np.arange(size), 4)).all()
+        comm.Allreduce(array, array, MPI.PROD)
+        assert (array == 0).all()
+        comm.Bcast(buff if rank else np.zeros_like(buff), 0)
+        comm.Allgatherv(np.arange(rank), [buff, (list(range(size)),
+                                                 [0, 0, 1]), MPI.DOUBLE])
+
+        # Split communicators
+        sub = comm.Split(rank % 2, -rank)
+        assert sub.allgather(rank) == sorted(range(rank % 2, size, 2))[::-1]
+        assert comm.Dup().allreduce(1) == size
+    """)
+    assert proc.returncode == 0, proc.stderr
+
+
+# Pytest for the HybridComm class with the localMPI module
+def test_HybridComm(tmpdir):
+    proc = launch(tmpdir, """
+        import numpy as np
+        from mpi4pyd.MPI import HYBRID_COMM_WORLD as comm
+        rank, size = comm.Get_rank(), comm.Get_size()
+        assert comm.bcast(np.arange(10**5) if not rank else None,
+                          0).sum() == sum(range(10**5))
+        assert (comm.allreduce(np.ones(5)) == size).all()
+        assert len(comm.allgather(np.full((2, 2), rank))) == size
+        comm.chunk_size = 7
+        assert (comm.scatter(np.arange(30*size).reshape(size, 30), 0) ==
+                np.arange(30*rank, 30*(rank+1))).all()
+
+        # Shared memory broadcast
+        array = comm.bcast_shared(np.arange(10**5)*rank, 1)
+        assert (array == np.arange(10**5)).all()
+        assert not array.flags.writeable
+        comm.free_shared()
+    """)
+    assert proc.returncode == 0, proc.stderr
+
+
+# Pytest if a failing process terminates all others
+def test_exit_code(tmpdir):
+    proc = launch(tmpdir, """
+        from mpi4pyd import MPI
+        comm = MPI.COMM_WORLD
+        if(comm.Get_rank() == 1):
+            raise SystemExit(3)
+        comm.recv(source=1)
+    """)
+    assert proc.returncode == 3
+
+
+# Pytest if the run function checks its input
+def test_run_invalid():
+    with pytest.raises(ValueError):
+        run(0, ['-c', 'pass'])
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# %% IMPORTS
+# Package imports
+import numpy as np
+import pytest
+
+# mpi4pyd imports
+from mpi4pyd import threadMPI
+from mpi4pyd.threadMPI import (
+    ANY_SOURCE, EAGER_LIMIT, MAX, MAXLOC, PROD, Status, run)
+
+
+# %% PYTEST CLASSES AND FUNCTIONS
+# Pytest for COMM_WORLD outside of rank threads
+def test_COMM_WORLD():
+    assert threadMPI.COMM_WORLD.Get_size() == 1
+    assert threadMPI.COMM_WORLD.Get_rank() == 0
+    assert threadMPI.COMM_WORLD.allgather(1) == [1]
+    assert threadMPI.get_vendor()[0] == 'threadMPI'
+
+
+# Pytest for the point-to-point methods
+@pytest.mark.parametrize('n', [10, EAGER_LIMIT])
+def test_p2p(n):
+    def func():
+        comm = threadMPI.COMM_WORLD
+        rank, size = comm.Get_rank(), comm.Get_size()
+
+        # Buffers
+        if(rank == 0):
+            for dest in range(1, size):
+                comm.Send(np.arange(n)*dest, dest, tag=dest)
+        else:
+            status = Status()
+            buf = np.empty(n, dtype=int)
+            comm.Recv(buf, 0, status=status)
+            assert (buf == np.arange(n)*rank).all()
+            assert status.Get_source() == 0
+            assert status.Get_tag() == rank
+            assert status.Get_count() == buf.nbytes
+
+        # Objects and requests
+        obj = {'rank': rank}
+        req = comm.irecv(source=(rank-1) % size)
+        comm.send(obj, (rank+1) % size)
+        assert req.wait() == {'rank': (rank-1) % size}
+        return(obj, comm.sendrecv(obj, (rank+1) % size, source=ANY_SOURCE))
+
+    # Check that objects are passed by reference
+    results = run(3, func)
+    for rank in range(3):
+        assert results[rank][1] is results[(rank-1) % 3][0]
+
+
+# Pytest for the collective methods
+def test_collectives():
+    def func():
+        comm = threadMPI.COMM_WORLD
+        rank, size = comm.Get_rank(), comm.Get_size()
+
+        # Object collectives
+        comm.barrier()
+        assert comm.bcast(rank, 1) == 1
+        assert comm.allgather(rank) == list(range(size))
+        assert comm.allreduce(rank, MAX) == size-1
+        assert comm.scatter(list(range(size)), 2) == rank
+        assert comm.alltoall([rank]*size) == list(range(size))
+
+        # Buffer collectives
+        array = np.full(4, rank, dtype=float)
+        buff = np.empty(4*size)
+        comm.Allgather(array, buff)
+        assert (buff == np.repeat(np.arange(size), 4)).all()
+        comm.Allreduce(array, array, PROD)
+        assert (array == 0).all()
+        comm.Alltoall(np.arange(size)+10.*rank, array[:size])
+        assert (array[:size] == np.arange(size)*10+rank).all()
+        pairs = np.array([[rank % 2, rank]])
+        comm.Allreduce(pairs.copy(), pairs, MAXLOC)
+        assert (pairs == [[1, 1]]).all()
+
+        # Split communicators
+        sub = comm.Split(rank % 2, -rank)
+        assert sub.allgather(rank) == sorted(range(rank % 2, size, 2))[::-1]
+        assert comm.Dup().allreduce(1) == size
+    run(4, func)
+
+
+# Pytest if non-blocking collectives can be interleaved with messages
+def test_nonblocking_collectives():
+    def func():
+        comm = threadMPI.COMM_WORLD
+        rank = comm.Get_rank()
+        array = np.full(3, rank, dtype=float)
+        if(rank == 0):
+            request = comm.Ibarrier()
+            assert not request.Test()
+            comm.send(None, 1)
+            request.Wait()
+            request = comm.Ibcast(array, 0)
+            comm.send(None, 1)
+            request.Wait()
+        else:
+            comm.recv(source=0)
+            comm.Ibarrier().Wait()
+            comm.recv(source=0)
+            request = comm.Ibcast(array, 0)
+            request.Wait()
+        comm.Iallreduce(array+rank, array, MAX).Wait()
+        return(array)
+    assert all((array == 1).all() for array in run(2, func))
+
+
+# Pytest if an exception in one rank aborts all others
+def test_exception():
+    def func():
+        comm = threadMPI.COMM_WORLD
+        if(comm.Get_rank() == 1):
+            raise KeyError("Rank 1 failed!")
+        comm.Barrier()
+    with pytest.raises(KeyError):
+        run(3, func)
+
+
+# Pytest if the run function checks its input
+def test_run_invalid():
+    with pytest.raises(ValueError):
+        run(0, print)
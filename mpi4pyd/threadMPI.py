@@ -0,0 +1,690 @@
+# -*- coding: utf-8 -*-
+
+"""
+Thread MPI
+==========
+Module that emulates the functionality of the :mod:`mpi4py.MPI` module with
+multiple threads in a single process, where every thread acts as an MPI rank.
+A function is executed by all ranks with :func:`~run`::
+
+    def main():
+        comm = threadMPI.COMM_WORLD
+        ...
+
+    threadMPI.run(4, main)
+
+Within a rank thread, :obj:`~COMM_WORLD` and :obj:`~COMM_SELF` refer to the
+communicators of that rank. Outside of :func:`~run`, they refer to
+communicators with a single rank.
+It is used as :mod:`mpi4pyd.MPI` if the ``MPI4PYD_BACKEND`` environment
+variable is set to ``'thread'``.
+
+As all ranks share the same memory, collective communications copy data
+directly from the buffers of one rank into those of another, and Python
+objects are passed by reference instead of being pickled.
+Point-to-point messages of more than :attr:`~EAGER_LIMIT` bytes are copied
+directly into the receiving buffer as well, which requires the sending rank to
+wait until they have been received.
+
+"""
+
+
+# %% IMPORTS
+# Built-in imports
+from socket import gethostname
+import sys
+from threading import Condition, Thread, local
+from time import perf_counter
+from types import ModuleType
+
+# Package imports
+from pkg_resources import parse_version
+
+# mpi4pyd imports
+from mpi4pyd import __version__, dummyMPI
+from mpi4pyd._backend import (
+    Request, Status, get_array, get_buffer, get_regions, reduce_arrays,
+    reduce_objects)
+from mpi4pyd.dummyMPI import *
+
+# All declaration
+__all__ = list(dummyMPI.__all__)
+__all__.extend(['EAGER_LIMIT', 'Get_processor_name', 'Wtime', 'run'])
+
+
+# %% GLOBALS
+# Point-to-point messages of more bytes than this are not buffered
+EAGER_LIMIT = 2**16
+
+# Initialize thread-local storage holding the communicators of a rank thread
+_rank_local = local()
+
+
+# %% SHARED STATE CLASS DEFINITIONS
+# Class holding the state that is shared by all threads started by run()
+class _Universe(object):
+    def __init__(self, node_size=None):
+        # Initialize condition used for all waiting and the aborted flag
+        self.condition = Condition()
+        self.aborted = False
+
+        # Save the number of ranks on every emulated node
+        self.node_size = node_size
+
+    # This function wakes up all waiting ranks after a rank failed
+    def abort(self):
+        with self.condition:
+            self.aborted = True
+            self.condition.notify_all()
+
+    # This function waits for the condition until the universe is aborted
+    def wait(self):
+        if self.aborted:
+            raise RuntimeError("Communication was aborted, as another rank "
+                               "failed!")
+        self.condition.wait()
+
+
+# Class holding the state that is shared by all ranks of a communicator
+class _Group(object):
+    def __init__(self, universe, size):
+        # Save universe and size
+        self.universe = universe
+        self.size = size
+
+        # Initialize the pending collectives with the number of collectives
+        # every rank started, and the mailboxes for messages
+        self.rounds = {}
+        self.counts = [0]*size
+        self.messages = [[] for _ in range(size)]
+
+
+# Class holding the state of a single collective of a communicator
+class _Round(object):
+    __slots__ = ('slots', 'arrived', 'finished')
+
+    def __init__(self, size):
+        self.slots = [None]*size
+        self.arrived = 0
+        self.finished = 0
+
+
+# Class holding a single point-to-point message
+class _Message(object):
+    __slots__ = ('source', 'tag', 'nbytes', 'payload', 'done')
+
+    def __init__(self, source, tag, nbytes, payload, done=True):
+        self.source = source
+        self.tag = tag
+        self.nbytes = nbytes
+        self.payload = payload
+        self.done = done
+
+
+# %% COMM CLASS DEFINITION
+# Make Comm class
+class Comm(object):
+    def __init__(self, name, group, rank):
+        # Save name, shared group and rank of this thread
+        self.name = name
+        self._group = group
+        self._rank = rank
+        self._size = group.size
+
+    # %% CLASS PROPERTIES
+    @property
+    def name(self):
+        return(self._name)
+
+    @name.setter
+    def name(self, name):
+        if isinstance(name, str):
+            self._name = name
+        else:
+            raise TypeError("Input argument 'name' is not of type 'str'!")
+
+    @property
+    def rank(self):
+        return(self._rank)
+
+    @property
+    def size(self):
+        return(self._size)
+
+    # %% GENERAL CLASS METHODS
+    # This function makes obj available to all ranks and applies func to all
+    def _collect(self, obj, func=list):
+        """
+        Makes `obj` available to all ranks in this communicator, and returns
+        the result of `func` applied to the list of the objects of all ranks.
+        No rank continues before all ranks have applied `func`, such that the
+        objects can be read without copying them first.
+
+        """
+
+        return(self._icollect(obj, func).wait())
+
+    # This function starts a collective and returns a request completing it
+    def _icollect(self, obj, func=list, finish=None):
+        """
+        Non-blocking version of :meth:`~_collect`, which returns a request
+        that completes once all ranks have applied `func`.
+        The value of the request is the result of `func`, or of `finish`
+        applied to it if provided.
+
+        All ranks start their collectives in the same order, which is used to
+        match them. A rank applies `func` while testing or waiting for the
+        request, after all ranks have started the collective.
+
+        """
+
+        # Add obj to the next collective of this rank
+        group = self._group
+        universe = group.universe
+        with universe.condition:
+            index = group.counts[self.rank]
+            group.counts[self.rank] += 1
+            state = group.rounds.setdefault(index, _Round(self.size))
+            state.slots[self.rank] = obj
+            state.arrived += 1
+            universe.condition.notify_all()
+        applied = []
+
+        def progress(block, status):
+            # Wait for all ranks to start the collective if requested
+            if not applied:
+                with universe.condition:
+                    while block and state.arrived < self.size:
+                        universe.wait()
+                    if(state.arrived < self.size):
+                        return(False, None)
+
+                # Apply func and let the other ranks know
+                applied.append(func(state.slots))
+                with universe.condition:
+                    state.finished += 1
+                    if(state.finished == self.size):
+                        del group.rounds[index]
+                    universe.condition.notify_all()
+
+            # Wait for all ranks to apply func if requested
+            with universe.condition:
+                while block and state.finished < self.size:
+                    universe.wait()
+                if(state.finished < self.size):
+                    return(False, None)
+            return(True, applied[0] if finish is None
+                   else finish(applied[0]))
+        return(Request(progress))
+
+    # This function posts a message to a rank of this communicator
+    def _post(self, message, dest):
+        universe = self._group.universe
+        with universe.condition:
+            self._group.messages[dest].append(message)
+            universe.condition.notify_all()
+
+    # This function posts a buffer and returns a request completing its send
+    def _isend(self, buf, dest, tag):
+        # Small messages are buffered and therefore complete immediately
+        data = get_buffer(buf)[0]
+        if(data.nbytes <= EAGER_LIMIT):
+            self._post(_Message(self.rank, tag, data.nbytes, data.copy()),
+                       dest)
+            return(Request())
+
+        # Large messages are read directly from data by the receiving rank
+        message = _Message(self.rank, tag, data.nbytes, data, False)
+        self._post(message, dest)
+        universe = self._group.universe
+
+        def progress(block, status):
+            with universe.condition:
+                while block and not message.done:
+                    universe.wait()
+                return(message.done, None)
+        return(Request(progress))
+
+    # This function returns the first message matching the given envelope
+    def _match(self, source, tag, status=None, remove=True, block=True):
+        universe = self._group.universe
+        messages = self._group.messages[self.rank]
+        with universe.condition:
+            while True:
+                # Search for a matching message
+                for i, message in enumerate(messages):
+                    if((source == ANY_SOURCE or message.source == source) and
+                       (tag == ANY_TAG or message.tag == tag)):
+                        if remove:
+                            del messages[i]
+                        if status is not None:
+                            status._set(message.source, message.tag,
+                                        message.nbytes)
+                        return(message)
+
+                # Wait for the next message if requested
+                if not block:
+                    return(None)
+                universe.wait()
+
+    # This function copies the payload of a message into a byte array
+    def _receive(self, message, data):
+        # Check if the payload fits in data
+        if(message.nbytes > len(data)):
+            raise ValueError("Message of %i bytes is truncated by a receive "
+                             "buffer of %i bytes!"
+                             % (message.nbytes, len(data)))
+
+        # Copy the payload and notify its sender if it is waiting
+        data[:message.nbytes] = message.payload
+        if not message.done:
+            universe = self._group.universe
+            with universe.condition:
+                message.done = True
+                universe.condition.notify_all()
+
+    # This function returns a request that receives a message
+    def _irecv(self, data, source, tag):
+        def progress(block, status):
+            message = self._match(source, tag, status, block=block)
+            if message is None:
+                return(False, None)
+            elif data is None:
+                return(True, message.payload)
+            else:
+                self._receive(message, data)
+                return(True, None)
+        return(Request(progress))
+
+    # %% VISIBLE CLASS METHODS
+    def Get_name(self):
+        return(self.name)
+
+    def Set_name(self, name):
+        self.name = name
+
+    def Get_rank(self):
+        return(self.rank)
+
+    def Get_size(self):
+        return(self.size)
+
+    def Is_intra(self):
+        return(isinstance(self, Intracomm))
+
+    def Is_inter(self):
+        return(False)
+
+    def Abort(self, errorcode=0):
+        self._group.universe.abort()
+        raise SystemExit(errorcode)
+
+    def Free(self):
+        pass
+
+    # POINT-TO-POINT
+    def Send(self, buf, dest, tag=0):
+        self._isend(buf, dest, tag).Wait()
+
+    Ssend = Send
+
+    def Isend(self, buf, dest, tag=0):
+        return(self._isend(buf, dest, tag))
+
+    Issend = Isend
+
+    def Recv(self, buf, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._receive(self._match(source, tag, status), get_buffer(buf)[0])
+
+    def Irecv(self, buf, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._irecv(get_buffer(buf)[0], source, tag))
+
+    def Sendrecv(self, sendbuf, dest, sendtag=0, recvbuf=None,
+                 source=ANY_SOURCE, recvtag=ANY_TAG, status=None):
+        request = self.Isend(sendbuf, dest, sendtag)
+        self.Recv(recvbuf, source, recvtag, status)
+        request.Wait()
+
+    def Probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        self._match(source, tag, status, remove=False)
+        return(True)
+
+    def Iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self._match(source, tag, status, remove=False,
+                           block=False) is not None)
+
+    def send(self, obj, dest, tag=0):
+        self._post(_Message(self.rank, tag, 0, obj), dest)
+
+    ssend = send
+
+    def isend(self, obj, dest, tag=0):
+        self.send(obj, dest, tag)
+        return(Request())
+
+    issend = isend
+
+    def recv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self._match(source, tag, status).payload)
+
+    def irecv(self, buf=None, source=ANY_SOURCE, tag=ANY_TAG):
+        return(self._irecv(None, source, tag))
+
+    def sendrecv(self, sendobj, dest, sendtag=0, recvbuf=None,
+                 source=ANY_SOURCE, recvtag=ANY_TAG, status=None):
+        self.send(sendobj, dest, sendtag)
+        return(self.recv(None, source, recvtag, status))
+
+    def probe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Probe(source, tag, status))
+
+    def iprobe(self, source=ANY_SOURCE, tag=ANY_TAG, status=None):
+        return(self.Iprobe(source, tag, status))
+
+    # COLLECTIVES (BUFFERS)
+    def Barrier(self):
+        self.Ibarrier().Wait()
+
+    def Bcast(self, buf, root=0):
+        self.Ibcast(buf, root).Wait()
+
+    def Gather(self, sendbuf, recvbuf, root=0):
+        self.Gatherv(sendbuf, recvbuf, root)
+
+    def Gatherv(self, sendbuf, recvbuf, root=0):
+        self.Igatherv(sendbuf, recvbuf, root).Wait()
+
+    def Allgather(self, sendbuf, recvbuf):
+        self.Allgatherv(sendbuf, recvbuf)
+
+    def Allgatherv(self, sendbuf, recvbuf):
+        self.Iallgatherv(sendbuf, recvbuf).Wait()
+
+    def Scatter(self, sendbuf, recvbuf, root=0):
+        self.Scatterv(sendbuf, recvbuf, root)
+
+    def Scatterv(self, sendbuf, recvbuf, root=0):
+        self.Iscatterv(sendbuf, recvbuf, root).Wait()
+
+    def Alltoall(self, sendbuf, recvbuf):
+        self.Alltoallv(sendbuf, recvbuf)
+
+    def Alltoallv(self, sendbuf, recvbuf):
+        self.Ialltoallv(sendbuf, recvbuf).Wait()
+
+    def Reduce(self, sendbuf, recvbuf, op=SUM, root=0):
+        self.Ireduce(sendbuf, recvbuf, op, root).Wait()
+
+    def Allreduce(self, sendbuf, recvbuf, op=SUM):
+        self.Iallreduce(sendbuf, recvbuf, op).Wait()
+
+    # NON-BLOCKING COLLECTIVES
+    # Collectives complete while their requests are tested or waited for
+    def Ibarrier(self):
+        return(self._icollect(None))
+
+    def Ibcast(self, buf, root=0):
+        data = get_buffer(buf)[0]
+
+        def func(slots):
+            if(self.rank != root):
+                data[:] = slots[root]
+        return(self._icollect(data, func))
+
+    def Igather(self, sendbuf, recvbuf, root=0):
+        return(self.Igatherv(sendbuf, recvbuf, root))
+
+    def Igatherv(self, sendbuf, recvbuf, root=0):
+        def func(slots):
+            if(self.rank == root):
+                for region, data in zip(get_regions(recvbuf, self.size),
+                                        slots):
+                    region[:] = data
+        return(self._icollect(get_buffer(sendbuf)[0], func))
+
+    def Iallgather(self, sendbuf, recvbuf):
+        return(self.Iallgatherv(sendbuf, recvbuf))
+
+    def Iallgatherv(self, sendbuf, recvbuf):
+        def func(slots):
+            for region, data in zip(get_regions(recvbuf, self.size), slots):
+                region[:] = data
+        return(self._icollect(get_buffer(sendbuf)[0], func))
+
+    def Iscatter(self, sendbuf, recvbuf, root=0):
+        return(self.Iscatterv(sendbuf, recvbuf, root))
+
+    def Iscatterv(self, sendbuf, recvbuf, root=0):
+        data = get_buffer(recvbuf)[0]
+
+        def func(slots):
+            region = slots[root][self.rank]
+            data[:len(region)] = region
+        return(self._icollect(get_regions(sendbuf, self.size)
+                              if(self.rank == root) else None, func))
+
+    def Ialltoall(self, sendbuf, recvbuf):
+        return(self.Ialltoallv(sendbuf, recvbuf))
+
+    def Ialltoallv(self, sendbuf, recvbuf):
+        def func(slots):
+            for region, regions in zip(get_regions(recvbuf, self.size),
+                                       slots):
+                region[:] = regions[self.rank]
+        return(self._icollect(get_regions(sendbuf, self.size), func))
+
+    def Ireduce(self, sendbuf, recvbuf, op=SUM, root=0):
+        # Reduce on root, writing the result after all ranks have read theirs
+        def finish(result):
+            if(self.rank == root):
+                get_array(recvbuf)[...] = result
+        return(self._icollect(
+            get_array(sendbuf), lambda arrays: reduce_arrays(arrays, op)
+            if(self.rank == root) else None, finish))
+
+    def Iallreduce(self, sendbuf, recvbuf, op=SUM):
+        def finish(result):
+            get_array(recvbuf)[...] = result
+        return(self._icollect(
+            get_array(sendbuf), lambda arrays: reduce_arrays(arrays, op),
+            finish))
+
+    # COLLECTIVES (OBJECTS)
+    def barrier(self):
+        self._collect(None)
+
+    def bcast(self, obj, root=0):
+        return(self._collect(obj)[root])
+
+    def gather(self, sendobj, root=0):
+        objs = self._collect(sendobj)
+        if(self.rank == root):
+            return(objs)
+
+    def allgather(self, sendobj):
+        return(self._collect(sendobj))
+
+    def scatter(self, sendobj, root=0):
+        if(self.rank == root and len(sendobj) != self.size):
+            raise ValueError("Number of objects to scatter does not match "
+                             "the size of the communicator!")
+        return(self._collect(sendobj)[root][self.rank])
+
+    def alltoall(self, sendobj):
+        if(len(sendobj) != self.size):
+            raise ValueError("Number of objects to exchange does not match "
+                             "the size of the communicator!")
+        return([objs[self.rank] for objs in self._collect(sendobj)])
+
+    def reduce(self, sendobj, op=SUM, root=0):
+        objs = self._collect(sendobj)
+        if(self.rank == root):
+            return(reduce_objects(objs, op))
+
+    def allreduce(self, sendobj, op=SUM):
+        return(reduce_objects(self._collect(sendobj), op))
+
+    # COMMUNICATOR CREATION
+    def Dup(self):
+        return(self.Split(0, self.rank))
+
+    Clone = Dup
+
+    def Split(self, color=0, key=0):
+        # Determine the ranks of all ranks with the same color, sorted by key
+        members = [rank for _, rank in sorted(
+            (k, rank) for rank, (c, k) in enumerate(
+                self._collect((color, key))) if(c == color))]
+
+        # The first member creates the shared group of the new communicator
+        leader = members[0]
+        group = self._collect(
+            _Group(self._group.universe, len(members))
+            if(self.rank == leader) else None)[leader]
+
+        # Create new communicator
+        return(self.__class__(self.name, group, members.index(self.rank)))
+
+    # All ranks share their memory, but can be split up into emulated nodes
+    def Split_type(self, split_type, key=0, info=None):
+        node_size = self._group.universe.node_size
+        if node_size is None:
+            return(self.Split(0, key))
+        else:
+            return(self.Split(_rank_local.COMM_WORLD.rank//node_size, key))
+
+
+# %% INTRACOMM CLASS DEFINITION
+# Make Intracomm class
+class Intracomm(Comm):
+    pass
+
+
+# %% WIN CLASS DEFINITION
+# Make Win class
+class Win(dummyMPI.Win):
+    # All ranks can access the memory of each other directly
+    @classmethod
+    def Allocate_shared(cls, size, disp_unit=1, info=None, comm=None):
+        if comm is None:
+            comm = getattr(_rank_local, 'COMM_SELF', _COMM_SELF)
+        memories, disp_units = zip(*comm._collect(
+            (memoryview(bytearray(size)), disp_unit)))
+        return(cls(list(memories), list(disp_units)))
+
+
+# %% FUNCTION DEFINITIONS
+# This function executes a function with multiple rank threads
+def run(n_ranks, func, *args, node_size=None, **kwargs):
+    """
+    Executes the provided `func` with `args` and `kwargs` in `n_ranks`
+    threads, where every thread acts as an MPI rank in the
+    :obj:`~COMM_WORLD` communicator of that thread, and waits for all of them
+    to finish.
+
+    If `func` raises an exception in any rank, all communications in the
+    other ranks are aborted and the first exception is raised again.
+
+    Parameters
+    ----------
+    n_ranks : int
+        The number of ranks to execute `func` with.
+    func : function
+        The function to execute in all ranks.
+    args : positional arguments
+        Positional arguments that must be passed to `func`.
+    kwargs : keyword arguments
+        Keyword arguments that must be passed to `func`.
+
+    Optional
+    --------
+    node_size : int or None. Default: None
+        If not *None*, the number of consecutive ranks that are placed on the
+        same emulated node by :meth:`~Comm.Split_type`, such that multi-node
+        communication patterns can be tested. If *None*, all ranks are placed
+        on a single node.
+
+    Returns
+    -------
+    results : list
+        List containing the value returned by `func` in every rank.
+
+    """
+
+    # Check if n_ranks is a positive integer
+    if(int(n_ranks) != n_ranks or n_ranks < 1):
+        raise ValueError("Input argument 'n_ranks' must be a positive "
+                         "integer!")
+
+    # Create the shared state of COMM_WORLD
+    universe = _Universe(node_size)
+    world = _Group(universe, n_ranks)
+
+    # Initialize lists of results and exceptions
+    results = [None]*n_ranks
+    errors = []
+
+    # This function is executed by every rank thread
+    def target(rank):
+        # Set the communicators of this rank
+        _rank_local.COMM_WORLD = Intracomm('threadMPI_COMM_WORLD', world,
+                                           rank)
+        _rank_local.COMM_SELF = Intracomm('threadMPI_COMM_SELF',
+                                          _Group(universe, 1), 0)
+
+        # Execute func and abort all ranks if it fails
+        try:
+            results[rank] = func(*args, **kwargs)
+        except BaseException as error:
+            errors.append(error)
+            universe.abort()
+
+    # Start all rank threads and wait for them to finish
+    threads = [Thread(target=target, args=(rank,), daemon=True,
+                      name="threadMPI rank %i" % (rank))
+               for rank in range(n_ranks)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Raise the first exception if there was one
+    if errors:
+        raise errors[0]
+
+    # Return results
+    return(results)
+
+
+def Get_processor_name():
+    return(gethostname())
+
+
+def Wtime():
+    return(perf_counter())
+
+
+def get_vendor():
+    return("threadMPI", parse_version(__version__)._version.release)
+
+
+# %% INITIALIZE COMM_WORLD AND COMM_SELF
+# Make communicators that are used outside of rank threads
+_COMM_WORLD = Intracomm('threadMPI_COMM_WORLD', _Group(_Universe(), 1), 0)
+_COMM_SELF = Intracomm('threadMPI_COMM_SELF', _Group(_Universe(), 1), 0)
+del COMM_WORLD, COMM_SELF
+
+
+# Make module class that returns the communicators of the current rank thread
+class _ThreadModule(ModuleType):
+    def __getattr__(self, name):
+        if name in ('COMM_WORLD', 'COMM_SELF'):
+            return(getattr(_rank_local, name, globals()['_%s' % (name)]))
+        else:
+            raise AttributeError("module %r has no attribute %r"
+                                 % (self.__name__, name))
+
+
+# Use it as the class of this module, as a module-level __getattr__ requires
+# Python 3.7
+sys.modules[__name__].__class__ = _ThreadModule